@@ -1,11 +1,12 @@
 from django.apps import apps
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
-from django.core.mail import send_mail
+from django.db import transaction
 from django.db.models.signals import post_migrate, post_save
 from django.dispatch import receiver
 
+from .tasks import send_welcome_emails
+
 User = get_user_model()
 
 
@@ -72,14 +73,5 @@ def assign_default_group_and_send_email(sender, instance, created, **kwargs):
     
 
     if instance.email:
-        subject = "Welcome to Trips Monitoring"
-        message = (
-            f"Hi {instance.username},\n\n"
-            "Thanks for registering in Trips Monitoring.\n"
-            "You can now log in, add your cars, track trips and refuels, and generate reports.\n\n"
-            "Have a great day!"
-        )
-        from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or "noreply@example.com"
-
-        
-        send_mail(subject, message, from_email, [instance.email], fail_silently=True)
+        # Sent by a worker once the registration is committed, off the request path.
+        transaction.on_commit(lambda: send_welcome_emails.delay([instance.pk]), robust=True)
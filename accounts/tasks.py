@@ -0,0 +1,27 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+
+from core.mail import send_messages
+
+User = get_user_model()
+
+
+def welcome_message(user) -> EmailMessage:
+    subject = "Welcome to Trips Monitoring"
+    message = (
+        f"Hi {user.username},\n\n"
+        "Thanks for registering in Trips Monitoring.\n"
+        "You can now log in, add your cars, track trips and refuels, and generate reports.\n\n"
+        "Have a great day!"
+    )
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or "noreply@example.com"
+    return EmailMessage(subject=subject, body=message, from_email=from_email, to=[user.email])
+
+
+@shared_task(ignore_result=True)
+def send_welcome_emails(user_ids) -> int:
+    """Sends welcome mails for a batch of new users over one mail connection."""
+    users = User.objects.filter(pk__in=user_ids).exclude(email="").exclude(email__isnull=True)
+    return send_messages(welcome_message(user) for user in users)
@@ -0,0 +1,27 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from accounts.tasks import send_welcome_emails
+from core.tests.helpers import create_user
+
+
+class WelcomeEmailTests(TestCase):
+    @mock.patch("accounts.signals.send_welcome_emails")
+    def test_registration_queues_welcome_email_on_commit(self, task):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = create_user("newbie")
+
+        task.delay.assert_called_once_with([user.pk])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_batch_uses_a_single_connection(self):
+        users = [create_user(f"u{i}") for i in range(3)]
+
+        with mock.patch("core.mail.get_connection", wraps=mail.get_connection) as get_connection:
+            sent = send_welcome_emails([u.pk for u in users])
+
+        self.assertEqual(sent, 3)
+        get_connection.assert_called_once()
+        self.assertEqual(mail.outbox[0].subject, "Welcome to Trips Monitoring")
@@ -0,0 +1,18 @@
+class QueryBudgetMixin:
+    """
+    Declares how many queries an API view may issue per request, checked by
+    core.middleware.SQLInstrumentationMiddleware.
+
+    `query_budget` applies to every request; override get_query_budget() when
+    the budget depends on the request (e.g. a streaming variant).
+    """
+
+    query_budget = None
+
+    def get_query_budget(self, request):
+        return self.query_budget
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # The middleware reads the budget from the underlying HttpRequest.
+        request._request.query_budget = self.get_query_budget(request)
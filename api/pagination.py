@@ -0,0 +1,66 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.pagination import seek_page
+
+
+class LinkHeaderKeysetPagination(BasePagination):
+    """
+    Seek pagination for API lists (see core.pagination): ?after= / ?before=
+    carry the `keyset` values of the last / first row seen, so every page is
+    the same index range scan however many rows share a date. The response
+    body stays a plain list and the neighbouring pages are advertised in an
+    RFC 8288 Link header, so existing list consumers keep working.
+    """
+
+    keyset = ("-id",)
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            rows, self.next_cursor, self.previous_cursor = seek_page(
+                queryset,
+                self.keyset,
+                self.get_page_size(request),
+                after=request.query_params.get("after"),
+                before=request.query_params.get("before"),
+            )
+        except ValueError:
+            raise NotFound("Invalid cursor.")
+        return rows
+
+    def _link(self, param, cursor):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(remove_query_param(url, "after"), "before")
+        return replace_query_param(url, param, cursor)
+
+    def get_paginated_response(self, data):
+        links = []
+        if self.next_cursor:
+            links.append(f'<{self._link("after", self.next_cursor)}>; rel="next"')
+        if self.previous_cursor:
+            links.append(f'<{self._link("before", self.previous_cursor)}>; rel="prev"')
+        headers = {"Link": ", ".join(links)} if links else None
+        return Response(data, headers=headers)
+
+
+class TripCursorPagination(LinkHeaderKeysetPagination):
+    keyset = ("-start_date", "-created_at", "-id")
+
+
+class TagPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission
 
+from core.roles import MANAGERS, has_role
+
 
 class IsOwnerOrManager(BasePermission):
 
@@ -8,6 +10,14 @@ class IsOwnerOrManager(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        if user.groups.filter(name="Managers").exists():
+        # Owners are the common case and need no extra query.
+        if getattr(obj, "owner_id", None) == user.id:
             return True
-        return getattr(obj, "owner_id", None) == user.id
\ No newline at end of file
+        return has_role(user, MANAGERS)
+
+
+class IsManager(BasePermission):
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and has_role(user, MANAGERS))
@@ -1,5 +1,11 @@
+import datetime
+
+from django.utils import timezone
 from rest_framework import serializers
-from logbook.models import Trip
+from logbook.imports import FORMATS, KINDS
+from logbook.models import Trip, Tag
+from statsapp.fleet import DEFAULT_LIMIT, MAX_LIMIT, ORDER_DISTANCE, ORDERS, default_period
+from statsapp.series import INTERVAL_MONTH, INTERVALS, MAX_BUCKETS, bucket_count, bucket_start
 
 
 class TripSerializer(serializers.ModelSerializer):
@@ -23,6 +29,13 @@ class TripSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class FuelCurrencyStatsSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    refuels_count = serializers.IntegerField()
+    total_fuel_liters = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_fuel_cost = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
 class CarStatsSerializer(serializers.Serializer):
     car_id = serializers.IntegerField()
     car_name = serializers.CharField()
@@ -31,4 +44,110 @@ class CarStatsSerializer(serializers.Serializer):
     refuels_count = serializers.IntegerField()
     total_fuel_liters = serializers.DecimalField(max_digits=12, decimal_places=2)
     total_fuel_cost = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_fuel_cost_currency = serializers.CharField()
     avg_cost_per_liter = serializers.DecimalField(max_digits=12, decimal_places=3)
+    fuel_by_currency = FuelCurrencyStatsSerializer(many=True)
+    source = serializers.CharField()
+
+
+class CarSeriesQuerySerializer(serializers.Serializer):
+    interval = serializers.ChoiceField(choices=INTERVALS, default=INTERVAL_MONTH)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        # Defaults to the buckets of the last year, up to today.
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", bucket_start(attrs["end"] - datetime.timedelta(days=364), attrs["interval"]))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "The end date must not be before the start date."})
+        if bucket_count(attrs["start"], attrs["end"], attrs["interval"]) > MAX_BUCKETS:
+            raise serializers.ValidationError(
+                {"start": f"The range is limited to {MAX_BUCKETS} {attrs['interval']} buckets."}
+            )
+        return attrs
+
+
+class SeriesPointSerializer(serializers.Serializer):
+    period = serializers.DateField(allow_null=True)
+    distance_km = serializers.IntegerField()
+    liters = serializers.DecimalField(max_digits=12, decimal_places=2)
+    cost = serializers.DecimalField(max_digits=14, decimal_places=2)
+    consumption_l_100km = serializers.DecimalField(max_digits=8, decimal_places=2, allow_null=True)
+    cost_per_km = serializers.DecimalField(max_digits=10, decimal_places=3, allow_null=True)
+
+
+class CarSeriesSerializer(serializers.Serializer):
+    car_id = serializers.IntegerField()
+    interval = serializers.CharField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    currency = serializers.CharField()
+    totals = SeriesPointSerializer()
+    buckets = SeriesPointSerializer(many=True)
+
+
+class FleetSummaryQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    order = serializers.ChoiceField(choices=ORDERS, default=ORDER_DISTANCE)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT)
+
+    def validate(self, attrs):
+        if "start" not in attrs and "end" not in attrs:
+            attrs["start"], attrs["end"] = default_period()
+        elif "start" not in attrs or "end" not in attrs:
+            raise serializers.ValidationError("Give both start and end, or neither.")
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "The end date must not be before the start date."})
+        return attrs
+
+
+class FleetRowSerializer(serializers.Serializer):
+    trips_count = serializers.IntegerField()
+    distance_km = serializers.IntegerField()
+    refuels_count = serializers.IntegerField()
+    fuel_liters = serializers.DecimalField(max_digits=14, decimal_places=2)
+    fuel_cost = serializers.DecimalField(max_digits=14, decimal_places=2)
+    consumption_l_100km = serializers.DecimalField(max_digits=8, decimal_places=2, allow_null=True)
+    cost_per_km = serializers.DecimalField(max_digits=10, decimal_places=3, allow_null=True)
+
+
+class FleetCarSerializer(FleetRowSerializer):
+    car_id = serializers.IntegerField()
+    car_label = serializers.CharField()
+    owner = serializers.CharField()
+
+
+class FleetDriverSerializer(FleetRowSerializer):
+    user_id = serializers.IntegerField()
+    username = serializers.CharField()
+    cars_count = serializers.IntegerField()
+
+
+class FleetSummarySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    currency = serializers.CharField()
+    source = serializers.CharField()
+    order = serializers.CharField()
+    cars_count = serializers.IntegerField()
+    drivers_count = serializers.IntegerField()
+    totals = FleetRowSerializer()
+    cars = FleetCarSerializer(many=True)
+    drivers = FleetDriverSerializer(many=True)
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ("id", "name")
+        read_only_fields = fields
+
+
+class LogbookImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    kind = serializers.ChoiceField(choices=KINDS)
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+    skip_invalid = serializers.BooleanField(default=False)
+    dry_run = serializers.BooleanField(default=False)
@@ -1,3 +1,5 @@
+import json
+
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -68,3 +70,79 @@ class ApiEndpointsTests(TestCase):
         url = reverse("api-car-trips", kwargs={"car_id": self.car_other.pk})
         resp = self.client_api.get(url)
         self.assertIn(resp.status_code, (403, 404))
+
+    def test_car_trips_are_cursor_paginated(self):
+        for i in range(2):
+            Trip.objects.create(
+                car=self.car_owner,
+                created_by=self.owner,
+                start_odometer=200 + i * 10,
+                end_odometer=205 + i * 10,
+                start_date=timezone.localdate(),
+                end_date=timezone.localdate(),
+                from_city="Plovdiv",
+                to_city="Sofia",
+            )
+        self.client_api.force_authenticate(user=self.owner)
+        url = reverse("api-car-trips", kwargs={"car_id": self.car_owner.pk})
+
+        resp = self.client_api.get(url, {"page_size": 2})
+        self.assertEqual(len(resp.data), 2)
+        self.assertIn('rel="next"', resp["Link"])
+        next_url = resp["Link"].split(";")[0].strip("<>")
+
+        resp = self.client_api.get(next_url)
+        self.assertEqual(len(resp.data), 1)
+        self.assertIn('rel="prev"', resp["Link"])
+
+    def test_car_trips_cursor_walks_trips_on_the_same_date(self):
+        Trip.objects.bulk_create(
+            Trip(
+                car=self.car_owner,
+                created_by=self.owner,
+                start_odometer=300 + i * 10,
+                end_odometer=305 + i * 10,
+                start_date=timezone.localdate(),
+                end_date=timezone.localdate(),
+                from_city="Plovdiv",
+                to_city="Sofia",
+            )
+            for i in range(5)
+        )
+        self.client_api.force_authenticate(user=self.owner)
+        url = reverse("api-car-trips", kwargs={"car_id": self.car_owner.pk})
+        expected = list(
+            Trip.objects.filter(car=self.car_owner)
+            .order_by("-start_date", "-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+        seen, pages = [], []
+        resp = self.client_api.get(url, {"page_size": 2})
+        while True:
+            seen += [t["id"] for t in resp.data]
+            pages.append(resp)
+            if 'rel="next"' not in resp.get("Link", ""):
+                break
+            resp = self.client_api.get(resp["Link"].split(";")[0].strip("<>"))
+        self.assertEqual(seen, expected)
+
+        prev_url = pages[-1]["Link"].split(", ")[-1].split(";")[0].strip("<>")
+        resp = self.client_api.get(prev_url)
+        self.assertEqual([t["id"] for t in resp.data], [t["id"] for t in pages[-2].data])
+
+    def test_car_trips_invalid_cursor_is_not_found(self):
+        self.client_api.force_authenticate(user=self.owner)
+        url = reverse("api-car-trips", kwargs={"car_id": self.car_owner.pk})
+        self.assertEqual(self.client_api.get(url, {"after": "not-a-cursor"}).status_code, 404)
+
+    def test_car_trips_stream_as_ndjson(self):
+        self.client_api.force_authenticate(user=self.owner)
+        url = reverse("api-car-trips", kwargs={"car_id": self.car_owner.pk})
+        resp = self.client_api.get(url, {"stream": "1"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["distance_km"], 80)
@@ -0,0 +1,81 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+
+
+class CarSeriesAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client_api = APIClient()
+        self.owner = create_user("owner", preferred_currency="EUR")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="auto"
+        )
+        for start, end, day in ((1000, 1500, datetime.date(2025, 1, 10)), (1500, 1900, datetime.date(2025, 2, 1))):
+            Trip.objects.create(
+                car=self.car, created_by=self.owner, start_odometer=start, end_odometer=end,
+                start_date=day, end_date=day, from_city="Sofia", to_city="Plovdiv",
+            )
+        for day, odometer, liters, cost, full in (
+            (datetime.date(2024, 12, 20), 1000, "40.00", "80.00", True),
+            (datetime.date(2025, 1, 5), 1100, "10.00", "20.00", False),
+            (datetime.date(2025, 1, 20), 1500, "20.00", "40.00", True),
+            (datetime.date(2025, 2, 10), 1900, "25.00", "50.00", True),
+        ):
+            Refuel.objects.create(
+                car=self.car, created_by=self.owner, date=day, odometer=odometer,
+                liters=liters, total_cost=cost, currency="EUR", is_full_tank=full,
+            )
+        self.url = reverse("api-car-series", kwargs={"car_id": self.car.pk})
+        self.client_api.force_authenticate(user=self.owner)
+
+    def test_monthly_buckets(self):
+        # Car lookup, trip distances, last full tank before the range, refuels.
+        with self.assertNumQueries(4):
+            resp = self.client_api.get(self.url, {"interval": "month", "start": "2025-01-01", "end": "2025-03-31"})
+
+        self.assertEqual(resp.status_code, 200)
+        jan, feb, mar = resp.data["buckets"]
+        self.assertEqual(jan["period"], "2025-01-01")
+        self.assertEqual(jan["distance_km"], 500)
+        self.assertEqual(jan["liters"], "30.00")
+        # The partial fill counts towards the interval closed by the next full tank.
+        self.assertEqual(jan["consumption_l_100km"], "6.00")
+        self.assertEqual(jan["cost_per_km"], "0.120")
+        self.assertEqual(feb["consumption_l_100km"], "6.25")
+        self.assertEqual(mar["distance_km"], 0)
+        self.assertIsNone(mar["consumption_l_100km"])
+        self.assertIsNone(mar["cost_per_km"])
+
+        totals = resp.data["totals"]
+        self.assertEqual(totals["distance_km"], 900)
+        self.assertEqual(totals["cost"], "110.00")
+        self.assertEqual(totals["consumption_l_100km"], "6.11")
+        self.assertEqual(resp.data["currency"], "EUR")
+
+    def test_weekly_buckets_start_on_monday(self):
+        resp = self.client_api.get(self.url, {"interval": "week", "start": "2025-01-01", "end": "2025-01-31"})
+
+        periods = [b["period"] for b in resp.data["buckets"]]
+        self.assertEqual(periods[0], "2024-12-30")
+        self.assertEqual(periods[-1], "2025-01-27")
+        self.assertEqual(sum(b["distance_km"] for b in resp.data["buckets"]), 500)
+
+    def test_invalid_ranges_are_rejected(self):
+        resp = self.client_api.get(self.url, {"start": "2025-02-01", "end": "2025-01-01"})
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client_api.get(self.url, {"interval": "day", "start": "1990-01-01", "end": "2025-01-01"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_other_users_cannot_read_the_series(self):
+        self.client_api.force_authenticate(user=create_user("other"))
+        resp = self.client_api.get(self.url)
+        self.assertEqual(resp.status_code, 403)
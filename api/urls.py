@@ -1,7 +1,18 @@
 from django.urls import path
-from .views import CarStatsAPIView, CarTripsAPIView
+from .views import (
+    CarSeriesAPIView,
+    CarStatsAPIView,
+    CarTripsAPIView,
+    FleetSummaryAPIView,
+    LogbookImportAPIView,
+    TagListAPIView,
+)
 
 urlpatterns = [
     path("cars/<int:car_id>/stats/", CarStatsAPIView.as_view(), name="api-car-stats"),
+    path("cars/<int:car_id>/series/", CarSeriesAPIView.as_view(), name="api-car-series"),
     path("cars/<int:car_id>/trips/", CarTripsAPIView.as_view(), name="api-car-trips"),
+    path("fleet/summary/", FleetSummaryAPIView.as_view(), name="api-fleet-summary"),
+    path("tags/", TagListAPIView.as_view(), name="api-tag-list"),
+    path("imports/", LogbookImportAPIView.as_view(), name="api-logbook-import"),
 ]
\ No newline at end of file
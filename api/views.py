@@ -1,62 +1,261 @@
+import io
+import json
 from decimal import Decimal
 
-from django.db.models import Sum, F
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Sum, Q
 from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.generics import ListAPIView
 from rest_framework.views import APIView
 from rest_framework import status
 
+from core.cache import get_or_compute
+from core.currency import converted
 from garage.models import Car
-from logbook.models import Trip, Refuel
-from .serializers import CarStatsSerializer, TripSerializer
-from .permissions import IsOwnerOrManager
+from logbook.imports import Importer, ImportFileError, format_from_name, read_rows
+from logbook.models import Trip, Refuel, Tag
+from statsapp.models import MonthlyCarStat, MonthlyCarFuelStat
+from statsapp.fleet import build_fleet_summary
+from statsapp.series import build_car_series
+from statsapp.services import (
+    SOURCE_LIVE, SOURCE_ROLLUP, activity_months, converted_fuel_costs, rollup_is_fresh,
+)
+from .pagination import TagPagination, TripCursorPagination
+from .serializers import (
+    CarSeriesQuerySerializer,
+    CarSeriesSerializer,
+    CarStatsSerializer,
+    FleetSummaryQuerySerializer,
+    FleetSummarySerializer,
+    LogbookImportSerializer,
+    TagSerializer,
+    TripSerializer,
+)
+from .mixins import QueryBudgetMixin
+from .permissions import IsManager, IsOwnerOrManager
 
 
-class CarStatsAPIView(APIView):
+class CarStatsAPIView(QueryBudgetMixin, APIView):
+    """
+    Lifetime totals of a car.
+
+    Trips and refuels are aggregated with one query each; fuel costs are
+    reported per currency and totalled in the requesting user's preferred
+    currency.
+    ?source=rollup answers from the MonthlyCarStat tables instead of
+    scanning every trip and refuel, as long as every month with activity has
+    a fresh rollup row; otherwise it falls back to the live aggregates and
+    reports source "live". Results are cached per car owner until their data
+    changes.
+    """
+
     permission_classes = [IsOwnerOrManager]
+    # session, user, car, managers' group lookup and the two aggregates on a cache miss
+    query_budget = 6
+    # the same plus the two rollup tables and the months with activity, for when the
+    # rollups fall short and the aggregates run anyway
+    rollup_query_budget = 9
+
+    def get_source(self, request):
+        return SOURCE_ROLLUP if request.query_params.get("source") == SOURCE_ROLLUP else SOURCE_LIVE
+
+    def get_query_budget(self, request):
+        if self.get_source(request) == SOURCE_ROLLUP:
+            return self.rollup_query_budget
+        return super().get_query_budget(request)
 
     def get(self, request, car_id: int):
         car = Car.objects.filter(pk=car_id).first()
         if not car:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 
-
         self.check_object_permissions(request, car)
-        trips_qs = Trip.objects.filter(car_id=car_id)
-        refuels_qs = Refuel.objects.filter(car_id=car_id)
-        trips_count = trips_qs.count()
-        total_distance_km = trips_qs.aggregate(
-            total=Coalesce(Sum(F("end_odometer") - F("start_odometer")), 0)
-        )["total"] or 0
-
-        refuels_agg = refuels_qs.aggregate(
-            liters=Coalesce(Sum("liters"), Decimal("0.00")),
-            cost=Coalesce(Sum("total_cost"), Decimal("0.00")),
+
+        source = self.get_source(request)
+        currency = request.user.preferred_currency
+        data, _ = get_or_compute(
+            "car-stats",
+            car.owner_id,
+            (car.pk, "lifetime", source, currency),
+            lambda: self.compute_stats(car, source, currency),
         )
-        total_liters = refuels_agg["liters"] or Decimal("0.00")
-        total_cost = refuels_agg["cost"] or Decimal("0.00")
+
+        serializer = CarStatsSerializer(data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def compute_stats(self, car, source, currency):
+        car_id = car.pk
+        totals = self.rollup_totals(car_id, currency) if source == SOURCE_ROLLUP else None
+        if totals is None:
+            # Some month with activity has no fresh rollup (e.g. its recompute is still queued).
+            source = SOURCE_LIVE
+            totals = self.live_totals(car_id, currency)
+        trips_agg, by_currency, total_cost = totals
+
+        fuel_by_currency = [
+            {
+                "currency": code,
+                "refuels_count": count,
+                "total_fuel_liters": liters,
+                "total_fuel_cost": cost,
+            }
+            for code, (count, liters, cost) in sorted(by_currency.items())
+        ]
+        total_liters = sum((r["total_fuel_liters"] for r in fuel_by_currency), Decimal("0.00"))
+        total_cost = total_cost.quantize(Decimal("0.01"))
 
         avg_cost_per_liter = Decimal("0.000")
         if total_liters > 0:
             avg_cost_per_liter = (total_cost / total_liters).quantize(Decimal("0.001"))
 
-        data = {
+        return {
             "car_id": car.id,
             "car_name": str(car),
-            "trips_count": trips_count,
-            "total_distance_km": int(total_distance_km),
-            "refuels_count": refuels_qs.count(),
+            "trips_count": trips_agg["trips_count"],
+            "total_distance_km": int(trips_agg["total_distance_km"]),
+            "refuels_count": sum(r["refuels_count"] for r in fuel_by_currency),
             "total_fuel_liters": total_liters,
             "total_fuel_cost": total_cost,
+            "total_fuel_cost_currency": currency,
             "avg_cost_per_liter": avg_cost_per_liter,
+            "fuel_by_currency": fuel_by_currency,
+            "source": source,
         }
 
-        serializer = CarStatsSerializer(data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def rollup_totals(self, car_id, currency):
+        """
+        (trips aggregate, {currency: [refuels, liters, cost]}, converted total)
+        from the monthly rollups, or None unless every month with activity has
+        a fresh rollup row.
+        """
+        stats = {(s.year, s.month): s for s in MonthlyCarStat.objects.filter(car_id=car_id)}
+        fuel_rows = {}
+        for r in MonthlyCarFuelStat.objects.filter(car_id=car_id):
+            fuel_rows.setdefault((r.year, r.month), []).append(r)
+
+        now = timezone.now()
+        if not all(rollup_is_fresh(stat, fuel_rows.get(key, []), now=now) for key, stat in stats.items()):
+            return None
+        if not activity_months(car_id) <= stats.keys():
+            return None
+
+        trips_agg = {
+            "trips_count": sum(s.trips_count for s in stats.values()),
+            "total_distance_km": sum(s.total_distance_km for s in stats.values()),
+        }
+        # currency -> [refuels, liters, cost in that currency]
+        by_currency = {}
+        for rows in fuel_rows.values():
+            for r in rows:
+                row = by_currency.setdefault(r.currency, [0, Decimal("0.00"), Decimal("0.00")])
+                row[0] += r.refuels_count
+                row[1] += r.total_fuel_liters
+                row[2] += r.total_fuel_cost
+        # Other currencies are converted in SQL at the rate of each refuel's date.
+        converted_costs = converted_fuel_costs(
+            [car_id] if set(by_currency) - {currency} else [], (None, None), currency
+        )
+        total_cost = Decimal("0.00")
+        for code, (_, _, cost) in by_currency.items():
+            total_cost += cost if code == currency else converted_costs.get((car_id, code), Decimal("0.00"))
+        return trips_agg, by_currency, total_cost
+
+    def live_totals(self, car_id, currency):
+        trips_agg = Trip.objects.filter(car_id=car_id).aggregate(
+            trips_count=Count("id"),
+            total_distance_km=Coalesce(Sum("distance"), 0),
+        )
+
+        # One round-trip for all currencies: conditional aggregates per currency,
+        # plus the total converted at the rate of each refuel's date.
+        aggregates = {
+            "converted_cost": Coalesce(
+                Sum(converted("total_cost", "currency", "date", currency)), Decimal("0.00")
+            ),
+        }
+        for code in Refuel.CurrencyChoices.values:
+            in_currency = Q(currency=code)
+            aggregates[f"{code}_count"] = Count("id", filter=in_currency)
+            aggregates[f"{code}_liters"] = Coalesce(Sum("liters", filter=in_currency), Decimal("0.00"))
+            aggregates[f"{code}_cost"] = Coalesce(Sum("total_cost", filter=in_currency), Decimal("0.00"))
+        refuels_agg = Refuel.objects.filter(car_id=car_id).aggregate(**aggregates)
+        by_currency = {
+            code: [refuels_agg[f"{code}_count"], refuels_agg[f"{code}_liters"], refuels_agg[f"{code}_cost"]]
+            for code in Refuel.CurrencyChoices.values
+            if refuels_agg[f"{code}_count"]
+        }
+        return trips_agg, by_currency, refuels_agg["converted_cost"]
+
+
+class CarSeriesAPIView(QueryBudgetMixin, APIView):
+    """
+    Distance, fuel, cost, consumption (L/100km between full tanks) and cost
+    per km of a car in ?interval=day|week|month buckets from ?start to ?end
+    (default: the last year). Costs are in the requesting user's preferred
+    currency. Results are cached per car owner until their data changes.
+    """
+
+    permission_classes = [IsOwnerOrManager]
+    # session, user, car, managers' group lookup and the three series queries on a cache miss
+    query_budget = 7
+
+    def get(self, request, car_id: int):
+        car = Car.objects.filter(pk=car_id).first()
+        if not car:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        self.check_object_permissions(request, car)
+
+        params = CarSeriesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        interval, start, end = (params.validated_data[k] for k in ("interval", "start", "end"))
+        currency = request.user.preferred_currency
+
+        data, _ = get_or_compute(
+            "car-series",
+            car.owner_id,
+            (car.pk, interval, start.isoformat(), end.isoformat(), currency),
+            lambda: build_car_series(car.pk, interval, start, end, currency),
+        )
+        return Response(CarSeriesSerializer(data).data, status=status.HTTP_200_OK)
+
+
+class FleetSummaryAPIView(QueryBudgetMixin, APIView):
+    """
+    Managers only: every car and driver ranked by ?order=distance|cost|consumption
+    between ?start and ?end (default: the current month), top ?limit of each.
+    Whole-month periods are answered from the monthly rollups.
+    """
+
+    permission_classes = [IsManager]
+    # session, user, managers' group lookup and the cars, plus for whole months the two
+    # rollup tables and the conversion of their costs paid in other currencies, and
+    # the two live aggregates for the cars without fresh rollups
+    query_budget = 9
+
+    def get(self, request):
+        params = FleetSummaryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = build_fleet_summary(currency=request.user.preferred_currency, **params.validated_data)
+        return Response(FleetSummarySerializer(data).data, status=status.HTTP_200_OK)
+
+
+class CarTripsAPIView(QueryBudgetMixin, APIView):
+    """
+    Trips of a car, newest first.
 
+    Paginated with an opaque cursor (see the Link header). With ?stream=1 the
+    whole history is streamed as NDJSON, one trip per line, in bounded memory.
+    """
 
-class CarTripsAPIView(APIView):
     permission_classes = [IsOwnerOrManager]
+    pagination_class = TripCursorPagination
+    stream_chunk_size = 2000
+    query_budget = 5
 
     def get(self, request, car_id: int):
         car = Car.objects.filter(pk=car_id).first()
@@ -68,8 +267,82 @@ class CarTripsAPIView(APIView):
         trips = (
             Trip.objects.filter(car_id=car_id)
             .select_related("car")
-            .order_by("-start_date", "-created_at")
+            .order_by("-start_date", "-created_at", "-id")
         )
 
-        serializer = TripSerializer(trips, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        if request.query_params.get("stream") in ("1", "true", "ndjson"):
+            response = StreamingHttpResponse(self.stream_ndjson(trips), content_type="application/x-ndjson")
+            response["Content-Disposition"] = f'attachment; filename="car-{car.pk}-trips.ndjson"'
+            return response
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(trips, request, view=self)
+        serializer = TripSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def stream_ndjson(self, trips):
+        serializer = TripSerializer()
+        for trip in trips.iterator(chunk_size=self.stream_chunk_size):
+            yield json.dumps(serializer.to_representation(trip), cls=DjangoJSONEncoder) + "\n"
+
+
+class TagListAPIView(QueryBudgetMixin, ListAPIView):
+    """Paginated tag lookup for tag pickers; ?search= matches the start of the name."""
+
+    serializer_class = TagSerializer
+    pagination_class = TagPagination
+    query_budget = 4
+
+    def get_queryset(self):
+        tags = Tag.objects.order_by("name")
+        search = self.request.query_params.get("search", "").strip()
+        if search:
+            tags = tags.filter(name__istartswith=search)
+        return tags
+
+
+class LogbookImportAPIView(APIView):
+    """
+    Imports trips or refuels for the current user's cars from an uploaded CSV
+    or JSON Lines file (see logbook.imports). The file is read row by row.
+    Any invalid row rejects the whole file unless skip_invalid is set.
+    """
+
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        params = LogbookImportSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        upload = data["file"]
+        importer = Importer(
+            request.user,
+            data["kind"],
+            skip_invalid=data["skip_invalid"],
+            dry_run=data["dry_run"],
+        )
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            importer.run(read_rows(stream, data.get("format") or format_from_name(upload.name)))
+        except ImportFileError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            stream.detach()
+
+        if importer.error_count and not (data["skip_invalid"] or data["dry_run"]):
+            code = status.HTTP_400_BAD_REQUEST
+        elif importer.created:
+            code = status.HTTP_201_CREATED
+        else:
+            code = status.HTTP_200_OK
+        return Response(
+            {
+                "kind": data["kind"],
+                "rows": importer.rows,
+                "created": importer.created,
+                "error_count": importer.error_count,
+                "errors": importer.errors,
+            },
+            status=code,
+        )
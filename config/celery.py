@@ -4,7 +4,8 @@ from celery.schedules import crontab
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
 
-app = Celery("config")
+# Every task records a core.TaskRun per execution (see core.task_metrics).
+app = Celery("config", task_cls="core.task_metrics:MeasuredTask")
 
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
@@ -13,15 +14,16 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+# Monthly rollups are refreshed on every Trip/Refuel write (see statsapp.signals).
+# statsapp.tasks.recalculate_all_cars_current_month is kept for manual runs only.
 app.conf.beat_schedule = {
     
-    "recalculate-monthly-stats-nightly": {
-        "task": "statsapp.tasks.recalculate_all_cars_current_month",
-        "schedule": crontab(hour=3, minute=10),
-    },
-    
     "send-weekly-summary-email": {
         "task": "logbook.tasks.send_weekly_summary_for_all_users",
         "schedule": crontab(day_of_week=1, hour=9, minute=0),
     },
+    "prune-task-runs": {
+        "task": "core.tasks.prune_task_runs",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
\ No newline at end of file
@@ -56,6 +56,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.SQLInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -102,6 +103,10 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Seconds to keep a user's group names in the shared cache between requests
+# (0 = per-request only). Membership changes invalidate the cached entry.
+ROLE_CACHE_TIMEOUT = int(os.getenv("ROLE_CACHE_TIMEOUT", "0"))
+
 # ==============================================================================
 # INTERNATIONALIZATION
 # ==============================================================================
@@ -161,6 +166,10 @@ TEMPLATES = [
     },
 ]
 
+# Tag pickers show at most this many checkboxes besides the selected tags;
+# the ?tag_q= search of the trip/car forms narrows the list to the rest.
+TAG_CHECKBOX_LIMIT = int(os.getenv("TAG_CHECKBOX_LIMIT", "50"))
+
 # ==============================================================================
 # REST FRAMEWORK
 # ==============================================================================
@@ -195,4 +204,73 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Every task execution is stored as a core.TaskRun (see core.task_metrics);
+# runs slower than TASK_SLOW_MS are also logged with their slowest queries.
+TASK_METRICS_ENABLED = os.getenv("TASK_METRICS_ENABLED", "True").lower() in ("1", "true", "yes", "on")
+TASK_SLOW_MS = int(os.getenv("TASK_SLOW_MS", "30000"))
+# Runs older than this are deleted daily by core.tasks.prune_task_runs.
+TASK_RUN_RETENTION_DAYS = int(os.getenv("TASK_RUN_RETENTION_DAYS", "30"))
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+# Shares the Redis instance used by Celery; falls back to a per-process
+# in-memory cache when REDIS_URL is not configured (local runs, tests).
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "trips",
+        }
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+
+# Seconds to keep computed report and stats results (0 disables the cache).
+# Entries are versioned per user and invalidated by trip/refuel/car writes.
+REPORT_CACHE_TIMEOUT = int(os.getenv("REPORT_CACHE_TIMEOUT", "900"))
+
+# Seconds to keep a car's odometer timeline (see logbook.odometer). Timelines
+# are dropped on every trip/refuel write; the timeout bounds drift from writes
+# that bypass signals.
+ODOMETER_TIMELINE_TIMEOUT = int(os.getenv("ODOMETER_TIMELINE_TIMEOUT", "3600"))
+
+# Seconds to keep the rendered dashboard widgets; keyed on the user's data
+# version like the report cache, so writes show up immediately.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "300"))
+
+# Seconds each process keeps its copy of the FX rate table (see core.currency).
+FX_RATE_CACHE_TIMEOUT = int(os.getenv("FX_RATE_CACHE_TIMEOUT", "300"))
+
+# ==============================================================================
+# STATS
+# ==============================================================================
+# Trip/Refuel writes invalidate and recompute their monthly rollups, so rows are
+# trusted until invalidated. Set STATS_ROLLUP_MAX_AGE (seconds) to additionally
+# treat rollups of a still-open month older than that as stale.
+STATS_ROLLUP_MAX_AGE = int(os.environ["STATS_ROLLUP_MAX_AGE"]) if os.getenv("STATS_ROLLUP_MAX_AGE") else None
+
+# Fan-out jobs dispatch one Celery task per batch of ids instead of one per id.
+STATS_RECALC_BATCH_SIZE = int(os.getenv("STATS_RECALC_BATCH_SIZE", "500"))
+WEEKLY_SUMMARY_BATCH_SIZE = int(os.getenv("WEEKLY_SUMMARY_BATCH_SIZE", "200"))
+
+# Rows per bulk INSERT when importing trip/refuel files (see logbook.imports).
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Exports with more rows than this are built by a Celery job, stored in the
+# default storage and mailed as a link instead of streamed (see core.exports).
+EXPORT_SYNC_MAX_ROWS = int(os.getenv("EXPORT_SYNC_MAX_ROWS", "50000"))
+
+# ==============================================================================
+# SQL INSTRUMENTATION
+# ==============================================================================
+# Every request logs its query count, SQL time and slowest statements and sends
+# a Server-Timing header. Views over their `query_budget` log a warning, or
+# fail the request when QUERY_BUDGET_ENFORCE is on (CI, local debugging).
+SQL_SLOWEST_QUERIES = int(os.getenv("SQL_SLOWEST_QUERIES", "3"))
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "False").lower() in ("1", "true", "yes", "on")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import FxRate, TaskRun
+
+
+@admin.register(TaskRun)
+class TaskRunAdmin(admin.ModelAdmin):
+    list_display = ("task_name", "state", "started_at", "runtime_ms", "queue_wait_ms", "query_count", "retries", "args_preview")
+    list_filter = ("state", "task_name")
+    search_fields = ("task_name", "task_id", "args_preview")
+    date_hierarchy = "started_at"
+    readonly_fields = [f.name for f in TaskRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    list_display = ("currency", "valid_from", "rate")
+    list_filter = ("currency",)
+    date_hierarchy = "valid_from"
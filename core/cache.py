@@ -0,0 +1,75 @@
+"""
+Versioned per-user cache for computed report/stats results.
+
+Every user has a data version number; cache keys embed it, and any write to
+that user's cars, trips or refuels bumps the version (see core.signals), so
+stale entries are simply never read again and expire on their own. Keys
+also embed the global FX version, replaced whenever an FxRate changes, since
+every cached total converted to a preferred currency depends on the rates.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+FX_VERSION_KEY = "fxv"
+
+
+def _version_key(user_id) -> str:
+    return f"datav:{user_id}"
+
+
+def get_data_version(user_id) -> int:
+    return cache.get_or_set(_version_key(user_id), 1, None)
+
+
+def bump_data_version(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # No version stored yet (or it was evicted): any value differing from
+        # what readers may have used works, since their keys are versioned.
+        cache.set(_version_key(user_id), 2, None)
+
+
+def bump_data_versions(user_ids):
+    for user_id in set(user_ids):
+        bump_data_version(user_id)
+
+
+def _new_fx_version() -> str:
+    # Random rather than incremented: after an eviction a counter could repeat
+    # a version that stale entries are still stored under.
+    return uuid4().hex
+
+
+def get_fx_version() -> str:
+    return cache.get_or_set(FX_VERSION_KEY, _new_fx_version, None)
+
+
+def bump_fx_version():
+    cache.set(FX_VERSION_KEY, _new_fx_version(), None)
+
+
+def user_cache_key(namespace: str, user_id, *parts) -> str:
+    suffix = ":".join(str(p) for p in parts)
+    return f"{namespace}:{user_id}:v{get_data_version(user_id)}:fx{get_fx_version()}:{suffix}"
+
+
+def get_or_compute(namespace: str, user_id, parts, compute, timeout=None):
+    """
+    Returns the cached value for (namespace, user, parts) or computes and stores it.
+    Returns (value, hit).
+    """
+    if timeout is None:
+        timeout = getattr(settings, "REPORT_CACHE_TIMEOUT", 0)
+    if not timeout:
+        return compute(), False
+
+    key = user_cache_key(namespace, user_id, *parts)
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+    value = compute()
+    cache.set(key, value, timeout)
+    return value, False
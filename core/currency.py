@@ -0,0 +1,117 @@
+"""
+Currency conversion against the FxRate table: units of a currency per euro,
+each rate valid from its date until the currency's next rate. Pegged
+currencies fall back to their fixed rate where no row covers a date.
+
+Python conversions read a per-process copy of the table, reloaded every
+FX_RATE_CACHE_TIMEOUT seconds and as soon as the shared FX version changes
+(core.cache), which every rate change does in any process.
+converted() does the same conversion in SQL, picking the rate valid on each
+row's date, so rows in mixed currencies can be summed by one aggregate.
+"""
+import bisect
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import get_fx_version
+from .models import FxRate
+
+# Fixed conversion rate of the Bulgarian lev to the euro.
+FX_EUR_BGN = Decimal("1.95583")
+
+BASE_CURRENCY = "EUR"
+PEGGED_RATES = {BASE_CURRENCY: Decimal("1"), "BGN": FX_EUR_BGN}
+
+RATE_FIELD = DecimalField(max_digits=14, decimal_places=6)
+AMOUNT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+# currency -> (sorted valid_from dates, rates)
+_rates = None
+_loaded_at = 0.0
+_loaded_version = None
+
+
+def _rate_table() -> dict:
+    global _rates, _loaded_at, _loaded_version
+    version = get_fx_version()
+    if (
+        _rates is None
+        or version != _loaded_version
+        or time.monotonic() - _loaded_at > settings.FX_RATE_CACHE_TIMEOUT
+    ):
+        table = {}
+        for currency, valid_from, rate in FxRate.objects.order_by("currency", "valid_from").values_list(
+            "currency", "valid_from", "rate"
+        ):
+            dates, rates = table.setdefault(currency, ([], []))
+            dates.append(valid_from)
+            rates.append(rate)
+        _rates, _loaded_at, _loaded_version = table, time.monotonic(), version
+    return _rates
+
+
+def clear_rate_cache():
+    global _rates
+    _rates = None
+
+
+def rate_on(currency: str, day=None) -> Decimal:
+    """Units of `currency` per euro on `day` (today by default)."""
+    if currency == BASE_CURRENCY:
+        return PEGGED_RATES[BASE_CURRENCY]
+    dates, rates = _rate_table().get(currency, ((), ()))
+    i = bisect.bisect_right(dates, day or timezone.localdate())
+    if i:
+        return rates[i - 1]
+    # Unknown currencies are passed through unchanged.
+    return PEGGED_RATES.get(currency, Decimal("1"))
+
+
+def convert(amount, from_currency: str, to_currency: str, day=None) -> Decimal:
+    amount = Decimal(amount or 0)
+    if from_currency == to_currency:
+        return amount
+    return amount / rate_on(from_currency, day) * rate_on(to_currency, day)
+
+
+def to_eur(amount, currency: str, day=None) -> Decimal:
+    return convert(amount, currency, BASE_CURRENCY, day)
+
+
+def _sql_rate(currency, currency_field, date_field):
+    """
+    Rate valid on the outer row's `date_field`; `currency` is a code, or None
+    to use the outer row's `currency_field`.
+    """
+    if currency is None:
+        rates = FxRate.objects.filter(currency=OuterRef(currency_field))
+        fallback = Case(
+            *(When(**{currency_field: code}, then=Value(rate)) for code, rate in PEGGED_RATES.items()),
+            default=Value(Decimal("1")),
+            output_field=RATE_FIELD,
+        )
+    else:
+        rates = FxRate.objects.filter(currency=currency)
+        fallback = Value(PEGGED_RATES.get(currency, Decimal("1")), output_field=RATE_FIELD)
+    latest = rates.filter(valid_from__lte=OuterRef(date_field)).order_by("-valid_from").values("rate")[:1]
+    return Coalesce(Subquery(latest, output_field=RATE_FIELD), fallback, output_field=RATE_FIELD)
+
+
+def converted(amount_field: str, currency_field: str, date_field: str, to_currency) -> ExpressionWrapper:
+    """
+    SQL expression converting `amount_field` from the row's `currency_field`
+    to `to_currency` at the rates valid on the row's `date_field`.
+    `to_currency` is a currency code or an F() of a per-row target, e.g.
+    F("car__owner__preferred_currency").
+    """
+    expression = F(amount_field) / _sql_rate(None, currency_field, date_field)
+    if isinstance(to_currency, F):
+        expression = expression * _sql_rate(None, to_currency.name, date_field)
+    elif to_currency != BASE_CURRENCY:
+        expression = expression * _sql_rate(to_currency, currency_field, date_field)
+    return ExpressionWrapper(expression, output_field=AMOUNT_FIELD)
@@ -0,0 +1,93 @@
+"""
+Per-user dashboard: month-to-date distance and fuel spend, last refuel and
+recent trips of every car.
+
+Everything comes from one prefetch plan: the cars, then per car the latest
+trips and refuels (sliced Prefetch querysets, one query each for all cars)
+and the current month's rollup rows. Cars whose rollup is missing or stale
+are aggregated live with two more queries, like the monthly report, and
+fuel paid in another currency than the user's adds one conversion query.
+"""
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat, MonthlyCarFuelStat
+from core.periods import month_range
+from statsapp.services import (
+    cars_to_convert, converted_fuel_costs, rollup_is_fresh, rows_from_live, rows_from_rollup,
+)
+
+RECENT_TRIPS = 5
+RECENT_REFUELS = 1
+
+
+def build_dashboard(user, today=None) -> dict:
+    today = today or timezone.localdate()
+    year, month = today.year, today.month
+    currency = user.preferred_currency
+
+    cars = list(
+        Car.objects.filter(owner=user)
+        .order_by("brand", "model", "year")
+        .prefetch_related(
+            Prefetch(
+                "trips",
+                queryset=Trip.objects.order_by("-start_date", "-created_at", "-id")[:RECENT_TRIPS],
+                to_attr="recent_trips",
+            ),
+            Prefetch(
+                "refuels",
+                queryset=Refuel.objects.order_by("-date", "-created_at", "-id")[:RECENT_REFUELS],
+                to_attr="recent_refuels",
+            ),
+            Prefetch(
+                "monthly_stats",
+                queryset=MonthlyCarStat.objects.filter(year=year, month=month),
+                to_attr="month_stats",
+            ),
+            Prefetch(
+                "monthly_fuel_stats",
+                queryset=MonthlyCarFuelStat.objects.filter(year=year, month=month),
+                to_attr="month_fuel_stats",
+            ),
+        )
+    )
+
+    now = timezone.now()
+    month_rows, rollup_cars, live_ids = {}, [], []
+    for car in cars:
+        if car.month_stats and rollup_is_fresh(car.month_stats[0], car.month_fuel_stats, now=now):
+            rollup_cars.append(car)
+        else:
+            live_ids.append(car.id)
+    converted_costs = converted_fuel_costs(
+        cars_to_convert((r for car in rollup_cars for r in car.month_fuel_stats), currency),
+        month_range(year, month),
+        currency,
+    )
+    for car in rollup_cars:
+        month_rows[car.id] = rows_from_rollup(car.month_stats[0], car.month_fuel_stats, currency, converted_costs)
+    if live_ids:
+        live_trips, live_fuel = rows_from_live(live_ids, year, month, currency)
+        for car_id in live_ids:
+            month_rows[car_id] = (live_trips.get(car_id), live_fuel.get(car_id, {}))
+
+    widgets = []
+    totals = {"distance_km": 0, "fuel_cost": 0}
+    for car in cars:
+        trips, fuel = month_rows[car.id]
+        distance = trips["total_distance_km"] if trips else 0
+        fuel_cost = sum(r["converted_fuel_cost"] for r in fuel.values())
+        totals["distance_km"] += distance
+        totals["fuel_cost"] += fuel_cost
+        widgets.append({
+            "car": car,
+            "distance_km": distance,
+            "fuel_cost": fuel_cost,
+            "last_refuel": car.recent_refuels[0] if car.recent_refuels else None,
+            "recent_trips": car.recent_trips,
+        })
+
+    return {"year": year, "month": month, "currency": currency, "cars": widgets, "totals": totals}
@@ -0,0 +1,182 @@
+"""
+Tabular exports of a user's trips, refuels, expenses and monthly rollups
+(with the fuel costs per currency, as the rollups keep them).
+
+Rows are read with values_list().iterator(), so memory stays flat however
+long the history is: CSV is streamed straight to the client, XLSX is written
+with openpyxl's write-only workbook to a temporary file first (the format is
+a zip archive). openpyxl is optional; without it only CSV is offered.
+"""
+import csv
+
+from logbook.models import Expense, Refuel, Trip
+from statsapp.models import MonthlyCarFuelStat, MonthlyCarStat
+
+FORMAT_CSV = "csv"
+FORMAT_XLSX = "xlsx"
+FORMATS = (FORMAT_CSV, FORMAT_XLSX)
+
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+CHUNK_SIZE = 2000
+
+
+class Dataset:
+    """
+    One exportable table: `columns` are (header, field path) pairs read with
+    values_list; `owner_field` scopes rows to a user like OwnerQuerySetMixin.
+    """
+
+    def __init__(self, name, model, owner_field, car_field, columns, ordering):
+        self.name = name
+        self.model = model
+        self.owner_field = owner_field
+        self.car_field = car_field
+        self.columns = columns
+        self.ordering = ordering
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def queryset(self, user, car_id=None):
+        qs = self.model.objects.filter(**{self.owner_field: user})
+        if car_id is not None:
+            qs = qs.filter(**{self.car_field: car_id})
+        return qs.order_by(*self.ordering).values_list(*(path for _, path in self.columns))
+
+    def rows(self, user, car_id=None):
+        return self.queryset(user, car_id).iterator(chunk_size=CHUNK_SIZE)
+
+
+CAR_COLUMNS = (
+    ("car_id", "car_id"),
+    ("car_brand", "car__brand"),
+    ("car_model", "car__model"),
+    ("car_year", "car__year"),
+)
+
+DATASETS = {
+    d.name: d
+    for d in (
+        Dataset(
+            "trips", Trip, "car__owner", "car_id",
+            columns=(
+                ("id", "id"),
+                *CAR_COLUMNS,
+                ("start_date", "start_date"),
+                ("end_date", "end_date"),
+                ("start_odometer", "start_odometer"),
+                ("end_odometer", "end_odometer"),
+                ("distance_km", "distance"),
+                ("from_city", "from_city"),
+                ("to_city", "to_city"),
+                ("notes", "notes"),
+            ),
+            ordering=("car_id", "start_date", "id"),
+        ),
+        Dataset(
+            "refuels", Refuel, "car__owner", "car_id",
+            columns=(
+                ("id", "id"),
+                *CAR_COLUMNS,
+                ("date", "date"),
+                ("odometer", "odometer"),
+                ("liters", "liters"),
+                ("total_cost", "total_cost"),
+                ("currency", "currency"),
+                ("is_full_tank", "is_full_tank"),
+                ("fuel_type", "fuel_type"),
+                ("station", "station"),
+            ),
+            ordering=("car_id", "date", "id"),
+        ),
+        Dataset(
+            "expenses", Expense, "trip__car__owner", "trip__car_id",
+            columns=(
+                ("id", "id"),
+                ("trip_id", "trip_id"),
+                ("car_id", "trip__car_id"),
+                ("trip_date", "trip__start_date"),
+                ("expense_type", "expense_type"),
+                ("amount", "amount"),
+                ("note", "note"),
+                ("created_at", "created_at"),
+            ),
+            ordering=("trip__car_id", "trip__start_date", "id"),
+        ),
+        Dataset(
+            "monthly", MonthlyCarStat, "car__owner", "car_id",
+            columns=(
+                ("year", "year"),
+                ("month", "month"),
+                *CAR_COLUMNS,
+                ("trips_count", "trips_count"),
+                ("total_distance_km", "total_distance_km"),
+                ("refuels_count", "refuels_count"),
+                ("total_fuel_liters", "total_fuel_liters"),
+                ("updated_at", "updated_at"),
+            ),
+            ordering=("car_id", "year", "month"),
+        ),
+        Dataset(
+            "monthly-fuel", MonthlyCarFuelStat, "car__owner", "car_id",
+            columns=(
+                ("year", "year"),
+                ("month", "month"),
+                *CAR_COLUMNS,
+                ("currency", "currency"),
+                ("refuels_count", "refuels_count"),
+                ("total_fuel_liters", "total_fuel_liters"),
+                ("total_fuel_cost", "total_fuel_cost"),
+                ("updated_at", "updated_at"),
+            ),
+            ordering=("car_id", "year", "month", "currency"),
+        ),
+    )
+}
+
+
+def xlsx_available() -> bool:
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(dataset, rows):
+    # The BOM makes Excel open the UTF-8 file with the right encoding.
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(dataset.headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(dataset, rows, fileobj):
+    """Writes rows to a text file object."""
+    for line in iter_csv(dataset, rows):
+        fileobj.write(line)
+
+
+def write_xlsx(dataset, rows, fileobj):
+    """Writes rows to a binary file object with a write-only (streaming) workbook."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(dataset.name)
+    sheet.append(dataset.headers)
+    for row in rows:
+        # Excel has no timezone support; write aware datetimes as naive UTC.
+        sheet.append([v.replace(tzinfo=None) if getattr(v, "tzinfo", None) else v for v in row])
+    workbook.save(fileobj)
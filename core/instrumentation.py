@@ -0,0 +1,64 @@
+import heapq
+import time
+
+from django.conf import settings
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view issued more queries than its declared query_budget."""
+
+
+class QueryStats:
+    """
+    connection.execute_wrapper callable that counts statements, sums their
+    time and keeps the slowest ones.
+    """
+
+    def __init__(self, keep_slowest=None):
+        self.count = 0
+        self.total_ms = 0.0
+        self.keep_slowest = keep_slowest if keep_slowest is not None else settings.SQL_SLOWEST_QUERIES
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            entry = (elapsed, self.count, sql)
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, entry)
+            elif self.keep_slowest:
+                heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """[(ms, sql)] of the slowest statements, slowest first."""
+        return [(ms, sql) for ms, _, sql in sorted(self._slowest, reverse=True)]
+
+
+def over_budget(stats, budget) -> bool:
+    return budget is not None and stats.count > budget
+
+
+def check_query_budget(stats, budget, label):
+    """
+    Returns a message when `stats` went over `budget`, raising instead when
+    settings.QUERY_BUDGET_ENFORCE is on (used to fail tests).
+    """
+    if not over_budget(stats, budget):
+        return None
+    message = f"{label} issued {stats.count} queries, budget is {budget}."
+    if settings.QUERY_BUDGET_ENFORCE:
+        raise QueryBudgetExceeded(message)
+    return message
+
+
+def server_timing(stats, total_ms) -> str:
+    return (
+        f'sql;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+        f"app;dur={max(0.0, total_ms - stats.total_ms):.1f}"
+    )
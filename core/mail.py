@@ -0,0 +1,14 @@
+from django.core.mail import get_connection
+
+
+def send_messages(messages, fail_silently: bool = True) -> int:
+    """
+    Sends already rendered EmailMessage objects over a single backend connection
+    (one SMTP login/TLS handshake for the whole batch).
+    Returns the number of messages sent.
+    """
+    messages = list(messages)
+    if not messages:
+        return 0
+    connection = get_connection(fail_silently=fail_silently)
+    return connection.send_messages(messages) or 0
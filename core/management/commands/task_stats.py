@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from core.models import TaskRun
+from core.task_metrics import delete_old_task_runs
+
+
+class Command(BaseCommand):
+    help = "Summarizes recorded Celery task runs: runtime, queue wait, queries and retries per task."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Look back this many hours. Default: 24.")
+        parser.add_argument("--task", help="Break one task down by arguments (e.g. which cars or users dominate).")
+        parser.add_argument("--top", type=int, default=10, help="Rows to show with --task. Default: 10.")
+        parser.add_argument("--prune", action="store_true", help="Delete runs older than TASK_RUN_RETENTION_DAYS and exit.")
+        parser.add_argument("--prune-days", type=int, help="Like --prune, with this many days instead.")
+
+    def handle(self, *args, **options):
+        if options["prune"] or options["prune_days"] is not None:
+            if options["prune_days"] is not None and options["prune_days"] < 1:
+                raise CommandError("--prune-days must be at least 1.")
+            deleted = delete_old_task_runs(options["prune_days"])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} task runs."))
+            return
+
+        runs = TaskRun.objects.filter(started_at__gte=timezone.now() - timedelta(hours=options["hours"]))
+        if options["task"]:
+            self.show_task(runs.filter(task_name=options["task"]), options["task"], options["top"])
+        else:
+            self.show_summary(runs)
+
+    def show_summary(self, runs):
+        rows = (
+            runs.values("task_name")
+            .annotate(
+                runs=Count("id"),
+                failures=Count("id", filter=Q(state=TaskRun.State.FAILURE)),
+                retries=Count("id", filter=Q(state=TaskRun.State.RETRY)),
+                total_ms=Sum("runtime_ms"),
+                avg_ms=Avg("runtime_ms"),
+                max_ms=Max("runtime_ms"),
+                avg_wait_ms=Avg("queue_wait_ms"),
+                queries=Sum("query_count"),
+            )
+            .order_by("-total_ms")
+        )
+        if not rows:
+            self.stdout.write("No task runs recorded.")
+            return
+
+        self.stdout.write(
+            f"{'task':<55} {'runs':>6} {'fail':>5} {'retry':>5} {'total s':>9} "
+            f"{'avg ms':>9} {'max ms':>9} {'wait ms':>9} {'queries':>8}"
+        )
+        for r in rows:
+            wait = f"{r['avg_wait_ms']:.0f}" if r["avg_wait_ms"] is not None else "-"
+            self.stdout.write(
+                f"{r['task_name']:<55} {r['runs']:>6} {r['failures']:>5} {r['retries']:>5} "
+                f"{r['total_ms'] / 1000:>9.1f} {r['avg_ms']:>9.0f} {r['max_ms']:>9.0f} {wait:>9} {r['queries']:>8}"
+            )
+
+    def show_task(self, runs, task_name, top):
+        rows = (
+            runs.values("args_preview")
+            .annotate(
+                runs=Count("id"),
+                total_ms=Sum("runtime_ms"),
+                max_ms=Max("runtime_ms"),
+                queries=Sum("query_count"),
+            )
+            .order_by("-total_ms")[:top]
+        )
+        if not rows:
+            self.stdout.write(f"No runs of {task_name} recorded.")
+            return
+
+        self.stdout.write(f"{'total s':>9} {'runs':>6} {'max ms':>9} {'queries':>8}  arguments")
+        for r in rows:
+            self.stdout.write(
+                f"{r['total_ms'] / 1000:>9.1f} {r['runs']:>6} {r['max_ms']:>9.0f} {r['queries']:>8}  {r['args_preview']}"
+            )
@@ -0,0 +1,68 @@
+import logging
+import time
+
+from django.db import connection
+
+from .instrumentation import QueryStats, check_query_budget, server_timing
+
+logger = logging.getLogger(__name__)
+
+SQL_PREVIEW_LENGTH = 200
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Records the queries of every request through connection.execute_wrapper
+    and reports them as one structured log line plus a Server-Timing header.
+
+    Views declare `query_budget` (see also api.mixins.QueryBudgetMixin); going
+    over it logs a warning, or raises when QUERY_BUDGET_ENFORCE is on.
+    Queries issued while a streaming response is consumed are logged when the
+    stream ends.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        start = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        response["Server-Timing"] = server_timing(stats, total_ms)
+        if response.streaming:
+            response.streaming_content = self._stream(request, response, response.streaming_content, stats, start)
+        else:
+            self._report(request, response, stats, total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        request.query_budget = getattr(view_class, "query_budget", None)
+
+    def _stream(self, request, response, content, stats, start):
+        try:
+            with connection.execute_wrapper(stats):
+                yield from content
+        finally:
+            self._report(request, response, stats, (time.perf_counter() - start) * 1000)
+
+    def _report(self, request, response, stats, total_ms):
+        match = request.resolver_match
+        view = match.view_name if match else "-"
+        budget = getattr(request, "query_budget", None)
+
+        slowest = " | ".join(
+            f"{ms:.1f}ms {' '.join(sql.split())[:SQL_PREVIEW_LENGTH]}" for ms, sql in stats.slowest
+        )
+        logger.info(
+            'sql_stats method=%s path=%s view=%s status=%s queries=%d sql_ms=%.1f total_ms=%.1f budget=%s slowest="%s"',
+            request.method, request.path, view, response.status_code,
+            stats.count, stats.total_ms, total_ms, budget if budget is not None else "-", slowest,
+        )
+
+        message = check_query_budget(stats, budget, f"{request.method} {view}")
+        if message:
+            logger.warning("query_budget_exceeded %s", message)
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255)),
+                ('task_name', models.CharField(max_length=255)),
+                ('args_preview', models.CharField(blank=True, max_length=200)),
+                ('state', models.CharField(choices=[('SUCCESS', 'Success'), ('FAILURE', 'Failure'), ('RETRY', 'Retry')], max_length=16)),
+                ('started_at', models.DateTimeField()),
+                ('runtime_ms', models.FloatField()),
+                ('queue_wait_ms', models.FloatField(blank=True, null=True)),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('sql_ms', models.FloatField(default=0)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ('-started_at',),
+                'indexes': [models.Index(fields=['task_name', '-started_at'], name='taskrun_name_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('valid_from', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=6, max_digits=14)),
+            ],
+            options={
+                'ordering': ('currency', '-valid_from'),
+                'constraints': [models.UniqueConstraint(fields=('currency', 'valid_from'), name='fxrate_currency_valid_from_uniq')],
+            },
+        ),
+    ]
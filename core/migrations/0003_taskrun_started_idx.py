@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_fxrate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskrun',
+            index=models.Index(fields=['started_at'], name='taskrun_started_idx'),
+        ),
+    ]
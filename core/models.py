@@ -1,3 +1,53 @@
 from django.db import models
 
-# Create your models here.
+
+class TaskRun(models.Model):
+    """One execution of a Celery task, recorded by core.task_metrics."""
+
+    class State(models.TextChoices):
+        SUCCESS = "SUCCESS", "Success"
+        FAILURE = "FAILURE", "Failure"
+        RETRY = "RETRY", "Retry"
+
+    task_id = models.CharField(max_length=255)
+    task_name = models.CharField(max_length=255)
+    args_preview = models.CharField(max_length=200, blank=True)
+    state = models.CharField(max_length=16, choices=State.choices)
+
+    started_at = models.DateTimeField()
+    runtime_ms = models.FloatField()
+    queue_wait_ms = models.FloatField(null=True, blank=True)
+    query_count = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    retries = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("-started_at",)
+        indexes = [
+            models.Index(fields=["task_name", "-started_at"], name="taskrun_name_started_idx"),
+            # Serves the time-window summary and the retention prune.
+            models.Index(fields=["started_at"], name="taskrun_started_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} | {self.state} | {self.runtime_ms:.0f}ms"
+
+
+class FxRate(models.Model):
+    """Units of `currency` per euro, valid from `valid_from` until the currency's next rate."""
+
+    currency = models.CharField(max_length=3)
+    valid_from = models.DateField()
+    rate = models.DecimalField(max_digits=14, decimal_places=6)
+
+    class Meta:
+        ordering = ("currency", "-valid_from")
+        constraints = [
+            # Also the index behind the "rate valid on a date" lookups (core.currency).
+            models.UniqueConstraint(fields=["currency", "valid_from"], name="fxrate_currency_valid_from_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.currency} {self.rate} from {self.valid_from}"
@@ -0,0 +1,132 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    if not isinstance(values, list):
+        raise ValueError("Cursor must encode a list.")
+    return values
+
+
+class KeysetPage:
+    """Page of a keyset-paginated list. Quacks like django.core.paginator.Page in templates."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def keyset_values(keyset, obj) -> list:
+    return [getattr(obj, f.lstrip("-")) for f in keyset]
+
+
+def decode_keyset_cursor(model, keyset, cursor) -> list:
+    """Field values of `keyset` from a cursor; raises ValueError when it is not one of ours."""
+    try:
+        values = decode_cursor(cursor)
+        if len(values) != len(keyset):
+            raise ValueError("Cursor does not match the keyset.")
+        return [model._meta.get_field(f.lstrip("-")).to_python(v) for f, v in zip(keyset, values)]
+    except (TypeError, ValidationError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def seek_q(keyset, values, forward: bool) -> Q:
+    # (a, b, c) past (x, y, z) == a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+    # with the comparison flipped for descending fields or when seeking backwards.
+    q = Q()
+    equal = {}
+    for ordering, value in zip(keyset, values):
+        name = ordering.lstrip("-")
+        op = "lt" if ordering.startswith("-") == forward else "gt"
+        q |= Q(**equal, **{f"{name}__{op}": value})
+        equal[name] = value
+    return q
+
+
+def seek_page(queryset, keyset, page_size, after=None, before=None):
+    """
+    Rows of `queryset` in `keyset` order that follow the `after` cursor, or
+    precede the `before` cursor, or the first page. Returns (rows,
+    next_cursor, previous_cursor); a cursor is None when there is no page
+    that way. Raises ValueError for a cursor that does not decode.
+    """
+    if before:
+        reverse_ordering = [f[1:] if f.startswith("-") else f"-{f}" for f in keyset]
+        values = decode_keyset_cursor(queryset.model, keyset, before)
+        rows = list(
+            queryset.filter(seek_q(keyset, values, forward=False))
+            .order_by(*reverse_ordering)[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        next_cursor = encode_cursor(keyset_values(keyset, rows[-1])) if rows else before
+        previous_cursor = encode_cursor(keyset_values(keyset, rows[0])) if has_more else None
+        return rows, next_cursor, previous_cursor
+
+    queryset = queryset.order_by(*keyset)
+    if after:
+        queryset = queryset.filter(seek_q(keyset, decode_keyset_cursor(queryset.model, keyset, after), forward=True))
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(keyset_values(keyset, rows[-1])) if has_more else None
+    previous_cursor = encode_cursor(keyset_values(keyset, rows[0])) if after and rows else None
+    return rows, next_cursor, previous_cursor
+
+
+class KeysetPaginationMixin:
+    """
+    Seek pagination for ListView: pages are addressed by the sort key of the
+    last (?after=) or first (?before=) row seen instead of OFFSET, so every page
+    costs the same index range scan. `keyset` must be a unique ordering, hence
+    the trailing id.
+    """
+
+    keyset = ("-id",)
+    paginate_by = 25
+
+    def get_ordering(self):
+        return self.keyset
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            rows, next_cursor, previous_cursor = seek_page(
+                queryset,
+                self.keyset,
+                page_size,
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except ValueError:
+            raise Http404("Invalid cursor.")
+
+        page = KeysetPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
+        return (None, page, rows, page.has_other_pages())
@@ -0,0 +1,53 @@
+"""
+Half-open date ranges for month/period filters.
+
+Filtering with `field__gte=start, field__lt=end` keeps the predicate sargable,
+whereas `field__year`/`field__month` compile to EXTRACT() expressions that cannot
+use a plain date index.
+"""
+import datetime
+
+
+def month_start(year: int, month: int) -> datetime.date:
+    return datetime.date(year, month, 1)
+
+
+def next_month_start(year: int, month: int) -> datetime.date:
+    if month == 12:
+        return datetime.date(year + 1, 1, 1)
+    return datetime.date(year, month + 1, 1)
+
+
+def month_range(year: int, month: int):
+    """Returns (start, end) with end exclusive for the given month."""
+    return month_start(year, month), next_month_start(year, month)
+
+
+def months_range(start, end):
+    """(start, end) dates for an inclusive range of (year, month) tuples; either side may be None."""
+    return (
+        month_start(*start) if start else None,
+        next_month_start(*end) if end else None,
+    )
+
+
+def iter_months(start, end):
+    """Yields (year, month) tuples from start to end, both inclusive."""
+    year, month = start
+    while (year, month) <= end:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def range_filter(field: str, start=None, end=None) -> dict:
+    """
+    Filter kwargs for start <= field < end; missing bounds are left out.
+
+        Trip.objects.filter(**range_filter("start_date", *month_range(2025, 3)))
+    """
+    lookups = {}
+    if start is not None:
+        lookups[f"{field}__gte"] = start
+    if end is not None:
+        lookups[f"{field}__lt"] = end
+    return lookups
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Set on the user instance, which lives exactly as long as the request.
+REQUEST_CACHE_ATTR = "_role_names"
+
+MANAGERS = "Managers"
+DRIVERS = "Drivers"
+
+
+def _cache_key(user_id) -> str:
+    return f"roles:{user_id}"
+
+
+def get_user_roles(user) -> frozenset:
+    """
+    Group names of the user, loaded with one query per request.
+
+    When ROLE_CACHE_TIMEOUT is set the names are also kept in the shared cache
+    across requests; group membership changes invalidate it (see core.signals).
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, REQUEST_CACHE_ATTR, None)
+    if roles is not None:
+        return roles
+
+    timeout = getattr(settings, "ROLE_CACHE_TIMEOUT", 0)
+    if timeout:
+        roles = cache.get(_cache_key(user.pk))
+    if roles is None:
+        roles = frozenset(user.groups.values_list("name", flat=True))
+        if timeout:
+            cache.set(_cache_key(user.pk), roles, timeout)
+
+    setattr(user, REQUEST_CACHE_ATTR, roles)
+    return roles
+
+
+def has_role(user, role: str) -> bool:
+    return role in get_user_roles(user)
+
+
+def invalidate_user_roles(user_ids):
+    cache.delete_many([_cache_key(pk) for pk in user_ids])
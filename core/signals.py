@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from logbook.signals import previous_placement
+from .cache import bump_data_version, bump_data_versions, bump_fx_version
+from .currency import clear_rate_cache
+from .models import FxRate
+from .roles import REQUEST_CACHE_ATTR, invalidate_user_roles
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        # user.groups.add(...) / remove / clear
+        instance.__dict__.pop(REQUEST_CACHE_ATTR, None)
+        invalidate_user_roles([instance.pk])
+    elif action == "pre_clear":
+        # group.user_set.clear(): pk_set is not provided, collect members first.
+        invalidate_user_roles(list(instance.user_set.values_list("pk", flat=True)))
+    else:
+        invalidate_user_roles(pk_set or [])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_change(sender, instance, **kwargs):
+    if instance.pk:
+        invalidate_user_roles(list(instance.user_set.values_list("pk", flat=True)))
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def invalidate_cached_results_on_car_change(sender, instance, **kwargs):
+    bump_data_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+@receiver(post_save, sender=Refuel)
+@receiver(post_delete, sender=Refuel)
+def invalidate_cached_results_on_logbook_change(sender, instance, raw=False, signal=None, origin=None, **kwargs):
+    # Rows deleted along with their car: the car's own handler bumps the owner once.
+    if raw or isinstance(origin, Car):
+        return
+    car_ids = {instance.car_id}
+    previous = previous_placement(instance) if signal is post_save else None
+    if previous:
+        # A row moved to another car changes the previous car owner's results too.
+        car_ids.add(previous[0])
+
+    if len(car_ids) == 1 and sender.car.is_cached(instance):
+        owner_ids = [instance.car.owner_id]
+    else:
+        owner_ids = Car.objects.filter(pk__in=car_ids).values_list("owner_id", flat=True)
+    bump_data_versions(owner_ids)
+
+
+@receiver(post_save, sender=FxRate)
+@receiver(post_delete, sender=FxRate)
+def reload_rates_on_change(sender, **kwargs):
+    # Retires every cached converted total and, in other processes, their rate tables.
+    bump_fx_version()
+    clear_rate_cache()
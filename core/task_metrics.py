@@ -0,0 +1,117 @@
+"""
+Per-execution metrics for Celery tasks: every run is stored as one TaskRun
+with its runtime, time spent in the queue, DB queries and retries. Tasks
+slower than TASK_SLOW_MS are also logged with their slowest statements.
+
+MeasuredTask (the app's task class, see config.celery) wraps the task body,
+so the query counter is always removed again however the task ends. Runs
+older than TASK_RUN_RETENTION_DAYS are deleted by core.tasks.prune_task_runs.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from celery import Task
+from celery.exceptions import Retry
+from celery.signals import before_task_publish
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .instrumentation import QueryStats
+
+logger = logging.getLogger(__name__)
+
+SENT_AT_HEADER = "sent_at"
+ARGS_PREVIEW_LENGTH = 200
+
+
+def args_preview(args, kwargs) -> str:
+    parts = [repr(a) for a in args or ()]
+    parts += [f"{k}={v!r}" for k, v in (kwargs or {}).items()]
+    preview = ", ".join(parts)
+    if len(preview) > ARGS_PREVIEW_LENGTH:
+        preview = preview[:ARGS_PREVIEW_LENGTH - 3] + "..."
+    return preview
+
+
+@before_task_publish.connect
+def stamp_sent_at(headers=None, **kwargs):
+    if headers is not None and settings.TASK_METRICS_ENABLED:
+        headers.setdefault(SENT_AT_HEADER, time.time())
+
+
+def queue_wait_ms(request):
+    # Worker requests expose message headers as attributes; eager ones keep them in .headers.
+    sent_at = getattr(request, SENT_AT_HEADER, None) or (request.headers or {}).get(SENT_AT_HEADER)
+    return max(0.0, (time.time() - sent_at) * 1000) if sent_at else None
+
+
+class MeasuredTask(Task):
+    """Task base class that records a TaskRun around every execution of the task body."""
+
+    def __call__(self, *args, **kwargs):
+        # Plain function calls of a task are not task runs.
+        if not settings.TASK_METRICS_ENABLED or self.request.called_directly:
+            return super().__call__(*args, **kwargs)
+
+        stats = QueryStats()
+        wait_ms = queue_wait_ms(self.request)
+        started_at = timezone.now()
+        start = time.perf_counter()
+        error = None
+        try:
+            with connection.execute_wrapper(stats):
+                return super().__call__(*args, **kwargs)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            runtime_ms = (time.perf_counter() - start) * 1000
+            record_task_run(self, args, kwargs, error, started_at, runtime_ms, wait_ms, stats)
+
+
+def record_task_run(task, args, kwargs, exc, started_at, runtime_ms, wait_ms, stats):
+    # Imported here: the task class is resolved while Celery loads, before the app registry is ready.
+    from .models import TaskRun
+
+    if exc is None:
+        state, error = TaskRun.State.SUCCESS, ""
+    elif isinstance(exc, Retry):
+        state, error = TaskRun.State.RETRY, str(exc)
+    else:
+        state, error = TaskRun.State.FAILURE, f"{type(exc).__name__}: {exc}"
+
+    try:
+        TaskRun.objects.create(
+            task_id=task.request.id or "",
+            task_name=task.name,
+            args_preview=args_preview(args, kwargs),
+            state=state,
+            started_at=started_at,
+            runtime_ms=runtime_ms,
+            queue_wait_ms=wait_ms,
+            query_count=stats.count,
+            sql_ms=stats.total_ms,
+            retries=task.request.retries or 0,
+            error=error,
+        )
+    except Exception:
+        # Metrics must never fail the task they describe.
+        logger.exception("Could not record task run %s", task.request.id)
+
+    if runtime_ms >= settings.TASK_SLOW_MS:
+        logger.warning(
+            'slow_task name=%s id=%s runtime_ms=%.1f queries=%d sql_ms=%.1f slowest="%s"',
+            task.name, task.request.id, runtime_ms, stats.count, stats.total_ms,
+            " | ".join(f"{ms:.1f}ms {' '.join(sql.split())[:200]}" for ms, sql in stats.slowest),
+        )
+
+
+def delete_old_task_runs(days=None) -> int:
+    """Deletes runs started more than `days` (default TASK_RUN_RETENTION_DAYS) ago; returns how many."""
+    from .models import TaskRun
+
+    days = settings.TASK_RUN_RETENTION_DAYS if days is None else days
+    deleted, _ = TaskRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
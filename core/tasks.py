@@ -0,0 +1,67 @@
+import io
+import tempfile
+import uuid
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from .exports import DATASETS, FORMAT_CSV, write_csv, write_xlsx
+from .mail import send_messages
+from .task_metrics import delete_old_task_runs
+
+User = get_user_model()
+
+
+def export_ready_message(user, dataset, url) -> EmailMessage:
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or "noreply@example.com"
+    return EmailMessage(
+        subject=f"Your {dataset.name} export is ready",
+        body=f"Hi {user.username},\n\nYour {dataset.name} export can be downloaded here:\n{url}\n",
+        from_email=from_email,
+        to=[user.email],
+    )
+
+
+@shared_task
+def export_dataset(user_id: int, dataset_name: str, fmt: str, car_id=None) -> str:
+    """
+    Writes a full export to the default storage backend and mails the user a
+    link to it. Used for exports too large to stream within a request.
+    Returns the stored file name ("" when the user no longer exists).
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return ""
+    dataset = DATASETS[dataset_name]
+
+    with tempfile.TemporaryFile() as tmp:
+        rows = dataset.rows(user, car_id)
+        if fmt == FORMAT_CSV:
+            text = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+            write_csv(dataset, rows, text)
+            text.flush()
+            text.detach()
+        else:
+            write_xlsx(dataset, rows, tmp)
+        tmp.seek(0)
+
+        stamp = timezone.localdate().isoformat()
+        # The random directory keeps export URLs unguessable on public storage.
+        name = default_storage.save(
+            f"exports/{user.pk}/{uuid.uuid4().hex}/{dataset.name}-{stamp}.{fmt}", File(tmp)
+        )
+
+    if user.email:
+        send_messages([export_ready_message(user, dataset, default_storage.url(name))])
+    return name
+
+
+@shared_task(ignore_result=True)
+def prune_task_runs() -> int:
+    """Deletes TaskRun rows older than TASK_RUN_RETENTION_DAYS; scheduled daily."""
+    return delete_old_task_runs()
@@ -1,5 +1,8 @@
 from django import template
 
+from core.exports import xlsx_available as _xlsx_available
+from core.roles import has_role
+
 register = template.Library()
 
 
@@ -33,8 +36,11 @@ def money(value, currency_code: str = "BGN"):
 
 @register.simple_tag(takes_context=True)
 def has_group(context, group_name):
-    user = context.get("request").user
-    if not user or not user.is_authenticated:
-        return False
+    request = context.get("request")
+    return has_role(getattr(request, "user", None), group_name)
+
 
-    return user.groups.filter(name=group_name).exists()
+@register.simple_tag
+def xlsx_available():
+    """Whether XLSX exports can be served (openpyxl is installed)."""
+    return _xlsx_available()
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+
+from core.instrumentation import QueryStats
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+# BENCHMARK_SCALE picks the seeded fleet size; the regular test run uses "1k".
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SCALE = os.getenv("BENCHMARK_SCALE", "1k")
+RECORD = os.getenv("BENCHMARK_RECORD") == "1"
+# Wall time depends on the machine, so the regular test run only checks query counts;
+# wall time budgets are recorded (and checked) on PostgreSQL with BENCHMARK_WALL_TIME=1.
+CHECK_WALL_TIME = os.getenv("BENCHMARK_WALL_TIME") == "1"
+
+
+class Measurement(QueryStats):
+    """QueryStats of the measured block, plus its wall time."""
+
+    def __init__(self):
+        super().__init__(keep_slowest=3)
+        self.wall_ms = 0.0
+
+    def __repr__(self):
+        return f"queries={self.count} db={self.total_ms:.1f}ms wall={self.wall_ms:.1f}ms"
+
+
+@contextmanager
+def measure():
+    """Counts the queries and DB time of the block, and its wall time."""
+    m = Measurement()
+    start = time.perf_counter()
+    with connection.execute_wrapper(m):
+        yield m
+    m.wall_ms = (time.perf_counter() - start) * 1000
+
+
+def load_budgets() -> dict:
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def save_budgets(budgets: dict):
+    with open(BUDGETS_PATH, "w") as f:
+        json.dump(budgets, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,90 @@
+import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from garage.models import Car
+from logbook.models import Tag, Trip, Refuel
+from .helpers import create_user
+
+BRANDS = (
+    ("VW", "Golf"),
+    ("Skoda", "Octavia"),
+    ("Toyota", "Corolla"),
+    ("Opel", "Astra"),
+    ("Ford", "Focus"),
+)
+CITIES = ("Sofia", "Plovdiv", "Varna", "Burgas", "Ruse", "Stara Zagora")
+
+
+def seed_fleet(owners=1, cars_per_owner=5, trips=1000, refuel_every=4, days=3 * 365, batch_size=5000):
+    """
+    Seeds a realistic fleet with bulk inserts: `owners` users with
+    `cars_per_owner` cars each and `trips` trips spread evenly over the cars
+    and the last `days` days, plus one refuel every `refuel_every` trips.
+    Odometers grow monotonically per car, every tenth trip gets a tag and
+    refuel currencies alternate between BGN and EUR.
+    Returns the list of owners.
+    """
+    today = timezone.localdate()
+    users = [create_user(f"fleet{i}") for i in range(owners)]
+    cars = Car.objects.bulk_create(
+        Car(
+            owner=user,
+            brand=BRANDS[n % len(BRANDS)][0],
+            model=BRANDS[n % len(BRANDS)][1],
+            year=2010 + n % 15,
+            fuel=Car.FuelChoices.DIESEL,
+            gearbox=Car.GearboxChoices.MANUAL,
+        )
+        for user in users
+        for n in range(cars_per_owner)
+    )
+    tags = [Tag.objects.get_or_create(name=name)[0] for name in ("Business", "Highway", "Vacation")]
+
+    trips_per_car = max(1, trips // len(cars))
+    trip_batch, refuel_batch = [], []
+    for car in cars:
+        odometer = 10_000
+        for i in range(trips_per_car):
+            day = today - datetime.timedelta(days=days - 1 - i * days // trips_per_car)
+            distance = 20 + (i * 37) % 280
+            trip_batch.append(Trip(
+                car=car,
+                created_by_id=car.owner_id,
+                start_odometer=odometer,
+                end_odometer=odometer + distance,
+                start_date=day,
+                end_date=day,
+                from_city=CITIES[i % len(CITIES)],
+                to_city=CITIES[(i + 1) % len(CITIES)],
+            ))
+            odometer += distance
+            if refuel_every and i % refuel_every == 0:
+                refuel_batch.append(Refuel(
+                    car=car,
+                    created_by_id=car.owner_id,
+                    date=day,
+                    odometer=odometer,
+                    liters=Decimal("40.00"),
+                    total_cost=Decimal("100.00") if i % 2 else Decimal("52.00"),
+                    currency=Refuel.CurrencyChoices.BGN if i % 2 else Refuel.CurrencyChoices.EUR,
+                ))
+            if len(trip_batch) >= batch_size:
+                _flush(trip_batch, refuel_batch, tags, batch_size)
+    _flush(trip_batch, refuel_batch, tags, batch_size)
+    return users
+
+
+def _flush(trip_batch, refuel_batch, tags, batch_size):
+    Trip.objects.bulk_create(trip_batch, batch_size=batch_size)
+    Refuel.objects.bulk_create(refuel_batch, batch_size=batch_size)
+
+    # bulk_create only sets primary keys on backends that support RETURNING.
+    tagged = [t for n, t in enumerate(trip_batch) if n % 10 == 0 and t.pk]
+    Trip.tags.through.objects.bulk_create(
+        [Trip.tags.through(trip_id=t.pk, tag_id=tags[n % len(tags)].pk) for n, t in enumerate(tagged)],
+        batch_size=batch_size,
+    )
+    trip_batch.clear()
+    refuel_batch.clear()
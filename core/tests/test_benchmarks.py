@@ -0,0 +1,174 @@
+import datetime
+import math
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, tag
+from django.urls import reverse
+from django.utils import timezone
+
+from garage.models import Car
+from logbook.tasks import send_weekly_summary_batch, send_weekly_summary_for_all_users
+from statsapp.tasks import (
+    rebuild_monthly_stats_range,
+    recalculate_all_cars_current_month,
+    recalculate_monthly_stats_batch,
+)
+from .benchmark import CHECK_WALL_TIME, RECORD, SCALE, SCALES, load_budgets, measure, save_budgets
+from .factories import seed_fleet
+
+OWNERS = 5
+
+
+@tag("benchmark")
+class BenchmarkTests(TestCase):
+    """
+    Measures query count, DB time and wall time of the list/report views, the
+    API endpoints and the Celery tasks against a seeded fleet, and fails when
+    a measurement goes over the budget recorded in budgets.json for the
+    current BENCHMARK_SCALE.
+
+    BENCHMARK_SCALE=100k|1m seeds a bigger fleet (use PostgreSQL); a scale
+    or measurement without a recorded budget fails.
+    BENCHMARK_WALL_TIME=1 checks wall times as well as query counts;
+    BENCHMARK_RECORD=1 rewrites the budgets of that scale from this run
+    (with wall times only together with BENCHMARK_WALL_TIME=1).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.budgets = load_budgets()
+        cls.recorded = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if RECORD and cls.recorded:
+            cls.budgets.setdefault(SCALE, {}).update(cls.recorded)
+            save_budgets(cls.budgets)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        trips = SCALES[SCALE]
+        cls.owners = seed_fleet(owners=OWNERS, cars_per_owner=max(4, trips // 5000 // OWNERS), trips=trips)
+        cls.owner = cls.owners[0]
+        cls.car = Car.objects.filter(owner=cls.owner).order_by("id").first()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def assertWithinBudget(self, name, measurement):
+        if RECORD:
+            # Query counts must match exactly; leave headroom for timing noise.
+            self.recorded[name] = {"queries": measurement.count}
+            if CHECK_WALL_TIME:
+                self.recorded[name]["wall_ms"] = math.ceil(measurement.wall_ms * 1.5)
+            return
+
+        budget = self.budgets.get(SCALE, {}).get(name)
+        if budget is None:
+            self.fail(f"No budget recorded for {name} at scale {SCALE}; run with BENCHMARK_RECORD=1.")
+        self.assertLessEqual(
+            measurement.count, budget["queries"],
+            f"{name}: {measurement} over {budget}; slowest: {measurement.slowest}",
+        )
+        if CHECK_WALL_TIME:
+            if "wall_ms" not in budget:
+                self.fail(f"No wall time recorded for {name} at scale {SCALE}; record it with BENCHMARK_WALL_TIME=1.")
+            self.assertLessEqual(
+                measurement.wall_ms, budget["wall_ms"], f"{name}: {measurement} over {budget}"
+            )
+
+    def measure_get(self, name, url, data=None):
+        with measure() as m:
+            resp = self.client.get(url, data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertWithinBudget(name, m)
+        return resp
+
+    def test_trip_list(self):
+        resp = self.measure_get("trip_list", reverse("trip-list"))
+        cursor = resp.context["page_obj"].next_cursor
+        self.measure_get("trip_list_next_page", reverse("trip-list"), {"after": cursor})
+
+    def test_refuel_list(self):
+        resp = self.measure_get("refuel_list", reverse("refuel-list"))
+        cursor = resp.context["page_obj"].next_cursor
+        self.measure_get("refuel_list_next_page", reverse("refuel-list"), {"after": cursor})
+
+    def test_dashboard(self):
+        self.measure_get("dashboard", reverse("dashboard"))
+        self.measure_get("dashboard_cached", reverse("dashboard"))
+
+    def test_monthly_report(self):
+        today = timezone.localdate()
+        self.measure_get("monthly_report", reverse("monthly-report"), {"year": today.year, "month": today.month})
+
+    def test_monthly_report_from_rollups(self):
+        today = timezone.localdate()
+        rebuild_monthly_stats_range()
+        self.measure_get(
+            "monthly_report_rollup", reverse("monthly-report"), {"year": today.year, "month": today.month}
+        )
+
+    def test_car_stats_api(self):
+        url = reverse("api-car-stats", args=[self.car.pk])
+        self.measure_get("car_stats_api", url)
+        cache.clear()
+        rebuild_monthly_stats_range()
+        resp = self.measure_get("car_stats_api_rollup", url, {"source": "rollup"})
+        self.assertEqual(resp.data["source"], "rollup")
+
+    def test_car_series_api(self):
+        url = reverse("api-car-series", args=[self.car.pk])
+        end = timezone.localdate()
+        self.measure_get(
+            "car_series_api_months", url,
+            {"interval": "month", "start": end - datetime.timedelta(days=3 * 365), "end": end},
+        )
+        self.measure_get(
+            "car_series_api_days", url,
+            {"interval": "day", "start": end - datetime.timedelta(days=365), "end": end},
+        )
+
+    def test_car_trips_api(self):
+        url = reverse("api-car-trips", args=[self.car.pk])
+        self.measure_get("car_trips_api", url)
+
+        with measure() as m:
+            resp = self.client.get(url, {"stream": "1"})
+            b"".join(resp.streaming_content)
+        self.assertWithinBudget("car_trips_api_stream", m)
+
+    def test_weekly_summary_tasks(self):
+        with mock.patch("logbook.tasks.send_weekly_summary_batch.delay") as delay, measure() as m:
+            send_weekly_summary_for_all_users()
+        delay.assert_called()
+        self.assertWithinBudget("weekly_summary_fan_out", m)
+
+        user_ids = [u.pk for u in self.owners]
+        mail.outbox = []
+        with measure() as m:
+            send_weekly_summary_batch(user_ids)
+        self.assertEqual(len(mail.outbox), len(user_ids))
+        self.assertWithinBudget("weekly_summary_batch", m)
+
+    def test_stats_tasks(self):
+        today = timezone.localdate()
+        with mock.patch("statsapp.tasks.recalculate_monthly_stats_batch.delay") as delay, measure() as m:
+            recalculate_all_cars_current_month()
+        delay.assert_called()
+        self.assertWithinBudget("stats_fan_out", m)
+
+        car_ids = list(Car.objects.values_list("id", flat=True))
+        with measure() as m:
+            recalculate_monthly_stats_batch(car_ids, today.year, today.month)
+        self.assertWithinBudget("stats_month_batch", m)
+
+        start = today - datetime.timedelta(days=365)
+        with measure() as m:
+            rebuild_monthly_stats_range(None, [start.year, start.month], [today.year, today.month])
+        self.assertWithinBudget("stats_rebuild_year", m)
@@ -0,0 +1,62 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from core.cache import bump_fx_version
+from core.currency import clear_rate_cache, convert, converted, rate_on
+from core.models import FxRate
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Refuel
+
+JAN = datetime.date(2025, 1, 10)
+FEB = datetime.date(2025, 2, 10)
+
+
+class CurrencyConversionTests(TestCase):
+    def setUp(self):
+        clear_rate_cache()
+        self.owner = create_user("owner", preferred_currency="EUR")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual"
+        )
+
+    def test_rates_fall_back_to_the_peg_and_follow_dated_rows(self):
+        self.assertEqual(rate_on("BGN", JAN), Decimal("1.95583"))
+        self.assertEqual(rate_on("USD", JAN), Decimal("1"))
+
+        # Saving a rate drops this process' copy of the table.
+        FxRate.objects.create(currency="BGN", valid_from=datetime.date(2025, 2, 1), rate="2.000000")
+        with self.assertNumQueries(1):
+            self.assertEqual(rate_on("BGN", JAN), Decimal("1.95583"))
+            self.assertEqual(rate_on("BGN", FEB), Decimal("2"))
+        self.assertEqual(convert("20.00", "BGN", "EUR", FEB), Decimal("10"))
+
+    def test_sql_conversion_uses_the_rate_of_each_row_date(self):
+        FxRate.objects.create(currency="BGN", valid_from=datetime.date(2025, 2, 1), rate="2.000000")
+        for day, cost, currency in ((JAN, "195.58", "BGN"), (FEB, "200.00", "BGN"), (FEB, "50.00", "EUR")):
+            Refuel.objects.create(
+                car=self.car, created_by=self.owner, date=day, odometer=100,
+                liters="10.00", total_cost=cost, currency=currency,
+            )
+
+        totals = Refuel.objects.aggregate(
+            eur=Sum(converted("total_cost", "currency", "date", "EUR")),
+            bgn=Sum(converted("total_cost", "currency", "date", "BGN")),
+            preferred=Sum(converted("total_cost", "currency", "date", F("car__owner__preferred_currency"))),
+        )
+        self.assertEqual(totals["eur"].quantize(Decimal("0.01")), Decimal("250.00"))
+        self.assertEqual(totals["bgn"].quantize(Decimal("0.01")), Decimal("495.58"))
+        self.assertEqual(totals["preferred"], totals["eur"])
+
+    def test_rate_changes_elsewhere_reload_the_table(self):
+        rate_on("BGN", JAN)
+        with self.assertNumQueries(0):
+            rate_on("BGN", JAN)
+
+        # Another process saved a rate: only the shared version tells this one.
+        bump_fx_version()
+        with self.assertNumQueries(1):
+            rate_on("BGN", JAN)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from statsapp.services import rebuild_monthly_stats
+
+
+@override_settings(DASHBOARD_CACHE_TIMEOUT=60)
+class DashboardViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = create_user("owner", preferred_currency="EUR")
+        self.today = timezone.localdate()
+        self.cars = [self.add_car(i) for i in range(2)]
+        self.client.force_login(self.owner)
+
+    def add_car(self, i):
+        car = Car.objects.create(
+            owner=self.owner, brand="VW", model=f"Golf {i}", year=2018, fuel="diesel", gearbox="auto"
+        )
+        for n in range(7):
+            Trip.objects.create(
+                car=car, created_by=self.owner, start_odometer=n * 10, end_odometer=n * 10 + 10,
+                start_date=self.today, end_date=self.today, from_city="Sofia", to_city=f"Town {n}",
+            )
+        Refuel.objects.create(
+            car=car, created_by=self.owner, date=self.today, odometer=70,
+            liters="30.00", total_cost="60.00", currency="EUR",
+        )
+        return car
+
+    def test_widgets_come_from_a_fixed_query_plan(self):
+        rebuild_monthly_stats(start=(self.today.year, self.today.month), end=(self.today.year, self.today.month))
+        # Session, user, managers' group lookup, cars and the four prefetches.
+        with self.assertNumQueries(8):
+            resp = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(resp.status_code, 200)
+        dashboard = resp.context["dashboard"]
+        self.assertEqual(dashboard["totals"]["distance_km"], 140)
+        self.assertEqual(dashboard["totals"]["fuel_cost"], 120)
+        self.assertEqual(len(dashboard["cars"][0]["recent_trips"]), 5)
+        self.assertContains(resp, "Town 6")
+        self.assertNotContains(resp, "Town 1 (")
+
+        # More cars, same plan; the missing rollups of the new ones add the live aggregates.
+        self.add_car(2)
+        self.add_car(3)
+        cache.clear()
+        with self.assertNumQueries(10):
+            self.client.get(reverse("dashboard"))
+
+    def test_fragment_is_cached_until_the_next_write(self):
+        self.client.get(reverse("dashboard"))
+        # Session, user and the managers' group lookup only.
+        with self.assertNumQueries(3):
+            resp = self.client.get(reverse("dashboard"))
+        self.assertContains(resp, "140 km")
+
+        Trip.objects.create(
+            car=self.cars[0], created_by=self.owner, start_odometer=70, end_odometer=100,
+            start_date=self.today, end_date=self.today, from_city="Sofia", to_city="Varna",
+        )
+        resp = self.client.get(reverse("dashboard"))
+        self.assertContains(resp, "170 km")
+        self.assertContains(resp, "Varna")
@@ -0,0 +1,113 @@
+import csv
+import datetime
+import io
+from unittest import mock, skipUnless
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.exports import xlsx_available
+from core.tasks import export_dataset
+from garage.models import Car
+from logbook.models import Expense, Trip, Refuel
+from statsapp.services import rebuild_monthly_stats
+from .helpers import create_user
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual"
+        )
+        other = create_user("other")
+        other_car = Car.objects.create(
+            owner=other, brand="BMW", model="X3", year=2019, fuel="diesel", gearbox="manual"
+        )
+        for car, user, start in ((self.car, self.owner, 100), (self.car, self.owner, 300), (other_car, other, 10)):
+            day = datetime.date(2025, 1, 1) + datetime.timedelta(days=start)
+            trip = Trip.objects.create(
+                car=car, created_by=user, start_odometer=start, end_odometer=start + 50,
+                start_date=day, end_date=day, from_city="Sofia", to_city="Plovdiv, BG",
+            )
+            Expense.objects.create(trip=trip, amount="5.00")
+        Refuel.objects.create(
+            car=self.car, created_by=self.owner, date=datetime.date(2025, 2, 1), odometer=150,
+            liters="30.00", total_cost="60.00",
+        )
+        self.client.force_login(self.owner)
+
+    def read_csv(self, resp):
+        content = b"".join(resp.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_trips_csv_is_streamed_and_scoped_to_owner(self):
+        resp = self.client.get(reverse("export", args=["trips", "csv"]))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Disposition"], 'attachment; filename="trips.csv"')
+        rows = self.read_csv(resp)
+        self.assertEqual(rows[0][:3], ["id", "car_id", "car_brand"])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][rows[0].index("distance_km")], "50")
+        self.assertEqual(rows[1][rows[0].index("to_city")], "Plovdiv, BG")
+
+    def test_expenses_and_refuels_are_scoped_through_the_car(self):
+        rows = self.read_csv(self.client.get(reverse("export", args=["expenses", "csv"])))
+        self.assertEqual(len(rows), 3)
+        rows = self.read_csv(self.client.get(reverse("export", args=["refuels", "csv"]), {"car": self.car.pk}))
+        self.assertEqual(len(rows), 2)
+
+    def test_monthly_fuel_costs_are_exported_per_currency(self):
+        Refuel.objects.create(
+            car=self.car, created_by=self.owner, date=datetime.date(2025, 2, 3), odometer=200,
+            liters="10.00", total_cost="15.00", currency="EUR",
+        )
+        rebuild_monthly_stats()
+        rows = self.read_csv(self.client.get(reverse("export", args=["monthly-fuel", "csv"])))
+
+        self.assertEqual(
+            [(r[0], r[1], r[rows[0].index("currency")], r[rows[0].index("total_fuel_cost")]) for r in rows[1:]],
+            [("2025", "2", "BGN", "60.00"), ("2025", "2", "EUR", "15.00")],
+        )
+
+    def test_unknown_dataset_is_404(self):
+        self.assertEqual(self.client.get(reverse("export", args=["users", "csv"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("export", args=["trips", "pdf"])).status_code, 404)
+
+    @skipUnless(xlsx_available(), "openpyxl is not installed.")
+    def test_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        resp = self.client.get(reverse("export", args=["trips", "xlsx"]))
+        self.assertEqual(resp.status_code, 200)
+        sheet = load_workbook(io.BytesIO(b"".join(resp.streaming_content))).active
+        self.assertEqual(sheet.max_row, 3)
+        self.assertEqual(sheet.cell(1, 1).value, "id")
+
+    @mock.patch("core.templatetags.core_tags._xlsx_available", return_value=False)
+    def test_xlsx_links_are_hidden_without_openpyxl(self, _):
+        resp = self.client.get(reverse("trip-list"))
+        self.assertContains(resp, reverse("export", args=["trips", "csv"]))
+        self.assertNotContains(resp, reverse("export", args=["trips", "xlsx"]))
+
+    @override_settings(EXPORT_SYNC_MAX_ROWS=1)
+    def test_large_exports_are_queued(self):
+        with mock.patch("core.views.export_dataset.delay") as delay:
+            resp = self.client.get(reverse("export", args=["trips", "csv"]), {"car": self.car.pk})
+
+        self.assertEqual(resp.status_code, 202)
+        delay.assert_called_once_with(self.owner.pk, "trips", "csv", self.car.pk)
+
+    def test_background_job_stores_the_file_and_mails_a_link(self):
+        with mock.patch("core.tasks.default_storage") as storage:
+            storage.save.side_effect = lambda name, content: (setattr(self, "stored", content.read()), name)[1]
+            storage.url.side_effect = lambda name: f"https://files.example.com/{name}"
+            name = export_dataset(self.owner.pk, "trips", "csv")
+
+        self.assertRegex(name, rf"^exports/{self.owner.pk}/[0-9a-f]{{32}}/trips-\d{{4}}-\d{{2}}-\d{{2}}\.csv$")
+        self.assertEqual(len(self.stored.decode("utf-8-sig").splitlines()), 3)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"https://files.example.com/{name}", mail.outbox[0].body)
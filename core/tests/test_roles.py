@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.roles import get_user_roles, has_role
+from core.tests.helpers import create_user
+
+User = get_user_model()
+
+
+class RolesCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.managers, _ = Group.objects.get_or_create(name="Managers")
+        self.user = create_user("manager")
+        self.user.groups.add(self.managers)
+
+    def test_roles_are_loaded_once_per_request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        template = Template(
+            "{% load core_tags %}"
+            "{% has_group 'Managers' as a %}{% has_group 'Drivers' as b %}{% has_group 'Managers' as c %}"
+            "{{ a }}{{ b }}{{ c }}"
+        )
+        with self.assertNumQueries(1):
+            rendered = template.render(Context({"request": request}))
+            self.assertTrue(has_role(self.user, "Managers"))
+
+        self.assertEqual(rendered, "TrueTrueTrue")
+
+    @override_settings(ROLE_CACHE_TIMEOUT=60)
+    def test_shared_cache_is_invalidated_on_membership_change(self):
+        self.assertIn("Managers", get_user_roles(self.user))
+
+        # A new request gets a new user instance; the shared cache answers it.
+        with self.assertNumQueries(0):
+            self.assertIn("Managers", get_user_roles(User(pk=self.user.pk)))
+
+        self.user.groups.remove(self.managers)
+        self.assertNotIn("Managers", get_user_roles(User(pk=self.user.pk)))
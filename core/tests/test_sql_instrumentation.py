@@ -0,0 +1,91 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.views import CarStatsAPIView
+from core.instrumentation import QueryBudgetExceeded, QueryStats
+from garage.models import Car
+from logbook.models import Trip
+from logbook.views import TripListView
+from .helpers import create_user
+
+
+class SQLInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual"
+        )
+        Trip.objects.create(
+            car=self.car, created_by=self.owner, start_odometer=100, end_odometer=150,
+            start_date=datetime.date(2025, 1, 5), end_date=datetime.date(2025, 1, 5),
+            from_city="Sofia", to_city="Plovdiv",
+        )
+        self.client.force_login(self.owner)
+
+    def test_logs_query_stats_and_sets_server_timing(self):
+        with self.assertLogs("core.middleware", level="INFO") as logs:
+            resp = self.client.get(reverse("trip-list"))
+
+        self.assertRegex(resp["Server-Timing"], r'^sql;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+        line = logs.output[-1]
+        self.assertIn("view=trip-list", line)
+        self.assertIn("budget=4", line)
+        self.assertRegex(line, r'queries=\d+ sql_ms=[\d.]+ total_ms=[\d.]+')
+        self.assertIn("SELECT", line)
+
+    def test_over_budget_view_logs_a_warning(self):
+        with mock.patch.object(TripListView, "query_budget", 1), \
+                self.assertLogs("core.middleware", level="WARNING") as logs:
+            resp = self.client.get(reverse("trip-list"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("GET trip-list issued", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_over_budget_view_fails_when_enforced(self):
+        with mock.patch.object(CarStatsAPIView, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("api-car-stats", args=[self.car.pk]))
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_api_views_stay_within_their_budgets(self):
+        self.assertEqual(self.client.get(reverse("api-car-stats", args=[self.car.pk])).status_code, 200)
+        self.assertEqual(
+            self.client.get(reverse("api-car-stats", args=[self.car.pk]), {"source": "rollup"}).status_code, 200
+        )
+        self.assertEqual(self.client.get(reverse("api-car-trips", args=[self.car.pk])).status_code, 200)
+
+    def test_budget_can_depend_on_the_request(self):
+        url = reverse("api-car-stats", args=[self.car.pk])
+        with self.assertLogs("core.middleware", level="INFO") as logs:
+            self.client.get(url)
+            self.client.get(url, {"source": "rollup"})
+
+        self.assertIn(f"budget={CarStatsAPIView.query_budget}", logs.output[0])
+        self.assertIn(f"budget={CarStatsAPIView.rollup_query_budget}", logs.output[1])
+
+    def test_streaming_queries_are_reported_after_the_stream(self):
+        with self.assertLogs("core.middleware", level="INFO") as logs:
+            resp = self.client.get(reverse("api-car-trips", args=[self.car.pk]), {"stream": "1"})
+            self.assertEqual(logs.output, [])
+            b"".join(resp.streaming_content)
+
+        self.assertIn("view=api-car-trips", logs.output[-1])
+        self.assertIn("budget=5", logs.output[-1])
+
+
+class QueryStatsTests(TestCase):
+    def test_keeps_only_the_slowest_statements(self):
+        stats = QueryStats(keep_slowest=2)
+        # start/end perf_counter pairs: 3ms, 1ms and 5ms statements
+        clock = [0, 0.003, 0, 0.001, 0, 0.005]
+
+        with mock.patch("core.instrumentation.time.perf_counter", side_effect=clock):
+            for sql in ("SELECT 1", "SELECT 2", "SELECT 3"):
+                stats(lambda *args: None, sql, (), False, {})
+
+        self.assertEqual(stats.count, 3)
+        self.assertEqual([sql for _, sql in stats.slowest], ["SELECT 3", "SELECT 1"])
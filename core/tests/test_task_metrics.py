@@ -0,0 +1,93 @@
+import datetime
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import TaskRun
+from core.task_metrics import args_preview
+from core.tasks import prune_task_runs
+from garage.models import Car
+from logbook.models import Trip
+from statsapp.tasks import recalculate_monthly_stats
+from .helpers import create_user
+
+
+class TaskMetricsTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual"
+        )
+        Trip.objects.create(
+            car=self.car, created_by=self.owner, start_odometer=100, end_odometer=150,
+            start_date=datetime.date(2025, 1, 5), end_date=datetime.date(2025, 1, 5),
+            from_city="Sofia", to_city="Plovdiv",
+        )
+
+    def test_successful_run_is_recorded(self):
+        recalculate_monthly_stats.apply(args=(self.car.pk, 2025, 1), headers={"sent_at": time.time() - 2})
+
+        run = TaskRun.objects.get()
+        self.assertEqual(run.task_name, "statsapp.tasks.recalculate_monthly_stats")
+        self.assertEqual(run.state, TaskRun.State.SUCCESS)
+        self.assertEqual(run.args_preview, f"{self.car.pk}, 2025, 1")
+        self.assertGreater(run.query_count, 0)
+        self.assertGreaterEqual(run.queue_wait_ms, 2000)
+        self.assertEqual(run.retries, 0)
+
+    def test_failed_run_keeps_the_error(self):
+        with mock.patch("statsapp.tasks.rebuild_monthly_stats", side_effect=RuntimeError("boom")):
+            recalculate_monthly_stats.apply(args=(self.car.pk, 2025, 1))
+
+        run = TaskRun.objects.get()
+        self.assertEqual(run.state, TaskRun.State.FAILURE)
+        self.assertEqual(run.error, "RuntimeError: boom")
+        self.assertIsNone(run.queue_wait_ms)
+        # The query counter is removed however the task body ends.
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_slow_runs_are_logged(self):
+        with self.settings(TASK_SLOW_MS=0), self.assertLogs("core.task_metrics", level="WARNING") as logs:
+            recalculate_monthly_stats.apply(args=(self.car.pk, 2025, 1))
+        self.assertIn("slow_task name=statsapp.tasks.recalculate_monthly_stats", logs.output[0])
+
+    @override_settings(TASK_RUN_RETENTION_DAYS=7)
+    def test_old_runs_are_pruned(self):
+        now = timezone.now()
+        for days in (1, 6, 8, 30):
+            TaskRun.objects.create(
+                task_id=str(days), task_name="t", state=TaskRun.State.SUCCESS,
+                started_at=now - datetime.timedelta(days=days), runtime_ms=1,
+            )
+
+        self.assertEqual(prune_task_runs.apply().result, 2)
+        self.assertEqual(
+            sorted(TaskRun.objects.exclude(task_name=prune_task_runs.name).values_list("task_id", flat=True)),
+            ["1", "6"],
+        )
+
+    def test_args_preview_is_truncated(self):
+        preview = args_preview([list(range(500))], {"year": 2025})
+        self.assertEqual(len(preview), 200)
+        self.assertTrue(preview.endswith("..."))
+
+    def test_task_stats_command(self):
+        recalculate_monthly_stats.apply(args=(self.car.pk, 2025, 1))
+        recalculate_monthly_stats.apply(args=(self.car.pk, 2025, 2))
+
+        out = StringIO()
+        call_command("task_stats", stdout=out)
+        self.assertIn("statsapp.tasks.recalculate_monthly_stats", out.getvalue())
+
+        out = StringIO()
+        call_command("task_stats", task="statsapp.tasks.recalculate_monthly_stats", stdout=out)
+        self.assertIn(f"{self.car.pk}, 2025, 2", out.getvalue())
+
+        out = StringIO()
+        call_command("task_stats", prune=True, stdout=out)
+        self.assertIn("Deleted 0 task runs.", out.getvalue())
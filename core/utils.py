@@ -0,0 +1,10 @@
+from itertools import islice
+
+
+def chunked(iterable, size: int):
+    """Yields lists of up to `size` items from any iterable, without materializing it."""
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,12 +1,86 @@
-from django.shortcuts import render
+import tempfile
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.views import View
 from django.views.generic import TemplateView
 
+from .cache import get_data_version, get_fx_version
+from .dashboard import build_dashboard
+from .exports import CONTENT_TYPES, DATASETS, FORMAT_CSV, FORMATS, iter_csv, write_xlsx, xlsx_available
+from .tasks import export_dataset
+
 
 class HomeView(TemplateView):
     template_name = "core/home.html"
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
+    """
+    Month-to-date figures, last refuel and recent trips per car (see
+    core.dashboard). The widgets are a template fragment cached per user, data
+    version and FX version, so they are only rebuilt after a car/trip/refuel
+    write or an FX rate change.
+    """
+
     template_name = "core/dashboard.html"
+    # session, user, managers' group lookup, then on a cache miss the cars,
+    # the four prefetches, the live month aggregates and the rollup cost conversion
+    query_budget = 11
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context.update({
+            # Only evaluated when the fragment cache misses.
+            "dashboard": SimpleLazyObject(lambda: build_dashboard(user)),
+            "dashboard_version": get_data_version(user.pk),
+            "fx_version": get_fx_version(),
+            "dashboard_cache_timeout": settings.DASHBOARD_CACHE_TIMEOUT,
+            "today": timezone.localdate().isoformat(),
+        })
+        return context
+
+
+class ExportView(LoginRequiredMixin, View):
+    """
+    Downloads one of the user's datasets (see core.exports) as CSV or XLSX,
+    optionally for one car (?car=<id>). CSV is streamed row by row. Exports
+    above EXPORT_SYNC_MAX_ROWS, or requested with ?background=1, are built by
+    a Celery job and mailed as a link instead.
+    """
+
+    def get(self, request, dataset, fmt):
+        dataset = DATASETS.get(dataset)
+        if dataset is None or fmt not in FORMATS:
+            raise Http404("Unknown export.")
+        if fmt != FORMAT_CSV and not xlsx_available():
+            raise Http404("XLSX export is not available.")
+
+        car_id = request.GET.get("car") or None
+        if car_id is not None and not car_id.isdigit():
+            raise Http404("Invalid car.")
+
+        background = request.GET.get("background") == "1"
+        if not background:
+            background = dataset.queryset(request.user, car_id).count() > settings.EXPORT_SYNC_MAX_ROWS
+        if background:
+            export_dataset.delay(request.user.pk, dataset.name, fmt, car_id and int(car_id))
+            return render(request, "core/export_queued.html", {"dataset": dataset.name}, status=202)
+
+        name = f"{dataset.name}.{fmt}"
+        rows = dataset.rows(request.user, car_id)
+        if fmt == FORMAT_CSV:
+            response = StreamingHttpResponse(iter_csv(dataset, rows), content_type=CONTENT_TYPES[fmt])
+            response["Content-Disposition"] = f'attachment; filename="{name}"'
+            return response
+
+        # XLSX is a zip archive: build it in a temporary file, then stream the file.
+        tmp = tempfile.TemporaryFile()
+        write_xlsx(dataset, rows, tmp)
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename=name, content_type=CONTENT_TYPES[fmt])
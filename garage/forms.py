@@ -1,16 +1,17 @@
 from django import forms
 
-from logbook.models import Tag
+from logbook.tags import setup_tags_field
 from .models import Car
 
 
 class TagsCheckboxMixin:
+    def __init__(self, *args, tag_query="", **kwargs):
+        self.tag_query = tag_query
+        super().__init__(*args, **kwargs)
+
     def setup_tags(self):
         if "tags" in self.fields:
-            self.fields["tags"].required = False
-            self.fields["tags"].widget = forms.CheckboxSelectMultiple()
-            self.fields["tags"].queryset = Tag.objects.order_by("name")
-            self.fields["tags"].help_text = "Select one or more tags."
+            setup_tags_field(self, query=self.tag_query)
             self.fields["tags"].empty_label = None
 
 
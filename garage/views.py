@@ -2,6 +2,7 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 
 from core.mixins import OwnerQuerySetMixin
+from logbook.tags import TagSearchViewMixin
 from .models import Car
 from .forms import CarCreateForm, CarEditForm
 
@@ -18,7 +19,7 @@ class CarDetailView(OwnerQuerySetMixin, DetailView):
     context_object_name = "car"
 
 
-class CarCreateView(OwnerQuerySetMixin, CreateView):
+class CarCreateView(OwnerQuerySetMixin, TagSearchViewMixin, CreateView):
     model = Car
     form_class = CarCreateForm
     template_name = "garage/car_form.html"
@@ -31,7 +32,7 @@ class CarCreateView(OwnerQuerySetMixin, CreateView):
         return reverse_lazy("car-detail", kwargs={"pk": self.object.pk})
 
 
-class CarUpdateView(OwnerQuerySetMixin, UpdateView):
+class CarUpdateView(OwnerQuerySetMixin, TagSearchViewMixin, UpdateView):
     model = Car
     form_class = CarEditForm
     template_name = "garage/car_form.html"
@@ -10,7 +10,7 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(Trip)
 class TripAdmin(admin.ModelAdmin):
-    list_display = ("car", "from_city", "to_city", "start_date", "end_date", "created_by")
+    list_display = ("car", "from_city", "to_city", "start_date", "end_date", "distance", "created_by")
     search_fields = ("from_city", "to_city", "car__brand", "car__model", "created_by__username")
     list_filter = ("start_date", "end_date")
     autocomplete_fields = ("car", "created_by")
@@ -19,8 +19,8 @@ class TripAdmin(admin.ModelAdmin):
 
 @admin.register(Refuel)
 class RefuelAdmin(admin.ModelAdmin):
-    list_display = ("car", "date", "odometer", "liters", "total_cost", "created_by")
-    list_filter = ("date",)
+    list_display = ("car", "date", "odometer", "liters", "total_cost", "currency", "created_by")
+    list_filter = ("date", "is_full_tank")
     search_fields = ("car__brand", "car__model", "station", "created_by__username")
     autocomplete_fields = ("car", "created_by")
 
@@ -2,15 +2,18 @@ from django import forms
 from django.core.exceptions import ValidationError
 from garage.models import Car
 from .models import Trip, Refuel, Expense, Tag
+from .odometer import REFUEL, check_reading
+from .tags import setup_tags_field
 
 
 class TagsCheckboxMixin:
+    def __init__(self, *args, tag_query="", **kwargs):
+        self.tag_query = tag_query
+        super().__init__(*args, **kwargs)
+
     def setup_tags(self):
         if "tags" in self.fields:
-            self.fields["tags"].required = False
-            self.fields["tags"].widget = forms.CheckboxSelectMultiple()
-            self.fields["tags"].queryset = Tag.objects.all().order_by("name")
-            self.fields["tags"].help_text = "Select one or more tags."
+            setup_tags_field(self, query=self.tag_query)
 
 
 class TripCreateForm(TagsCheckboxMixin, forms.ModelForm):
@@ -102,6 +105,8 @@ class RefuelCreateForm(forms.ModelForm):
             self.fields["total_cost"].label = "Total cost"
         if "currency" in self.fields:
             self.fields["currency"].label = "Currency"
+        if "is_full_tank" in self.fields:
+            self.fields["is_full_tank"].label = "Full tank"
         if "fuel_type" in self.fields:
             self.fields["fuel_type"].label = "Fuel type (optional)"
         if "station" in self.fields:
@@ -127,34 +132,12 @@ class RefuelCreateForm(forms.ModelForm):
         if total_cost is not None and total_cost <= 0:
             self.add_error("total_cost", "Total cost must be a positive number.")
 
-        # Odometer consistency should be checked against refuels around the selected DATE,
-        # not against the latest refuel overall.
+        # Odometer consistency is checked against the car's trip and refuel readings
+        # around the selected DATE (not against the latest refuel overall).
         if car and odometer is not None and date:
-            base_qs = Refuel.objects.filter(car=car).exclude(pk=self.instance.pk)
-
-            prev_refuel = (
-                base_qs.filter(date__lt=date)
-                .order_by("-date", "-created_at")
-                .first()
-            )
-            next_refuel = (
-                base_qs.filter(date__gt=date)
-                .order_by("date", "created_at")
-                .first()
-            )
-
-            if prev_refuel and odometer < prev_refuel.odometer:
-                self.add_error(
-                    "odometer",
-                    f"Odometer must be at least {prev_refuel.odometer} (previous refuel before this date).",
-                )
-
-            # Optional: keep monotonicity if user inserts an older refuel.
-            if next_refuel and odometer > next_refuel.odometer:
-                self.add_error(
-                    "odometer",
-                    f"Odometer must be at most {next_refuel.odometer} (next refuel after this date).",
-                )
+            conflict = check_reading(car.pk, date, odometer, exclude=(REFUEL, self.instance.pk))
+            if conflict:
+                self.add_error("odometer", conflict)
 
         return cleaned
 
@@ -162,7 +145,7 @@ class RefuelCreateForm(forms.ModelForm):
 class RefuelEditForm(RefuelCreateForm):
     class Meta:
         model = Refuel
-        fields = ("car", "date", "odometer", "liters", "total_cost", "currency", "fuel_type", "station")
+        fields = ("car", "date", "odometer", "liters", "total_cost", "currency", "is_full_tank", "fuel_type", "station")
 
 
 class ExpenseCreateForm(forms.ModelForm):
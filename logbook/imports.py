@@ -0,0 +1,244 @@
+"""
+Bulk import of trips and refuels from CSV or JSON Lines files.
+
+Rows are parsed and validated one at a time, so files of any size are read in
+bounded memory. Odometer consistency is checked against each car's odometer
+timeline (logbook.odometer), loaded once and extended with every accepted
+row, instead of querying the previous/next row per row. Valid rows are
+written with bulk_create in batches; afterwards the monthly rollups of the
+affected months are rebuilt with one task.
+"""
+import csv
+import json
+
+from django import forms
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import bump_data_version
+from garage.models import Car
+from statsapp.signals import schedule_rollup_rebuild
+from .models import Trip, Refuel
+from .odometer import REFUEL, TRIP, OdometerTimeline, get_timeline, invalidate_timelines
+
+KIND_TRIPS = "trips"
+KIND_REFUELS = "refuels"
+KINDS = (KIND_TRIPS, KIND_REFUELS)
+
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"
+FORMATS = (FORMAT_CSV, FORMAT_JSON)
+
+# Only the first errors are kept for the report; error_count has the total.
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class TripImportRow(forms.Form):
+    car = forms.CharField(help_text="Car id or VIN.")
+    start_date = forms.DateField()
+    end_date = forms.DateField(required=False)
+    start_odometer = forms.IntegerField(min_value=0)
+    end_odometer = forms.IntegerField(min_value=0)
+    from_city = forms.CharField(max_length=60)
+    to_city = forms.CharField(max_length=60)
+    notes = forms.CharField(required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("start_date") and not cleaned.get("end_date"):
+            cleaned["end_date"] = cleaned["start_date"]
+        start_odo, end_odo = cleaned.get("start_odometer"), cleaned.get("end_odometer")
+        if start_odo is not None and end_odo is not None and end_odo < start_odo:
+            self.add_error("end_odometer", "The final odometer must be higher than the initial one.")
+        if cleaned.get("end_date") and cleaned.get("start_date") and cleaned["end_date"] < cleaned["start_date"]:
+            self.add_error("end_date", "The end date must be after the start date.")
+        return cleaned
+
+
+class RefuelImportRow(forms.Form):
+    car = forms.CharField(help_text="Car id or VIN.")
+    date = forms.DateField()
+    odometer = forms.IntegerField(min_value=0)
+    liters = forms.DecimalField(max_digits=7, decimal_places=2, min_value=0.01)
+    total_cost = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0.01)
+    currency = forms.ChoiceField(choices=Refuel.CurrencyChoices.choices, required=False)
+    is_full_tank = forms.NullBooleanField(required=False, help_text="true/false; defaults to true.")
+    fuel_type = forms.CharField(max_length=20, required=False)
+    station = forms.CharField(max_length=60, required=False)
+
+
+class Importer:
+    """
+    Imports the rows of one kind for one user. Cars are limited to the user's
+    own cars, referenced by id or VIN.
+    """
+
+    def __init__(self, user, kind, batch_size=None, skip_invalid=False, dry_run=False):
+        if kind not in KINDS:
+            raise ImportFileError(f"Unknown import kind '{kind}'.")
+        self.user = user
+        self.kind = kind
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.skip_invalid = skip_invalid
+        self.dry_run = dry_run
+
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+        self.error_count = 0
+        self.buckets = set()
+        self._batch = []
+        self._timelines = {}
+
+        cars = list(Car.objects.filter(owner=user).only("id", "vin").order_by())
+        self._cars = {str(c.pk): c for c in cars}
+        self._cars.update({c.vin.upper(): c for c in cars if c.vin})
+
+    def run(self, rows) -> "Importer":
+        """Imports an iterable of dicts; all-or-nothing unless skip_invalid."""
+        with transaction.atomic():
+            for number, raw in enumerate(rows, start=1):
+                self.rows = number
+                self.add_row(number, raw)
+            self.flush()
+
+            if self.dry_run or (self.errors and not self.skip_invalid):
+                transaction.set_rollback(True)
+                self.created = 0
+                self.buckets = set()
+            elif self.created:
+                schedule_rollup_rebuild(self.buckets)
+                car_ids = sorted({car_id for car_id, _, _ in self.buckets})
+                transaction.on_commit(lambda: invalidate_timelines(car_ids))
+                transaction.on_commit(lambda: bump_data_version(self.user.pk))
+        return self
+
+    def add_row(self, number, raw):
+        if isinstance(raw, ValueError):
+            self.error(number, str(raw))
+            return
+        if not isinstance(raw, dict):
+            self.error(number, "Row must be an object.")
+            return
+
+        form_class = TripImportRow if self.kind == KIND_TRIPS else RefuelImportRow
+        form = form_class(data={k: "" if v is None else v for k, v in raw.items()})
+        if not form.is_valid():
+            self.error(number, "; ".join(
+                f"{field}: {' '.join(messages)}" for field, messages in form.errors.items()
+            ))
+            return
+        data = form.cleaned_data
+
+        car = self._cars.get(str(data["car"]).strip().upper())
+        if car is None:
+            self.error(number, f"car: Unknown car '{data['car']}'.")
+            return
+
+        if self.kind == KIND_TRIPS:
+            kind = TRIP
+            readings = [(data["start_date"], data["start_odometer"]), (data["end_date"], data["end_odometer"])]
+        else:
+            kind = REFUEL
+            readings = [(data["date"], data["odometer"])]
+
+        timeline = self.timeline(car.pk)
+        # A row whose readings all match one existing row is a repeat (e.g. a re-imported file).
+        if set.intersection(*(timeline.keys_at(day, odometer, kind) for day, odometer in readings)):
+            self.error(number, "Duplicate of an existing entry.")
+            return
+        for day, odometer in readings:
+            conflict = timeline.conflict(day, odometer, odometer)
+            if conflict:
+                self.error(number, f"odometer: {conflict}")
+                return
+        for day, odometer in readings:
+            timeline.add(day, odometer, odometer, (kind, f"row-{number}"))
+        day = readings[0][0]
+
+        if self.kind == KIND_TRIPS:
+            obj = Trip(
+                car=car,
+                created_by=self.user,
+                start_date=data["start_date"],
+                end_date=data["end_date"],
+                start_odometer=data["start_odometer"],
+                end_odometer=data["end_odometer"],
+                from_city=data["from_city"],
+                to_city=data["to_city"],
+                notes=data["notes"],
+            )
+        else:
+            obj = Refuel(
+                car=car,
+                created_by=self.user,
+                date=data["date"],
+                odometer=data["odometer"],
+                liters=data["liters"],
+                total_cost=data["total_cost"],
+                currency=data["currency"] or self.user.preferred_currency,
+                is_full_tank=data["is_full_tank"] is not False,
+                fuel_type=data["fuel_type"],
+                station=data["station"].strip(),
+            )
+        self._batch.append(obj)
+        self.buckets.add((car.pk, day.year, day.month))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def timeline(self, car_id) -> OdometerTimeline:
+        # A private copy per car, loaded the first time the car shows up in the file.
+        if car_id not in self._timelines:
+            self._timelines[car_id] = get_timeline(car_id)
+        return self._timelines[car_id]
+
+    def flush(self):
+        if not self._batch:
+            return
+        if not self.dry_run and (self.skip_invalid or not self.errors):
+            model = Trip if self.kind == KIND_TRIPS else Refuel
+            model.objects.bulk_create(self._batch, batch_size=self.batch_size)
+            self.created += len(self._batch)
+        self._batch = []
+
+    def error(self, number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "error": message})
+
+
+def read_rows(stream, fmt):
+    """
+    Yields one dict per record of a text stream: CSV with a header row, or
+    JSON Lines (one object per line, as produced by the trips NDJSON export).
+    Unparsable JSON lines are yielded as ValueError so they count as rows.
+    """
+    if fmt not in FORMATS:
+        raise ImportFileError(f"Unknown import format '{fmt}'.")
+    try:
+        if fmt == FORMAT_CSV:
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ValueError(f"Invalid JSON: {exc}")
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f"Could not read the file: {exc}")
+
+
+def format_from_name(name, default=FORMAT_CSV) -> str:
+    suffix = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if suffix in ("json", "jsonl", "ndjson"):
+        return FORMAT_JSON
+    if suffix == "csv":
+        return FORMAT_CSV
+    return default
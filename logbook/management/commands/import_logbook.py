@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from logbook.imports import FORMATS, KINDS, Importer, ImportFileError, format_from_name, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Imports trips or refuels for one user from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--user", required=True, help="Username owning the cars.")
+        parser.add_argument("--kind", required=True, choices=KINDS)
+        parser.add_argument("--format", choices=FORMATS, help="Default: taken from the file extension.")
+        parser.add_argument("--skip-invalid", action="store_true", help="Import the valid rows and report the rest.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Unknown user '{options['user']}'.")
+
+        fmt = options["format"] or format_from_name(options["path"])
+        importer = Importer(
+            user,
+            options["kind"],
+            batch_size=options["batch_size"],
+            skip_invalid=options["skip_invalid"],
+            dry_run=options["dry_run"],
+        )
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as f:
+                importer.run(read_rows(f, fmt))
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in importer.errors:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+
+        if importer.error_count and not (options["skip_invalid"] or options["dry_run"]):
+            raise CommandError(f"{importer.error_count} invalid rows, nothing was imported.")
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        count = importer.rows - importer.error_count if options["dry_run"] else importer.created
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} {options['kind']}, {importer.error_count} invalid rows."
+        ))
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garage', '0002_initial'),
+        ('logbook', '0002_refuel_currency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='refuel',
+            index=models.Index(fields=['car', '-date', '-created_at'], name='refuel_car_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['car', '-start_date', '-created_at'], name='trip_car_start_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:05
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0003_trip_refuel_car_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refuel',
+            name='total_cost_eur',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(currency='BGN', then=django.db.models.expressions.CombinedExpression(models.F('total_cost'), '/', models.Value(Decimal('1.95583')))), default=models.F('total_cost')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='distance',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Greatest(django.db.models.expressions.CombinedExpression(models.F('end_odometer'), '-', models.F('start_odometer')), 0), output_field=models.PositiveIntegerField()),
+        ),
+    ]
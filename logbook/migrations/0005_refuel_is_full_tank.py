@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0004_trip_distance_refuel_total_cost_eur'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refuel',
+            name='is_full_tank',
+            field=models.BooleanField(default=True, help_text='The tank was filled up completely.'),
+        ),
+    ]
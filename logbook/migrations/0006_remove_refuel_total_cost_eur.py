@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logbook', '0005_refuel_is_full_tank'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='refuel',
+            name='total_cost_eur',
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
@@ -38,6 +39,13 @@ class Trip(models.Model):
 
     notes = models.TextField(blank=True)
 
+    # Stored so aggregates and sorting read one column; clamped like distance_km.
+    distance = models.GeneratedField(
+        expression=Greatest(models.F("end_odometer") - models.F("start_odometer"), 0),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+    )
+
     tags = models.ManyToManyField(
         Tag,
         blank=True,
@@ -48,12 +56,17 @@ class Trip(models.Model):
 
     class Meta:
         ordering = ("-start_date", "-created_at")
+        indexes = [
+            # Per-car lists, month ranges and API listings filter by car and sort like Meta.ordering.
+            models.Index(fields=["car", "-start_date", "-created_at"], name="trip_car_start_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.car} | {self.from_city} -> {self.to_city} ({self.start_date})"
 
     @property
     def distance_km(self) -> int:
+        # Also works on unsaved trips; querysets should use the `distance` column.
         return max(0, self.end_odometer - self.start_odometer)
 
     def clean(self):
@@ -103,6 +116,9 @@ class Refuel(models.Model):
         help_text="Currency of the total cost.",
     )
 
+    # Consumption (L/100km) is measured between full-tank refuels (see statsapp.series).
+    is_full_tank = models.BooleanField(default=True, help_text="The tank was filled up completely.")
+
     fuel_type = models.CharField(max_length=20, blank=True)
     station = models.CharField(max_length=60, blank=True)
 
@@ -110,6 +126,10 @@ class Refuel(models.Model):
 
     class Meta:
         ordering = ("-date", "-created_at")
+        indexes = [
+            # Serves per-car lists/ranges and the odometer timeline loads (logbook.odometer).
+            models.Index(fields=["car", "-date", "-created_at"], name="refuel_car_date_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.car} | {self.date} | {self.liters}L"
@@ -0,0 +1,98 @@
+"""
+Per-car odometer timeline: trip start/end readings and refuel readings merged
+into one date-sorted list, so a new reading can be checked against its
+neighbours with two bisects instead of ordered queries.
+
+Timelines are cached per car and dropped once any Trip/Refuel write of the
+car commits (see logbook.signals), so the next check rebuilds them from the
+database. Patching the cached copy instead would let two concurrent writes
+of the same car overwrite each other's changes.
+"""
+import bisect
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Trip, Refuel
+
+TRIP = "trip"
+REFUEL = "refuel"
+
+
+def cache_key(car_id) -> str:
+    return f"odometer-timeline:{car_id}"
+
+
+class OdometerTimeline:
+    """
+    Date-sorted (date, low, high, key) readings of one car. A new reading must
+    not be below the previous reading before its date nor above the next one
+    after it. Readings on the same date cannot be ordered and are not
+    compared.
+    """
+
+    def __init__(self, readings=()):
+        self.entries = sorted(readings, key=lambda e: (e[0], e[1], e[2]))
+        self.dates = [e[0] for e in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def conflict(self, day, low, high, exclude=None):
+        """Returns an error message for the reading, or None when it fits."""
+        i = bisect.bisect_left(self.dates, day)
+        j = bisect.bisect_right(self.dates, day)
+
+        # Skip the readings of the row being edited.
+        while i and self.entries[i - 1][3] == exclude:
+            i -= 1
+        while j < len(self.entries) and self.entries[j][3] == exclude:
+            j += 1
+
+        if i and low < self.entries[i - 1][2]:
+            previous = self.entries[i - 1]
+            return f"Odometer must be at least {previous[2]} (previous {previous[3][0]} before this date)."
+        if j < len(self.entries) and high > self.entries[j][1]:
+            following = self.entries[j]
+            return f"Odometer must be at most {following[1]} (next {following[3][0]} after this date)."
+        return None
+
+    def keys_at(self, day, odometer, kind) -> set:
+        """Keys of the `kind` rows with a reading of exactly `odometer` on `day`."""
+        i = bisect.bisect_left(self.dates, day)
+        j = bisect.bisect_right(self.dates, day)
+        return {e[3] for e in self.entries[i:j] if e[1] == odometer and e[3][0] == kind}
+
+    def add(self, day, low, high, key):
+        i = bisect.bisect_right(self.dates, day)
+        self.entries.insert(i, (day, low, high, key))
+        self.dates.insert(i, day)
+
+
+def build_timeline(car_id) -> OdometerTimeline:
+    trips = Trip.objects.filter(car_id=car_id).values_list("pk", "start_date", "start_odometer", "end_date", "end_odometer")
+    refuels = Refuel.objects.filter(car_id=car_id).values_list("pk", "date", "odometer")
+    readings = []
+    for pk, start_date, start, end_date, end in trips.order_by():
+        readings.append((start_date, start, start, (TRIP, pk)))
+        readings.append((end_date, end, end, (TRIP, pk)))
+    for pk, day, odometer in refuels.order_by():
+        readings.append((day, odometer, odometer, (REFUEL, pk)))
+    return OdometerTimeline(readings)
+
+
+def get_timeline(car_id) -> OdometerTimeline:
+    """The car's timeline from the cache, built from two queries on a miss."""
+    timeline = cache.get(cache_key(car_id))
+    if timeline is None:
+        timeline = build_timeline(car_id)
+        cache.set(cache_key(car_id), timeline, settings.ODOMETER_TIMELINE_TIMEOUT)
+    return timeline
+
+
+def check_reading(car_id, day, odometer, exclude=None):
+    return get_timeline(car_id).conflict(day, odometer, odometer, exclude=exclude)
+
+
+def invalidate_timelines(car_ids):
+    cache.delete_many([cache_key(car_id) for car_id in car_ids])
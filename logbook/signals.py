@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Tag, Trip, Refuel
+from .odometer import invalidate_timelines
+from .tags import invalidate_tag_choices
+
+# The date that places a Trip or Refuel in time (rollup buckets, odometer timeline).
+DATE_FIELDS = {
+    Trip: "start_date",
+    Refuel: "date",
+}
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def refresh_tag_choices(sender, **kwargs):
+    invalidate_tag_choices()
+
+
+def previous_placement(instance):
+    """(car_id, date) an edited Trip or Refuel had before the save being handled; None for new rows."""
+    return getattr(instance, "_previous_placement", None)
+
+
+@receiver(pre_save, sender=Trip)
+@receiver(pre_save, sender=Refuel)
+def remember_previous_placement(sender, instance, raw=False, **kwargs):
+    # One lookup for every post_save handler that needs the row's previous car or date.
+    instance._previous_placement = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_placement = (
+        sender.objects.filter(pk=instance.pk).values_list("car_id", DATE_FIELDS[sender]).first()
+    )
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Refuel)
+def drop_odometer_timeline_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    car_ids = {instance.car_id}
+    previous = previous_placement(instance)
+    if previous:
+        car_ids.add(previous[0])
+    transaction.on_commit(lambda: invalidate_timelines(car_ids), robust=True)
+
+
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Refuel)
+def drop_odometer_timeline_on_delete(sender, instance, **kwargs):
+    car_id = instance.car_id
+    transaction.on_commit(lambda: invalidate_timelines([car_id]), robust=True)
@@ -0,0 +1,77 @@
+"""
+Process-local cache of tag choices for the tag pickers in trip and car forms.
+
+The shared cache only holds a version token; each process keeps the
+rendered (id, name) list and reloads it when the token changes, which
+happens on every Tag save/delete (see logbook.signals).
+
+Pickers render at most TAG_CHECKBOX_LIMIT checkboxes besides the selected
+tags; the form pages take a ?tag_q= search (TagSearchViewMixin) to show the
+other tags without any script.
+"""
+import uuid
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Tag
+
+VERSION_KEY = "tags:version"
+TAG_QUERY_PARAM = "tag_q"
+
+_local = {"version": None, "choices": []}
+
+
+def _new_version() -> str:
+    # Never repeats, so a token that was evicted and set again cannot match a stale local copy.
+    return uuid.uuid4().hex
+
+
+def get_tag_choices() -> list:
+    version = cache.get_or_set(VERSION_KEY, _new_version, None)
+    if _local["version"] != version:
+        _local["choices"] = list(Tag.objects.order_by("name").values_list("id", "name"))
+        _local["version"] = version
+    return _local["choices"]
+
+
+def invalidate_tag_choices():
+    _local["version"] = None
+    cache.set(VERSION_KEY, _new_version(), None)
+
+
+def setup_tags_field(form, name="tags", query=""):
+    """
+    Renders the tags ModelMultipleChoiceField of a form as checkboxes from the
+    cached choices: the selected tags plus the first TAG_CHECKBOX_LIMIT tags
+    whose name contains `query`. Any tag validates, whether shown or not.
+    """
+    field = form.fields[name]
+    field.required = False
+    field.widget = forms.CheckboxSelectMultiple()
+
+    if form.is_bound:
+        selected = field.widget.value_from_datadict(form.data, form.files, form.add_prefix(name)) or []
+    else:
+        selected = form.initial.get(name) or []
+    selected_ids = {str(getattr(t, "pk", t)) for t in selected}
+    query = query.strip().casefold()
+    choices = get_tag_choices()
+    matches = [pk for pk, label in choices if str(pk) not in selected_ids and query in label.casefold()]
+    shown = selected_ids | {str(pk) for pk in matches[:settings.TAG_CHECKBOX_LIMIT]}
+    field.choices = [(pk, label) for pk, label in choices if str(pk) in shown]
+
+    field.help_text = "Select one or more tags."
+    hidden = len(matches) - settings.TAG_CHECKBOX_LIMIT
+    if hidden > 0:
+        field.help_text += f" {hidden} more tags are not listed; use Find tags to look them up."
+
+
+class TagSearchViewMixin:
+    """Passes the ?tag_q= tag search of a create/update view to its form."""
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["tag_query"] = self.request.GET.get(TAG_QUERY_PARAM, "")
+        return kwargs
@@ -1,30 +1,106 @@
+from decimal import Decimal
+
 from celery import shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from core.currency import converted
+from core.mail import send_messages
+from core.periods import range_filter
+from core.utils import chunked
 from .models import Trip, Refuel
 
 User = get_user_model()
 
 
-@shared_task
-def send_weekly_summary_email(user_id: int) -> bool:
-    user = User.objects.filter(pk=user_id).first()
-    if not user or not user.email:
-        return False
+def _weekly_summaries(user_ids, start, today) -> dict:
+    """
+    Aggregates the weekly totals of many users at once: one grouped query for
+    trips (per car) and one for refuels (per car and currency).
+    Returns {user_id: {car_id: {...}}}.
+    """
+    end = today + timezone.timedelta(days=1)
+    trips_by_car = (
+        Trip.objects.filter(car__owner_id__in=user_ids, **range_filter("start_date", start, end))
+        .values("car__owner_id", "car_id", "car__brand", "car__model", "car__year")
+        .annotate(
+            trips_count=Count("id"),
+            total_km=Coalesce(Sum("distance"), 0),
+        )
+        .order_by()
+    )
+    refuels_by_car_currency = (
+        Refuel.objects.filter(car__owner_id__in=user_ids, **range_filter("date", start, end))
+        .values("car__owner_id", "car_id", "car__brand", "car__model", "car__year", "currency")
+        .annotate(
+            # In each owner's preferred currency, at the rate of the refuel date. Listed
+            # before total_cost, which would otherwise shadow the column of that name.
+            converted_cost=Coalesce(
+                Sum(converted("total_cost", "currency", "date", F("car__owner__preferred_currency"))),
+                Decimal("0"),
+            ),
+            refuels_count=Count("id"),
+            total_cost=Coalesce(Sum("total_cost"), Decimal("0")),
+        )
+        .order_by()
+    )
 
-    today = timezone.localdate()
-    start = today - timezone.timedelta(days=7)
+    summaries = {}
+
+    def car_entry(row):
+        cars = summaries.setdefault(row["car__owner_id"], {})
+        if row["car_id"] not in cars:
+            cars[row["car_id"]] = {
+                "label": f'{row["car__brand"]} {row["car__model"]} ({row["car__year"]})',
+                "trips_count": 0,
+                "total_km": 0,
+                "refuels_count": 0,
+                "cost_by_currency": {},
+                "converted_cost": Decimal("0"),
+            }
+        return cars[row["car_id"]]
+
+    for t in trips_by_car:
+        entry = car_entry(t)
+        entry["trips_count"] = t["trips_count"]
+        entry["total_km"] = int(t["total_km"] or 0)
+
+    for r in refuels_by_car_currency:
+        entry = car_entry(r)
+        entry["refuels_count"] += r["refuels_count"]
+        entry["cost_by_currency"][r["currency"]] = r["total_cost"]
+        entry["converted_cost"] += r["converted_cost"]
 
-    trips = Trip.objects.filter(car__owner=user, start_date__gte=start, start_date__lte=today)
-    refuels = Refuel.objects.filter(car__owner=user, date__gte=start, date__lte=today)
+    return summaries
 
-    trips_count = trips.count()
-    total_km = sum((t.distance_km for t in trips), 0)
 
-    refuels_count = refuels.count()
-    total_cost = sum((r.total_cost for r in refuels), 0)
+def _format_costs(cost_by_currency) -> str:
+    if not cost_by_currency:
+        return "0"
+    return ", ".join(f"{cost_by_currency[c]:.2f} {c}" for c in sorted(cost_by_currency))
+
+
+def _weekly_summary_message(user, cars, start, today) -> EmailMessage:
+    cars = sorted(cars.values(), key=lambda c: c["label"])
+
+    trips_count = sum(c["trips_count"] for c in cars)
+    total_km = sum(c["total_km"] for c in cars)
+    refuels_count = sum(c["refuels_count"] for c in cars)
+    total_cost = {}
+    for c in cars:
+        for currency, cost in c["cost_by_currency"].items():
+            total_cost[currency] = total_cost.get(currency, Decimal("0")) + cost
+    converted_cost = sum((c["converted_cost"] for c in cars), Decimal("0"))
+
+    per_car = "".join(
+        f"- {c['label']}: {c['trips_count']} trips, {c['total_km']} km, "
+        f"{c['refuels_count']} refuels, fuel {_format_costs(c['cost_by_currency'])}\n"
+        for c in cars
+    )
 
     subject = "Your weekly Trip Logbook summary"
     message = (
@@ -33,23 +109,58 @@ def send_weekly_summary_email(user_id: int) -> bool:
         f"- Trips: {trips_count}\n"
         f"- Distance: {total_km} km\n"
         f"- Refuels: {refuels_count}\n"
-        f"- Fuel cost: {total_cost}\n\n"
-        f"Have a great week!\n"
+        f"- Fuel cost: {_format_costs(total_cost)} (total {converted_cost:.2f} {user.preferred_currency})\n\n"
+        + (f"Per car:\n{per_car}\n" if per_car else "")
+        + f"Have a great week!\n"
     )
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=None, 
-        recipient_list=[user.email],
-        fail_silently=True,
+    return EmailMessage(subject=subject, body=message, to=[user.email])
+
+
+def _summary_period():
+    today = timezone.localdate()
+    return today - timezone.timedelta(days=7), today
+
+
+@shared_task
+def send_weekly_summary_email(user_id: int) -> bool:
+    user = User.objects.filter(pk=user_id).first()
+    if not user or not user.email:
+        return False
+
+    start, today = _summary_period()
+    summaries = _weekly_summaries([user.pk], start, today)
+    message = _weekly_summary_message(user, summaries.get(user.pk, {}), start, today)
+    return send_messages([message]) == 1
+
+
+@shared_task(ignore_result=True)
+def send_weekly_summary_batch(user_ids) -> int:
+    """
+    Sends the weekly summary to a batch of users. Totals come from two grouped
+    queries per batch and all messages go out over one mail connection.
+    """
+    start, today = _summary_period()
+    users = list(User.objects.filter(pk__in=user_ids).exclude(email="").exclude(email__isnull=True))
+    summaries = _weekly_summaries([u.pk for u in users], start, today)
+    return send_messages(
+        _weekly_summary_message(user, summaries.get(user.pk, {}), start, today)
+        for user in users
     )
-    return True
 
 
 @shared_task
 def send_weekly_summary_for_all_users() -> int:
-    user_ids = list(User.objects.exclude(email="").exclude(email__isnull=True).values_list("id", flat=True))
-    for uid in user_ids:
-        send_weekly_summary_email.delay(uid)
-    return len(user_ids)
\ No newline at end of file
+    batch_size = settings.WEEKLY_SUMMARY_BATCH_SIZE
+    user_ids = (
+        User.objects.exclude(email="").exclude(email__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    queued = 0
+    # Each batch is published as soon as it is read, so only one batch of ids is held at a time.
+    for batch in chunked(user_ids, batch_size):
+        send_weekly_summary_batch.delay(batch)
+        queued += len(batch)
+    return queued
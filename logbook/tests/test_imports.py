@@ -0,0 +1,124 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.cache import get_data_version
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.imports import KIND_REFUELS, KIND_TRIPS, Importer, read_rows
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat
+
+TRIPS_CSV = """car,start_date,end_date,start_odometer,end_odometer,from_city,to_city,notes
+{car},2025-01-05,,1000,1100,Sofia,Plovdiv,
+{car},2025-01-20,2025-01-21,1100,1500,Plovdiv,Varna,two days
+WVWZZZ1KZAW000001,2025-02-02,,1500,1600,Varna,Sofia,by VIN
+"""
+
+
+class LogbookImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = create_user("owner", preferred_currency="EUR")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual",
+            vin="WVWZZZ1KZAW000001",
+        )
+        self.other_car = Car.objects.create(
+            owner=create_user("other"), brand="BMW", model="X3", year=2019, fuel="diesel", gearbox="manual"
+        )
+
+    def run_import(self, kind, text, fmt="csv", **options):
+        with mock.patch("statsapp.signals.rebuild_monthly_stats_range.delay") as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            importer = Importer(self.owner, kind, **options).run(read_rows(io.StringIO(text), fmt))
+        return importer, delay
+
+    def test_csv_trips_are_bulk_inserted_and_rollups_rebuilt_once(self):
+        MonthlyCarStat.objects.create(car=self.car, year=2025, month=1, trips_count=9)
+        version = get_data_version(self.owner.pk)
+
+        importer, delay = self.run_import(KIND_TRIPS, TRIPS_CSV.format(car=self.car.pk), batch_size=2)
+
+        self.assertEqual((importer.rows, importer.created, importer.errors), (3, 3, []))
+        self.assertEqual(Trip.objects.filter(car=self.car).count(), 3)
+        self.assertEqual(Trip.objects.get(notes="two days").end_date, datetime.date(2025, 1, 21))
+        delay.assert_called_once_with([self.car.pk], [2025, 1], [2025, 2])
+        self.assertFalse(MonthlyCarStat.objects.filter(car=self.car).exists())
+        self.assertNotEqual(get_data_version(self.owner.pk), version)
+
+    def test_odometer_is_checked_against_existing_and_imported_rows(self):
+        Refuel.objects.create(
+            car=self.car, created_by=self.owner, date=datetime.date(2025, 3, 1), odometer=5000,
+            liters="40.00", total_cost="80.00",
+        )
+        rows = [
+            {"car": self.car.pk, "date": "2025-02-01", "odometer": 4000, "liters": "30", "total_cost": "60"},
+            {"car": self.car.pk, "date": "2025-02-10", "odometer": 3900, "liters": "30", "total_cost": "60"},
+            {"car": self.car.pk, "date": "2025-04-01", "odometer": 4900, "liters": "30", "total_cost": "60"},
+            {"car": self.other_car.pk, "date": "2025-04-01", "odometer": 100, "liters": "30", "total_cost": "60"},
+        ]
+        text = "\n".join(json.dumps(r) for r in rows) + "\nnot json\n"
+
+        with self.assertNumQueries(6):
+            importer = Importer(self.owner, KIND_REFUELS, dry_run=True).run(read_rows(io.StringIO(text), "json"))
+        self.assertEqual([e["row"] for e in importer.errors], [2, 3, 4, 5])
+        self.assertIn("at least 4000", importer.errors[0]["error"])
+        self.assertIn("at least 5000", importer.errors[1]["error"])
+        self.assertIn("Unknown car", importer.errors[2]["error"])
+
+        importer, delay = self.run_import(KIND_REFUELS, text, fmt="json")
+        self.assertEqual(importer.created, 0)
+        self.assertEqual(Refuel.objects.count(), 1)
+        delay.assert_not_called()
+
+        importer, delay = self.run_import(KIND_REFUELS, text, fmt="json", skip_invalid=True)
+        self.assertEqual(importer.created, 1)
+        refuel = Refuel.objects.get(date=datetime.date(2025, 2, 1))
+        self.assertEqual((refuel.currency, refuel.liters), ("EUR", Decimal("30.00")))
+        delay.assert_called_once_with([self.car.pk], [2025, 2], [2025, 2])
+
+    def test_command(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "trips.csv")
+        with open(path, "w") as f:
+            f.write(TRIPS_CSV.format(car=self.car.pk))
+
+        out = io.StringIO()
+        with mock.patch("statsapp.signals.rebuild_monthly_stats_range.delay"), \
+                self.captureOnCommitCallbacks(execute=True):
+            call_command("import_logbook", path, user="owner", kind="trips", stdout=out)
+        self.assertIn("Imported 3 trips, 0 invalid rows.", out.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "3 invalid rows, nothing was imported."):
+            call_command("import_logbook", path, user="owner", kind="trips", stderr=io.StringIO())
+
+    def test_upload_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        upload = SimpleUploadedFile("trips.csv", TRIPS_CSV.format(car=self.car.pk).encode("utf-8-sig"))
+
+        with mock.patch("statsapp.signals.rebuild_monthly_stats_range.delay"), \
+                self.captureOnCommitCallbacks(execute=True):
+            resp = client.post(reverse("api-logbook-import"), {"file": upload, "kind": "trips"}, format="multipart")
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["created"], 3)
+
+        upload = SimpleUploadedFile("trips.csv", TRIPS_CSV.format(car=self.car.pk).encode())
+        resp = client.post(reverse("api-logbook-import"), {"file": upload, "kind": "trips"}, format="multipart")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["error_count"], 3)
+        self.assertIn("Duplicate", resp.data["errors"][0]["error"])
+        self.assertEqual(Trip.objects.count(), 3)
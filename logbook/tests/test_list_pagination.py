@@ -0,0 +1,67 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from logbook.views import TripListView
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="auto"
+        )
+        # Several trips share a date so the created_at/id tie-breakers matter.
+        self.trips = [
+            Trip.objects.create(
+                car=self.car,
+                created_by=self.owner,
+                start_odometer=i * 10,
+                end_odometer=i * 10 + 5,
+                start_date=datetime.date(2025, 1, 1 + i // 3),
+                end_date=datetime.date(2025, 1, 1 + i // 3),
+                from_city="Sofia",
+                to_city="Plovdiv",
+            )
+            for i in range(7)
+        ]
+        self.client.login(username="owner", password="StrongPass123!")
+
+    @mock.patch.object(TripListView, "paginate_by", 3)
+    def test_walks_all_pages_forward_and_back_without_gaps(self):
+
+        seen, pages, params = [], [], {}
+        while True:
+            resp = self.client.get(reverse("trip-list"), params)
+            page = resp.context["page_obj"]
+            pages.append(page)
+            seen.extend(page.object_list)
+            if not page.has_next():
+                break
+            params = {"after": page.next_cursor}
+
+        expected = list(Trip.objects.filter(car=self.car).order_by("-start_date", "-created_at", "-id"))
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+
+        resp = self.client.get(reverse("trip-list"), {"before": pages[-1].previous_cursor})
+        self.assertEqual(list(resp.context["object_list"]), list(pages[1].object_list))
+
+    def test_invalid_cursor_returns_404(self):
+        resp = self.client.get(reverse("refuel-list"), {"after": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_refuel_list_is_paginated(self):
+        Refuel.objects.create(
+            car=self.car, created_by=self.owner, date=datetime.date(2025, 1, 1),
+            odometer=100, liters="30.00", total_cost="90.00",
+        )
+        resp = self.client.get(reverse("refuel-list"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.context["is_paginated"])
+        self.assertEqual(len(resp.context["refuels"]), 1)
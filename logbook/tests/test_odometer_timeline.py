@@ -0,0 +1,112 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.forms import RefuelCreateForm, RefuelEditForm
+from logbook.models import Trip, Refuel
+from logbook.odometer import REFUEL, TRIP, OdometerTimeline, get_timeline
+
+DAY = datetime.date(2025, 3, 10)
+
+
+class OdometerTimelineTests(TestCase):
+    def test_neighbours_are_found_by_date(self):
+        timeline = OdometerTimeline([
+            (DAY - datetime.timedelta(days=1), 100, 100, (TRIP, 1)),
+            (DAY, 150, 150, (TRIP, 1)),
+            (DAY + datetime.timedelta(days=1), 200, 200, (REFUEL, 1)),
+        ])
+
+        self.assertIsNone(timeline.conflict(DAY, 120, 120))
+        self.assertEqual(
+            timeline.conflict(DAY, 90, 90),
+            "Odometer must be at least 100 (previous trip before this date).",
+        )
+        self.assertEqual(
+            timeline.conflict(DAY, 250, 250),
+            "Odometer must be at most 200 (next refuel after this date).",
+        )
+        self.assertIsNone(timeline.conflict(DAY + datetime.timedelta(days=1), 250, 250, exclude=(REFUEL, 1)))
+
+
+class RefuelOdometerValidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual"
+        )
+        self.trip = Trip.objects.create(
+            car=self.car, created_by=self.owner, start_odometer=1000, end_odometer=1200,
+            start_date=DAY - datetime.timedelta(days=5), end_date=DAY - datetime.timedelta(days=4),
+            from_city="Sofia", to_city="Varna",
+        )
+        self.refuel = Refuel.objects.create(
+            car=self.car, created_by=self.owner, date=DAY + datetime.timedelta(days=5), odometer=1500,
+            liters="40.00", total_cost="80.00",
+        )
+
+    def form(self, odometer, form_class=RefuelCreateForm, **kwargs):
+        return form_class(
+            data={
+                "car": self.car.pk, "date": DAY.isoformat(), "odometer": odometer,
+                "liters": "30.00", "total_cost": "60.00", "currency": "BGN",
+            },
+            user=self.owner,
+            **kwargs,
+        )
+
+    def test_refuel_is_checked_against_trip_readings(self):
+        form = self.form(1100)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["odometer"], ["Odometer must be at least 1200 (previous trip before this date)."]
+        )
+
+        form = self.form(1600)
+        self.assertFalse(form.is_valid())
+        self.assertIn("at most 1500", form.errors["odometer"][0])
+
+    def test_validation_uses_the_cached_timeline(self):
+        get_timeline(self.car.pk)
+        with self.assertNumQueries(2):  # car choice lookup and the model's FK check
+            self.assertTrue(self.form(1300).is_valid())
+
+    def test_editing_a_refuel_ignores_its_own_reading(self):
+        form = self.form(1450, form_class=RefuelEditForm, instance=self.refuel)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_writes_drop_the_cached_timeline(self):
+        get_timeline(self.car.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Refuel.objects.create(
+                car=self.car, created_by=self.owner, date=DAY, odometer=1300,
+                liters="30.00", total_cost="60.00",
+            )
+            self.trip.end_odometer = 1250
+            self.trip.save()
+
+        with self.assertNumQueries(2):
+            timeline = get_timeline(self.car.pk)
+        self.assertEqual([e[2] for e in timeline.entries], [1000, 1250, 1300, 1500])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refuel.delete()
+        with self.assertNumQueries(2):
+            self.assertEqual(len(get_timeline(self.car.pk)), 3)
+
+    def test_moving_a_trip_drops_both_timelines(self):
+        other_car = Car.objects.create(
+            owner=self.owner, brand="Opel", model="Astra", year=2015, fuel="petrol", gearbox="manual"
+        )
+        get_timeline(self.car.pk)
+        get_timeline(other_car.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trip.car = other_car
+            self.trip.save()
+
+        self.assertEqual(len(get_timeline(self.car.pk)), 1)
+        self.assertEqual(len(get_timeline(other_car.pk)), 2)
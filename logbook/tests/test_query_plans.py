@@ -0,0 +1,135 @@
+import datetime
+import json
+import os
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, tag
+
+from core.periods import month_range, range_filter
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+
+SEED_ROWS = int(os.getenv("QUERY_PLAN_SEED_ROWS", "1000000"))
+SEED_CARS = 500
+
+
+def plan_nodes(plan):
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        yield node
+        nodes.extend(node.get("Plans", []))
+
+
+def plan_node_types(plan):
+    return [node["Node Type"] for node in plan_nodes(plan)]
+
+
+@tag("slow")
+@skipUnless(connection.vendor == "postgresql", "Query plans are checked against PostgreSQL only.")
+class QueryPlanTests(TestCase):
+    """
+    Seeds SEED_ROWS trips and refuels spread over SEED_CARS cars and checks that
+    the owner/date access paths are served by the composite car/date indexes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("owner")
+        Car.objects.bulk_create(
+            Car(owner=cls.user, brand="Car", model=str(i), year=2000 + i % 25, fuel="diesel", gearbox="manual")
+            for i in range(SEED_CARS)
+        )
+        cls.car = Car.objects.filter(owner=cls.user).order_by("id").first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Trip._meta.db_table}
+                    (car_id, created_by_id, start_odometer, end_odometer, start_date, end_date,
+                     from_city, to_city, notes, created_at)
+                SELECT c.id, %s, g * 10, g * 10 + 5,
+                       DATE '2015-01-01' + (g %% 3650), DATE '2015-01-01' + (g %% 3650),
+                       'A', 'B', '', NOW()
+                FROM generate_series(1, %s) AS g
+                JOIN (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS n FROM {Car._meta.db_table}) c
+                  ON c.n = g %% %s
+                """,
+                [cls.user.pk, SEED_ROWS, SEED_CARS],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {Refuel._meta.db_table}
+                    (car_id, created_by_id, date, odometer, liters, total_cost, currency,
+                     fuel_type, station, created_at)
+                SELECT c.id, %s, DATE '2015-01-01' + (g %% 3650), g * 10, 40, 100, 'BGN', '', '', NOW()
+                FROM generate_series(1, %s) AS g
+                JOIN (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS n FROM {Car._meta.db_table}) c
+                  ON c.n = g %% %s
+                """,
+                [cls.user.pk, SEED_ROWS, SEED_CARS],
+            )
+            cursor.execute(f"ANALYZE {Trip._meta.db_table}")
+            cursor.execute(f"ANALYZE {Refuel._meta.db_table}")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+        self.assertTrue(
+            any("Index" in node for node in plan_node_types(plan)),
+            f"Expected an index scan, got: {list(plan_node_types(plan))}",
+        )
+        self.assertIn(index_name, json.dumps(plan))
+
+    def test_trip_list_for_car_uses_index(self):
+        self.assertUsesIndex(Trip.objects.filter(car=self.car)[:20], "trip_car_start_created_idx")
+
+    def test_trip_month_range_uses_index(self):
+        qs = Trip.objects.filter(
+            car=self.car,
+            start_date__gte=datetime.date(2020, 3, 1),
+            start_date__lt=datetime.date(2020, 4, 1),
+        )
+        self.assertUsesIndex(qs, "trip_car_start_created_idx")
+
+    def test_refuel_list_for_car_uses_index(self):
+        self.assertUsesIndex(Refuel.objects.filter(car=self.car)[:20], "refuel_car_date_created_idx")
+
+    def test_refuel_previous_and_next_lookups_use_index(self):
+        day = datetime.date(2020, 3, 15)
+        base_qs = Refuel.objects.filter(car=self.car)
+        self.assertUsesIndex(
+            base_qs.filter(date__lt=day).order_by("-date", "-created_at")[:1],
+            "refuel_car_date_created_idx",
+        )
+        self.assertUsesIndex(
+            base_qs.filter(date__gt=day).order_by("date", "created_at")[:1],
+            "refuel_car_date_created_idx",
+        )
+
+    def test_sargable_month_range_bounds_the_index_scan(self):
+        # The half-open range becomes an index condition on start_date; the
+        # month EXTRACT can only filter the rows the car_id condition returns.
+        car_ids = list(Car.objects.filter(owner=self.user).values_list("id", flat=True)[:20])
+        extract_qs = Trip.objects.filter(car_id__in=car_ids, start_date__year=2020, start_date__month=3)
+        range_qs = Trip.objects.filter(car_id__in=car_ids, **range_filter("start_date", *month_range(2020, 3)))
+
+        def conditions(queryset, key):
+            plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+            return [node[key] for node in plan_nodes(plan) if key in node]
+
+        self.assertEqual(extract_qs.count(), range_qs.count())
+        self.assertUsesIndex(range_qs, "trip_car_start_created_idx")
+        self.assertTrue(
+            any("start_date" in cond for cond in conditions(range_qs, "Index Cond")),
+            conditions(range_qs, "Index Cond"),
+        )
+        self.assertFalse(
+            any("month" in cond.lower() for cond in conditions(extract_qs, "Index Cond")),
+            conditions(extract_qs, "Index Cond"),
+        )
+        self.assertTrue(
+            any("month" in cond.lower() for cond in conditions(extract_qs, "Filter")),
+            conditions(extract_qs, "Filter"),
+        )
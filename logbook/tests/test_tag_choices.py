@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.tests.helpers import create_user
+from garage.forms import CarCreateForm
+from garage.models import Car
+from logbook.forms import TripCreateForm
+from logbook.models import Tag
+from logbook.tags import VERSION_KEY
+
+
+class TagChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("owner")
+        for name in ("Vacation", "Highway", "Business trip"):
+            Tag.objects.create(name=name)
+
+    def test_forms_reuse_cached_choices(self):
+        TripCreateForm(user=self.user)
+        with self.assertNumQueries(0):
+            form = CarCreateForm()
+            self.assertEqual(
+                [label for _, label in form.fields["tags"].choices],
+                ["Business trip", "Highway", "Vacation"],
+            )
+
+    def test_tag_save_refreshes_choices(self):
+        CarCreateForm()
+        Tag.objects.create(name="Inner-city")
+        self.assertIn("Inner-city", [label for _, label in CarCreateForm().fields["tags"].choices])
+
+    def test_evicted_version_does_not_revive_stale_choices(self):
+        CarCreateForm()
+        # Another process renames a tag after the version was evicted from the shared cache.
+        cache.delete(VERSION_KEY)
+        Tag.objects.filter(name="Highway").update(name="Motorway")
+        self.assertIn("Motorway", [label for _, label in CarCreateForm().fields["tags"].choices])
+
+    @override_settings(TAG_CHECKBOX_LIMIT=50)
+    def test_large_catalogs_list_a_capped_set_of_checkboxes(self):
+        Tag.objects.bulk_create(Tag(name=f"Tag {i:03d}") for i in range(120))
+        car = Car.objects.create(owner=self.user, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="manual")
+        tag = Tag.objects.get(name="Tag 117")
+
+        form = TripCreateForm(user=self.user)
+        self.assertEqual(len(form.fields["tags"].choices), 50)
+        self.assertNotIn(f'value="{tag.pk}"', str(form["tags"]))
+        self.assertIn("73 more tags are not listed", form.fields["tags"].help_text)
+
+        form = TripCreateForm(user=self.user, tag_query="117")
+        self.assertEqual([label for _, label in form.fields["tags"].choices], ["Tag 117"])
+
+        # A selected tag stays listed and valid whatever the search.
+        form = TripCreateForm(
+            data={
+                "car": car.pk, "start_odometer": 100, "end_odometer": 150,
+                "start_date": "2025-03-01", "end_date": "2025-03-01",
+                "from_city": "Sofia", "to_city": "Plovdiv", "tags": [tag.pk],
+            },
+            user=self.user,
+        )
+        self.assertIn(f'value="{tag.pk}"', str(form["tags"]))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(list(form.cleaned_data["tags"]), [tag])
+
+    @override_settings(TAG_CHECKBOX_LIMIT=2)
+    def test_form_pages_take_a_tag_search(self):
+        self.client.force_login(self.user)
+        highway = Tag.objects.get(name="Highway")
+        vacation = Tag.objects.get(name="Vacation")
+
+        resp = self.client.get(reverse("car-create"), {"tag_q": "vac"})
+        self.assertContains(resp, f'value="{vacation.pk}"')
+        self.assertNotContains(resp, f'value="{highway.pk}"')
+        self.assertNotContains(self.client.get(reverse("trip-create")), f'value="{vacation.pk}"')
+
+    def test_tag_search_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        resp = client.get(reverse("api-tag-list"), {"search": "h"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([t["name"] for t in resp.data["results"]], ["Highway"])
@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from django.db.models import Sum
 from django.utils import timezone
 
 from core.tests.helpers import create_user
@@ -59,4 +60,17 @@ class TripModelTests(TestCase):
             to_city="Plovdiv",
         )
         with self.assertRaises(ValidationError):
-            t.full_clean()
\ No newline at end of file
+            t.full_clean()
+
+    def test_generated_distance_matches_python_value(self):
+        common = dict(
+            car=self.car, created_by=self.user, from_city="Sofia", to_city="Plovdiv",
+        )
+        trips = [
+            Trip.objects.create(start_odometer=100, end_odometer=250, **common),
+            # Bypasses clean(); the column clamps at zero like distance_km.
+            Trip.objects.create(start_odometer=300, end_odometer=200, **common),
+        ]
+        distances = dict(Trip.objects.values_list("pk", "distance"))
+        self.assertEqual(distances, {t.pk: t.distance_km for t in trips})
+        self.assertEqual(Trip.objects.aggregate(total=Sum("distance"))["total"], 150)
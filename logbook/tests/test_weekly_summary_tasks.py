@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from logbook.tasks import send_weekly_summary_batch, send_weekly_summary_for_all_users
+
+
+class WeeklySummaryTasksTests(TestCase):
+    def setUp(self):
+        self.users = [create_user(f"driver{i}") for i in range(5)]
+        create_user("no_email", email="")
+
+    @override_settings(WEEKLY_SUMMARY_BATCH_SIZE=2)
+    @mock.patch("logbook.tasks.send_weekly_summary_batch.delay")
+    def test_fan_out_dispatches_one_task_per_batch(self, delay):
+        queued = send_weekly_summary_for_all_users()
+
+        self.assertEqual(queued, 5)
+        self.assertEqual([len(c.args[0]) for c in delay.call_args_list], [2, 2, 1])
+
+    def test_batch_sends_one_email_per_user_over_one_connection(self):
+        with mock.patch("core.mail.get_connection", wraps=mail.get_connection) as get_connection:
+            sent = send_weekly_summary_batch([u.pk for u in self.users[:3]])
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        get_connection.assert_called_once()
+
+    def test_summary_totals_are_split_per_currency(self):
+        user = self.users[0]
+        car = Car.objects.create(owner=user, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="auto")
+        today = timezone.localdate()
+        for i in range(3):
+            Trip.objects.create(
+                car=car, created_by=user, start_odometer=100 * i, end_odometer=100 * i + 50,
+                start_date=today, end_date=today, from_city="Sofia", to_city="Plovdiv",
+            )
+        for currency, cost in (("BGN", "100.00"), ("EUR", "40.00"), ("EUR", "10.00")):
+            Refuel.objects.create(
+                car=car, created_by=user, date=today, odometer=300,
+                liters="30.00", total_cost=cost, currency=currency,
+            )
+
+        with self.assertNumQueries(3):
+            send_weekly_summary_batch([user.pk])
+
+        body = mail.outbox[0].body
+        self.assertIn("- Trips: 3", body)
+        self.assertIn("- Distance: 150 km", body)
+        self.assertIn("- Fuel cost: 100.00 BGN, 50.00 EUR", body)
+        self.assertIn("VW Golf (2018): 3 trips, 150 km, 3 refuels", body)
@@ -4,17 +4,21 @@ from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView
 )
 
+from core.pagination import KeysetPaginationMixin
 from .models import Trip, Refuel
 from .forms import (
     TripCreateForm, TripEditForm,
     RefuelCreateForm, RefuelEditForm,
 )
+from .tags import TagSearchViewMixin
 
 
-class TripListView(LoginRequiredMixin, ListView):
+class TripListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Trip
     template_name = "logbook/trip_list.html"
     context_object_name = "trips"
+    keyset = ("-start_date", "-created_at", "-id")
+    query_budget = 4
 
     def get_queryset(self):
         return (
@@ -41,7 +45,7 @@ class TripDetailView(LoginRequiredMixin, DetailView):
         )
 
 
-class TripCreateView(LoginRequiredMixin, CreateView):
+class TripCreateView(LoginRequiredMixin, TagSearchViewMixin, CreateView):
     model = Trip
     form_class = TripCreateForm
     template_name = "logbook/trip_form.html"
@@ -59,7 +63,7 @@ class TripCreateView(LoginRequiredMixin, CreateView):
         return kwargs
 
 
-class TripUpdateView(LoginRequiredMixin, UpdateView):
+class TripUpdateView(LoginRequiredMixin, TagSearchViewMixin, UpdateView):
     model = Trip
     form_class = TripEditForm
     template_name = "logbook/trip_form.html"
@@ -85,10 +89,12 @@ class TripDeleteView(LoginRequiredMixin, DeleteView):
         return super().get_queryset().filter(car__owner=self.request.user)
 
 
-class RefuelListView(LoginRequiredMixin, ListView):
+class RefuelListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Refuel
     template_name = "logbook/refuel_list.html"
     context_object_name = "refuels"
+    keyset = ("-date", "-created_at", "-id")
+    query_budget = 3
 
     def get_queryset(self):
         return (
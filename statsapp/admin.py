@@ -1,9 +1,16 @@
 from django.contrib import admin
-from .models import MonthlyCarStat
+from .models import MonthlyCarStat, MonthlyCarFuelStat
 
 
 @admin.register(MonthlyCarStat)
 class MonthlyCarStatAdmin(admin.ModelAdmin):
-    list_display = ("car", "year", "month", "trips_count", "total_distance_km", "refuels_count", "total_fuel_cost", "updated_at")
+    list_display = ("car", "year", "month", "trips_count", "total_distance_km", "refuels_count", "total_fuel_liters", "updated_at")
     list_filter = ("year", "month")
+    search_fields = ("car__brand", "car__model", "car__owner__username")
+
+
+@admin.register(MonthlyCarFuelStat)
+class MonthlyCarFuelStatAdmin(admin.ModelAdmin):
+    list_display = ("car", "year", "month", "currency", "refuels_count", "total_fuel_liters", "total_fuel_cost", "updated_at")
+    list_filter = ("year", "month", "currency")
     search_fields = ("car__brand", "car__model", "car__owner__username")
\ No newline at end of file
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class StatsappConfig(AppConfig):
     name = 'statsapp'
+
+    def ready(self):
+        import statsapp.signals
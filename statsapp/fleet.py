@@ -0,0 +1,228 @@
+"""
+Fleet-wide summary for managers: distance, fuel spend and consumption of
+every car, and of every driver (car owner), over a period, ranked.
+
+The number of queries does not depend on the fleet size. Periods made of
+whole months read the MonthlyCarStat/MonthlyCarFuelStat rollups of the cars
+with a fresh row for every month, like the monthly report; other periods,
+and the cars whose rollups are missing or stale, aggregate Trip and Refuel
+directly with one grouped query each. One more query loads the cars with
+their owners, and rollup costs paid in other currencies than the requested
+one take a grouped conversion query.
+"""
+import datetime
+from calendar import monthrange
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from core.currency import converted
+from core.periods import iter_months, months_range, range_filter
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from .models import MonthlyCarStat, MonthlyCarFuelStat
+from .services import (
+    SOURCE_LIVE,
+    SOURCE_MIXED,
+    SOURCE_ROLLUP,
+    car_label,
+    cars_to_convert,
+    converted_fuel_costs,
+    period_q,
+    rollup_is_fresh,
+)
+
+ORDER_DISTANCE = "distance"
+ORDER_COST = "cost"
+ORDER_CONSUMPTION = "consumption"
+ORDERS = (ORDER_DISTANCE, ORDER_COST, ORDER_CONSUMPTION)
+ORDER_KEYS = {
+    ORDER_DISTANCE: "distance_km",
+    ORDER_COST: "fuel_cost",
+    ORDER_CONSUMPTION: "consumption_l_100km",
+}
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def default_period():
+    """The current month, which the rollups can answer."""
+    today = timezone.localdate()
+    return today.replace(day=1), today.replace(day=monthrange(today.year, today.month)[1])
+
+
+def whole_months(start, end):
+    """((year, month), (year, month)) when start..end (inclusive) is made of whole months, else None."""
+    if start.day != 1 or (end + datetime.timedelta(days=1)).day != 1:
+        return None
+    return (start.year, start.month), (end.year, end.month)
+
+
+def _empty_row():
+    return {
+        "trips_count": 0,
+        "distance_km": 0,
+        "refuels_count": 0,
+        "fuel_liters": Decimal("0"),
+        "fuel_cost": Decimal("0"),
+    }
+
+
+def _fresh_rollups(months) -> dict:
+    """
+    {car_id: (stat rows, fuel rows)} of the cars with a fresh MonthlyCarStat row
+    for every month of the period; other cars have to be aggregated live.
+    """
+    period = period_q(*months)
+    stats, fuel_rows = {}, {}
+    for stat in MonthlyCarStat.objects.filter(period):
+        stats.setdefault(stat.car_id, []).append(stat)
+    for r in MonthlyCarFuelStat.objects.filter(period):
+        fuel_rows.setdefault((r.car_id, r.year, r.month), []).append(r)
+
+    months_count = len(list(iter_months(*months)))
+    now = timezone.now()
+    fresh = {}
+    for car_id, car_stats in stats.items():
+        car_fuel = [fuel_rows.get((car_id, s.year, s.month), []) for s in car_stats]
+        if len(car_stats) == months_count and all(
+            rollup_is_fresh(s, rows, now=now) for s, rows in zip(car_stats, car_fuel)
+        ):
+            fresh[car_id] = (car_stats, [r for rows in car_fuel for r in rows])
+    return fresh
+
+
+def _totals_from_rollups(rollups, months, currency) -> dict:
+    totals = {}
+    for car_id, (stats, fuel_rows) in rollups.items():
+        row = totals[car_id] = _empty_row()
+        for stat in stats:
+            row["trips_count"] += stat.trips_count
+            row["distance_km"] += stat.total_distance_km
+            row["refuels_count"] += stat.refuels_count
+            row["fuel_liters"] += stat.total_fuel_liters
+        row["fuel_cost"] += sum((r.total_fuel_cost for r in fuel_rows if r.currency == currency), Decimal("0"))
+    # Costs are kept per currency; other currencies are converted in SQL at the rate of each refuel's date.
+    converted_costs = converted_fuel_costs(
+        cars_to_convert((r for _, fuel_rows in rollups.values() for r in fuel_rows), currency),
+        months_range(*months),
+        currency,
+    )
+    for (car_id, _), cost in converted_costs.items():
+        totals[car_id]["fuel_cost"] += cost
+    return totals
+
+
+def _totals_from_live(start, end, currency, car_ids=None) -> dict:
+    """Totals aggregated over Trip and Refuel, for `car_ids` or every car when None."""
+    period = (start, end + datetime.timedelta(days=1))
+    cars = {} if car_ids is None else {"car_id__in": car_ids}
+    totals = {}
+    trips = (
+        Trip.objects.filter(**cars, **range_filter("start_date", *period))
+        .values("car_id")
+        .annotate(trips=Count("id"), distance=Sum("distance"))
+        .order_by()
+        .values_list("car_id", "trips", "distance")
+    )
+    for car_id, trips_count, distance in trips:
+        row = totals.setdefault(car_id, _empty_row())
+        row["trips_count"] = trips_count
+        row["distance_km"] = distance or 0
+    refuels = (
+        Refuel.objects.filter(**cars, **range_filter("date", *period))
+        .values("car_id")
+        .annotate(
+            refuels=Count("id"),
+            liters=Sum("liters"),
+            cost=Sum(converted("total_cost", "currency", "date", currency)),
+        )
+        .order_by()
+        .values_list("car_id", "refuels", "liters", "cost")
+    )
+    for car_id, refuels_count, liters, cost in refuels:
+        row = totals.setdefault(car_id, _empty_row())
+        row["refuels_count"] = refuels_count
+        row["fuel_liters"] = liters or Decimal("0")
+        row["fuel_cost"] = cost or Decimal("0")
+    return totals
+
+
+def _finish(row) -> dict:
+    # Liters bought per 100 km driven in the period: a fleet-level approximation,
+    # unlike the full-tank intervals of the per-car series.
+    row["fuel_liters"] = Decimal(row["fuel_liters"]).quantize(Decimal("0.01"))
+    row["fuel_cost"] = Decimal(row["fuel_cost"]).quantize(Decimal("0.01"))
+    row["consumption_l_100km"] = (
+        (row["fuel_liters"] * 100 / row["distance_km"]).quantize(Decimal("0.01")) if row["distance_km"] else None
+    )
+    row["cost_per_km"] = (
+        (row["fuel_cost"] / row["distance_km"]).quantize(Decimal("0.001")) if row["distance_km"] else None
+    )
+    return row
+
+
+def _ranked(rows, order, limit):
+    key = ORDER_KEYS[order]
+    # Highest first; rows without a value (no distance) go last.
+    return sorted(rows, key=lambda r: (r[key] is None, -(r[key] or 0)))[:limit]
+
+
+def build_fleet_summary(start, end, currency, order=ORDER_DISTANCE, limit=DEFAULT_LIMIT) -> dict:
+    """
+    Cars and drivers ranked by `order` for start..end (inclusive dates), with
+    costs in `currency`. Cars without activity are included, so idle cars show
+    up at the bottom of the ranking.
+    """
+    fleet_cars = list(
+        Car.objects.select_related("owner")
+        .only("id", "brand", "model", "year", "owner__id", "owner__username")
+        .order_by("id")
+    )
+    months = whole_months(start, end)
+    rollups = _fresh_rollups(months) if months else {}
+    totals = _totals_from_rollups(rollups, months, currency) if rollups else {}
+    live_ids = [car.id for car in fleet_cars if car.id not in rollups]
+    if live_ids:
+        # Without any rollup the whole fleet is aggregated, no need to list the cars.
+        totals.update(_totals_from_live(start, end, currency, live_ids if rollups else None))
+
+    if not rollups:
+        source = SOURCE_LIVE
+    elif live_ids:
+        source = SOURCE_MIXED
+    else:
+        source = SOURCE_ROLLUP
+
+    cars, drivers = [], {}
+    fleet = _empty_row()
+    for car in fleet_cars:
+        row = totals.get(car.id) or _empty_row()
+        driver = drivers.get(car.owner_id)
+        if driver is None:
+            driver = drivers[car.owner_id] = {
+                "user_id": car.owner_id,
+                "username": car.owner.username,
+                "cars_count": 0,
+                **_empty_row(),
+            }
+        driver["cars_count"] += 1
+        for key, value in row.items():
+            driver[key] += value
+            fleet[key] += value
+        cars.append(_finish({"car_id": car.id, "car_label": car_label(car), "owner": car.owner.username, **row}))
+
+    return {
+        "start": start,
+        "end": end,
+        "currency": currency,
+        "source": source,
+        "order": order,
+        "cars_count": len(cars),
+        "drivers_count": len(drivers),
+        "totals": _finish(fleet),
+        "cars": _ranked(cars, order, limit),
+        "drivers": _ranked([_finish(d) for d in drivers.values()], order, limit),
+    }
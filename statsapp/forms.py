@@ -0,0 +1,27 @@
+from django import forms
+
+from .fleet import DEFAULT_LIMIT, MAX_LIMIT, ORDER_DISTANCE, ORDERS, default_period
+
+
+class FleetSummaryForm(forms.Form):
+    start = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    end = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    order = forms.ChoiceField(choices=[(o, o.capitalize()) for o in ORDERS], required=False)
+    limit = forms.IntegerField(min_value=1, max_value=MAX_LIMIT, required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end = cleaned.get("start"), cleaned.get("end")
+        if self.has_error("start") or self.has_error("end"):
+            pass
+        elif not start and not end:
+            # No period given: the current month.
+            cleaned["start"], cleaned["end"] = default_period()
+        elif not start or not end:
+            # Like the API: never swap a half-given period for another one.
+            self.add_error(None, "Give both start and end, or neither.")
+        elif end < start:
+            self.add_error("end", "The end date must not be before the start date.")
+        cleaned["order"] = cleaned.get("order") or ORDER_DISTANCE
+        cleaned["limit"] = cleaned.get("limit") or DEFAULT_LIMIT
+        return cleaned
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from statsapp.services import rebuild_monthly_stats
+
+
+def parse_month(value):
+    try:
+        year, month = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM.")
+    if not 1 <= month <= 12:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM.")
+    return year, month
+
+
+class Command(BaseCommand):
+    help = "Rebuilds MonthlyCarStat rollups for a set of cars and a month range in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--car", type=int, action="append", dest="car_ids", help="Car id (repeatable). Default: all cars.")
+        parser.add_argument("--from", dest="start", help="First month, YYYY-MM. Default: no lower bound.")
+        parser.add_argument("--to", dest="end", help="Last month, YYYY-MM. Default: no upper bound.")
+        parser.add_argument("--fill-empty", action="store_true", help="Write zero rows for months without activity.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = parse_month(options["start"]) if options["start"] else None
+        end = parse_month(options["end"]) if options["end"] else None
+        if start and end and start > end:
+            raise CommandError("--from must not be after --to.")
+        if options["fill_empty"] and not (start and end):
+            raise CommandError("--fill-empty requires both --from and --to.")
+
+        written = rebuild_monthly_stats(
+            options["car_ids"],
+            start,
+            end,
+            fill_empty=options["fill_empty"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} monthly rollup rows."))
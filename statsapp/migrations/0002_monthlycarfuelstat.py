@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garage', '0002_initial'),
+        ('statsapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCarFuelStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveIntegerField()),
+                ('currency', models.CharField(max_length=3)),
+                ('refuels_count', models.PositiveIntegerField(default=0)),
+                ('total_fuel_liters', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_fuel_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_fuel_stats', to='garage.car')),
+            ],
+            options={
+                'ordering': ('-year', '-month', 'currency'),
+                'unique_together': {('car', 'year', 'month', 'currency')},
+            },
+        ),
+    ]
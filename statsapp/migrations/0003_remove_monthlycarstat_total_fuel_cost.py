@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statsapp', '0002_monthlycarfuelstat'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='monthlycarstat',
+            name='total_fuel_cost',
+        ),
+    ]
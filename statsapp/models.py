@@ -10,7 +10,7 @@ class MonthlyCarStat(models.Model):
 
     refuels_count = models.PositiveIntegerField(default=0)
     total_fuel_liters = models.DecimalField(max_digits=12, decimal_places=2, default=0)
-    total_fuel_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Fuel costs are kept per currency in MonthlyCarFuelStat.
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -18,4 +18,25 @@ class MonthlyCarStat(models.Model):
         ordering = ("-year", "-month")
 
     def __str__(self):
-        return f"{self.car} | {self.year}-{self.month:02d}"
\ No newline at end of file
+        return f"{self.car} | {self.year}-{self.month:02d}"
+
+
+class MonthlyCarFuelStat(models.Model):
+    """Per-currency refuel totals that accompany a MonthlyCarStat row."""
+
+    car = models.ForeignKey("garage.Car", on_delete=models.CASCADE, related_name="monthly_fuel_stats")
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+    currency = models.CharField(max_length=3)
+
+    refuels_count = models.PositiveIntegerField(default=0)
+    total_fuel_liters = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_fuel_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("car", "year", "month", "currency")
+        ordering = ("-year", "-month", "currency")
+
+    def __str__(self):
+        return f"{self.car} | {self.year}-{self.month:02d} | {self.currency}"
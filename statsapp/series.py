@@ -0,0 +1,148 @@
+"""
+Per-car time series: distance, fuel, cost, consumption and cost per km in
+daily, weekly or monthly buckets.
+
+Trip distance is grouped by SQL (Trunc). Refuels are fetched once as plain
+tuples, with costs already converted in SQL, and walked in odometer order:
+consumption is only known between two full-tank refuels, as the liters put
+in after the first one over the distance driven in between, and is
+attributed to the bucket of the closing refuel.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+
+from core.currency import converted
+from core.periods import next_month_start
+from logbook.models import Trip, Refuel
+
+INTERVAL_DAY = "day"
+INTERVAL_WEEK = "week"
+INTERVAL_MONTH = "month"
+INTERVALS = (INTERVAL_DAY, INTERVAL_WEEK, INTERVAL_MONTH)
+
+# Longest series served, in buckets (about 13 years of days).
+MAX_BUCKETS = 5000
+
+
+def bucket_start(day, interval) -> datetime.date:
+    """First day of the bucket holding `day`; weeks start on Monday like Trunc("week")."""
+    if interval == INTERVAL_DAY:
+        return day
+    if interval == INTERVAL_WEEK:
+        return day - datetime.timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(day, interval) -> datetime.date:
+    if interval == INTERVAL_DAY:
+        return day + datetime.timedelta(days=1)
+    if interval == INTERVAL_WEEK:
+        return day + datetime.timedelta(days=7)
+    return next_month_start(day.year, day.month)
+
+
+def bucket_count(start, end, interval) -> int:
+    start, end = bucket_start(start, interval), bucket_start(end, interval)
+    if interval == INTERVAL_DAY:
+        return (end - start).days + 1
+    if interval == INTERVAL_WEEK:
+        return (end - start).days // 7 + 1
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def _ratio(numerator, denominator, scale, places):
+    if not denominator:
+        return None
+    return (Decimal(numerator) * scale / Decimal(denominator)).quantize(places)
+
+
+def _point(period, distance, liters, cost, interval_liters, interval_km):
+    return {
+        "period": period,
+        "distance_km": distance,
+        "liters": liters.quantize(Decimal("0.01")),
+        "cost": cost.quantize(Decimal("0.01")),
+        "consumption_l_100km": _ratio(interval_liters, interval_km, 100, Decimal("0.01")),
+        "cost_per_km": _ratio(cost, distance, 1, Decimal("0.001")),
+    }
+
+
+def build_car_series(car_id, interval, start, end, currency) -> dict:
+    """
+    Buckets from start to end (inclusive dates) for one car, every bucket
+    present even when empty, plus the totals of the range. Costs are in
+    `currency`. Takes three queries.
+    """
+    end_exclusive = end + datetime.timedelta(days=1)
+
+    distance_by_bucket = dict(
+        Trip.objects.filter(car_id=car_id, start_date__gte=start, start_date__lt=end_exclusive)
+        .annotate(bucket=Trunc("start_date", interval))
+        .values("bucket")
+        .annotate(distance_km=Sum("distance"))
+        .order_by()
+        .values_list("bucket", "distance_km")
+    )
+
+    # The walk starts at the last full tank before the range, so the first
+    # interval closed inside the range is complete.
+    refuels = Refuel.objects.filter(car_id=car_id)
+    anchor = (
+        refuels.filter(date__lt=start, is_full_tank=True)
+        .order_by("-date", "-odometer")
+        .values_list("date", flat=True)
+        .first()
+    )
+    rows = (
+        refuels.filter(date__gte=anchor or start, date__lt=end_exclusive)
+        .annotate(cost=converted("total_cost", "currency", "date", currency))
+        .order_by("date", "odometer")
+        .values_list("date", "odometer", "liters", "is_full_tank", "cost")
+    )
+
+    buckets = {}
+    period = bucket_start(start, interval)
+    while period <= end:
+        # [liters, cost, liters between full tanks, km between full tanks]
+        buckets[period] = [Decimal("0"), Decimal("0"), Decimal("0"), 0]
+        period = next_bucket(period, interval)
+
+    last_full_odometer = None
+    pending_liters = Decimal("0")
+    for day, odometer, liters, full_tank, cost in rows.iterator():
+        bucket = buckets.get(bucket_start(day, interval)) if day >= start else None
+        if bucket is not None:
+            bucket[0] += liters
+            bucket[1] += cost or 0
+        if last_full_odometer is None:
+            if full_tank:
+                last_full_odometer = odometer
+            continue
+        pending_liters += liters
+        if full_tank:
+            if bucket is not None and odometer > last_full_odometer:
+                bucket[2] += pending_liters
+                bucket[3] += odometer - last_full_odometer
+            last_full_odometer = odometer
+            pending_liters = Decimal("0")
+
+    points = []
+    totals = [0, Decimal("0"), Decimal("0"), Decimal("0"), 0]
+    for period, (liters, cost, interval_liters, interval_km) in buckets.items():
+        distance = int(distance_by_bucket.get(period) or 0)
+        points.append(_point(period, distance, liters, cost, interval_liters, interval_km))
+        for i, value in enumerate((distance, liters, cost, interval_liters, interval_km)):
+            totals[i] += value
+
+    return {
+        "car_id": car_id,
+        "interval": interval,
+        "start": start,
+        "end": end,
+        "currency": currency,
+        "totals": _point(None, *totals),
+        "buckets": points,
+    }
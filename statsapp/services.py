@@ -0,0 +1,391 @@
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum, Count, Q
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from core.cache import bump_data_versions
+from core.currency import BASE_CURRENCY, converted
+from core.periods import iter_months, month_range, months_range, next_month_start, range_filter
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from .models import MonthlyCarStat, MonthlyCarFuelStat
+
+logger = logging.getLogger(__name__)
+
+SOURCE_ROLLUP = "rollup"
+SOURCE_LIVE = "live"
+SOURCE_MIXED = "mixed"
+
+
+def car_label(car) -> str:
+    return f"{car.brand} {car.model} ({car.year})"
+
+
+def rollup_is_fresh(stat, fuel_rows, now=None) -> bool:
+    """
+    A rollup row can be trusted when it was computed after its month closed,
+    or recently enough for the current month. Rows whose per-currency
+    breakdown does not add up (e.g. written before the breakdown existed)
+    are treated as stale.
+    """
+    now = now or timezone.now()
+
+    month_end = timezone.make_aware(datetime.combine(next_month_start(stat.year, stat.month), time.min))
+
+    if stat.updated_at < month_end:
+        max_age = getattr(settings, "STATS_ROLLUP_MAX_AGE", None)
+        if max_age is not None and stat.updated_at < now - timedelta(seconds=max_age):
+            return False
+
+    return sum(r.refuels_count for r in fuel_rows) == stat.refuels_count
+
+
+def activity_months(car_id) -> set:
+    """(year, month) of every month with a trip or refuel of the car, in one query over the car/date indexes."""
+    trips = Trip.objects.filter(car_id=car_id).dates("start_date", "month").order_by()
+    refuels = Refuel.objects.filter(car_id=car_id).dates("date", "month").order_by()
+    return {(day.year, day.month) for day in trips.union(refuels)}
+
+
+def converted_fuel_costs(car_ids, period, currency) -> dict:
+    """
+    {(car_id, fuel currency): cost in `currency`} of the cars' refuels paid in
+    another currency within `period` ((start, end) dates, end exclusive, either
+    may be None), each converted at the rate valid on its date. The rollups
+    only keep per-currency totals, so their readers take the converted costs
+    from here. No query is run for an empty `car_ids`.
+    """
+    if not car_ids:
+        return {}
+    rows = (
+        Refuel.objects.filter(car_id__in=car_ids, **range_filter("date", *period))
+        .exclude(currency=currency)
+        .values("car_id", "currency")
+        .annotate(cost=Coalesce(Sum(converted("total_cost", "currency", "date", currency)), Decimal("0")))
+        .order_by()
+        .values_list("car_id", "currency", "cost")
+    )
+    return {(car_id, code): cost for car_id, code, cost in rows}
+
+
+def cars_to_convert(fuel_rows, currency) -> list:
+    """Ids of the cars with rollup fuel rows in a currency other than `currency`."""
+    return sorted({r.car_id for r in fuel_rows if r.currency != currency})
+
+
+def rows_from_rollup(stat, fuel_rows, currency, converted_costs):
+    """
+    (trips, {fuel currency: fuel}) of one car's month from its rollup rows;
+    `converted_costs` comes from converted_fuel_costs().
+    """
+    trips = {
+        "trips_count": stat.trips_count,
+        "total_distance_km": stat.total_distance_km,
+    }
+    fuel = {
+        r.currency: {
+            "refuels_count": r.refuels_count,
+            "total_fuel_liters": r.total_fuel_liters,
+            "total_fuel_cost": r.total_fuel_cost,
+            "converted_fuel_cost": (
+                r.total_fuel_cost if r.currency == currency
+                else converted_costs.get((stat.car_id, r.currency), Decimal("0"))
+            ),
+        }
+        for r in fuel_rows
+    }
+    return trips, fuel
+
+
+def rows_from_live(car_ids, year, month, currency):
+    """
+    ({car_id: trips}, {car_id: {fuel currency: fuel}}) of the cars' month,
+    aggregated over Trip and Refuel with one grouped query each.
+    """
+    trips_by_car = (
+        Trip.objects.filter(
+            car_id__in=car_ids,
+            **range_filter("start_date", *month_range(year, month)),
+        )
+        .values("car_id")
+        .annotate(
+            trips_count=Count("id"),
+            total_distance_km=Coalesce(Sum("distance"), 0),
+        )
+        .order_by()
+    )
+    refuels_by_car_currency = (
+        Refuel.objects.filter(
+            car_id__in=car_ids,
+            **range_filter("date", *month_range(year, month)),
+        )
+        .values("car_id", "currency")
+        .annotate(
+            refuels_count=Count("id"),
+            total_fuel_liters=Coalesce(Sum("liters"), Decimal("0")),
+            total_fuel_cost=Coalesce(Sum("total_cost"), Decimal("0")),
+            converted_fuel_cost=Coalesce(Sum(converted("total_cost", "currency", "date", currency)), Decimal("0")),
+        )
+        .order_by()
+    )
+
+    trips = {
+        t["car_id"]: {
+            "trips_count": t["trips_count"],
+            "total_distance_km": int(t["total_distance_km"] or 0),
+        }
+        for t in trips_by_car
+    }
+    fuel = {}
+    for r in refuels_by_car_currency:
+        fuel.setdefault(r["car_id"], {})[r["currency"]] = {
+            "refuels_count": r["refuels_count"],
+            "total_fuel_liters": r["total_fuel_liters"],
+            "total_fuel_cost": r["total_fuel_cost"],
+            "converted_fuel_cost": r["converted_fuel_cost"],
+        }
+    return trips, fuel
+
+
+def build_monthly_report(cars, year: int, month: int, currency: str = BASE_CURRENCY) -> dict:
+    """
+    Builds the monthly report rows for the given cars.
+
+    Cars with a fresh MonthlyCarStat row are answered from the rollup tables;
+    the rest fall back to a live aggregation over Trip/Refuel.
+    Fuel costs are listed per currency and totalled in `currency`.
+    Returns a dict with "stats", "totals", "source" and "source_counts".
+    """
+    cars = list(cars)
+    car_ids = [c.id for c in cars]
+
+    stat_rows = {
+        s.car_id: s
+        for s in MonthlyCarStat.objects.filter(car_id__in=car_ids, year=year, month=month)
+    }
+    fuel_rows = {}
+    if stat_rows:
+        for r in MonthlyCarFuelStat.objects.filter(car_id__in=list(stat_rows), year=year, month=month):
+            fuel_rows.setdefault(r.car_id, []).append(r)
+
+    now = timezone.now()
+    rollup_ids, live_ids = [], []
+    for car_id in car_ids:
+        stat = stat_rows.get(car_id)
+        if stat is not None and rollup_is_fresh(stat, fuel_rows.get(car_id, []), now=now):
+            rollup_ids.append(car_id)
+        else:
+            live_ids.append(car_id)
+
+    trips_map, fuel_map = {}, {}
+    converted_costs = converted_fuel_costs(
+        cars_to_convert((r for car_id in rollup_ids for r in fuel_rows.get(car_id, [])), currency),
+        month_range(year, month),
+        currency,
+    )
+    for car_id in rollup_ids:
+        trips_map[car_id], fuel_map[car_id] = rows_from_rollup(
+            stat_rows[car_id], fuel_rows.get(car_id, []), currency, converted_costs
+        )
+
+    if live_ids:
+        live_trips, live_fuel = rows_from_live(live_ids, year, month, currency)
+        trips_map.update(live_trips)
+        fuel_map.update(live_fuel)
+
+    empty_trips = {"trips_count": 0, "total_distance_km": 0}
+    empty_fuel = {
+        "refuels_count": 0,
+        "total_fuel_liters": Decimal("0"),
+        "total_fuel_cost": Decimal("0"),
+        "converted_fuel_cost": Decimal("0"),
+    }
+
+    stats = []
+    totals = {
+        "trips_count": 0,
+        "total_distance_km": 0,
+        "refuels_count": 0,
+        "total_fuel_liters": Decimal("0"),
+        "total_fuel_cost": Decimal("0"),
+        "currency": currency,
+    }
+    for car in cars:
+        t = trips_map.get(car.id) or empty_trips
+        fuel = fuel_map.get(car.id) or {}
+        if not t["trips_count"] and not any(r["refuels_count"] for r in fuel.values()):
+            continue
+
+        totals["trips_count"] += t["trips_count"]
+        totals["total_distance_km"] += t["total_distance_km"]
+
+        for fuel_currency in sorted(fuel) or ["-"]:
+            r = fuel.get(fuel_currency, empty_fuel)
+            stats.append({
+                "car_id": car.id,
+                "car_label": car_label(car),
+                "currency": fuel_currency,
+                "trips_count": t["trips_count"],
+                "total_distance_km": t["total_distance_km"],
+                "refuels_count": r["refuels_count"],
+                "total_fuel_liters": r["total_fuel_liters"],
+                "total_fuel_cost": r["total_fuel_cost"],
+            })
+
+            totals["refuels_count"] += r["refuels_count"]
+            totals["total_fuel_liters"] += Decimal(r["total_fuel_liters"] or 0)
+            totals["total_fuel_cost"] += r["converted_fuel_cost"]
+
+    rollup_count = len(car_ids) - len(live_ids)
+    if not live_ids:
+        source = SOURCE_ROLLUP
+    elif rollup_count:
+        source = SOURCE_MIXED
+    else:
+        source = SOURCE_LIVE
+
+    logger.info(
+        "monthly_report period=%04d-%02d source=%s rollup_cars=%d live_cars=%d",
+        year, month, source, rollup_count, len(live_ids),
+    )
+
+    return {
+        "stats": stats,
+        "totals": totals,
+        "source": source,
+        "source_counts": {SOURCE_ROLLUP: rollup_count, SOURCE_LIVE: len(live_ids)},
+    }
+
+
+def period_q(start, end) -> Q:
+    """Q over MonthlyCarStat-like (year, month) columns for an inclusive month range."""
+    q = Q()
+    if start:
+        q &= Q(year__gt=start[0]) | Q(year=start[0], month__gte=start[1])
+    if end:
+        q &= Q(year__lt=end[0]) | Q(year=end[0], month__lte=end[1])
+    return q
+
+
+def rebuild_monthly_stats(car_ids=None, start=None, end=None, fill_empty=False, batch_size=1000) -> int:
+    """
+    Rebuilds MonthlyCarStat / MonthlyCarFuelStat for the given cars
+    (all cars when None) and inclusive (year, month) range.
+
+    Runs one grouped query per source table and writes the results with bulk
+    upserts; rollups in scope that no longer have any activity are removed.
+    With fill_empty, zero rows are written for every car/month in the range
+    (requires both start and end).
+    Bumps the data version of the cars' owners once the rows are committed.
+    Returns the number of MonthlyCarStat rows written.
+    """
+    if fill_empty and not (start and end):
+        raise ValueError("fill_empty requires both start and end.")
+
+    trips_qs = Trip.objects.all()
+    refuels_qs = Refuel.objects.all()
+    if car_ids is not None:
+        car_ids = list(car_ids)
+        trips_qs = trips_qs.filter(car_id__in=car_ids)
+        refuels_qs = refuels_qs.filter(car_id__in=car_ids)
+    period = months_range(start, end)
+    trips_qs = trips_qs.filter(**range_filter("start_date", *period))
+    refuels_qs = refuels_qs.filter(**range_filter("date", *period))
+
+    trips_by_bucket = (
+        trips_qs.annotate(y=ExtractYear("start_date"), m=ExtractMonth("start_date"))
+        .values("car_id", "y", "m")
+        .annotate(
+            trips_count=Count("id"),
+            total_distance_km=Coalesce(Sum("distance"), 0),
+        )
+        .order_by()
+    )
+    refuels_by_bucket = (
+        refuels_qs.annotate(y=ExtractYear("date"), m=ExtractMonth("date"))
+        .values("car_id", "y", "m", "currency")
+        .annotate(
+            refuels_count=Count("id"),
+            liters=Coalesce(Sum("liters"), Decimal("0.00")),
+            cost=Coalesce(Sum("total_cost"), Decimal("0.00")),
+        )
+        .order_by()
+    )
+
+    stats = {}
+
+    def stat_for(key):
+        if key not in stats:
+            stats[key] = MonthlyCarStat(car_id=key[0], year=key[1], month=key[2])
+        return stats[key]
+
+    if fill_empty:
+        scope_ids = car_ids if car_ids is not None else Car.objects.values_list("id", flat=True)
+        for car_id in scope_ids:
+            for year, month in iter_months(start, end):
+                stat_for((car_id, year, month))
+
+    for t in trips_by_bucket.iterator():
+        stat = stat_for((t["car_id"], t["y"], t["m"]))
+        stat.trips_count = t["trips_count"]
+        stat.total_distance_km = int(t["total_distance_km"] or 0)
+
+    fuel_stats = []
+    for r in refuels_by_bucket.iterator():
+        stat = stat_for((r["car_id"], r["y"], r["m"]))
+        stat.refuels_count += r["refuels_count"]
+        stat.total_fuel_liters += r["liters"]
+        fuel_stats.append(MonthlyCarFuelStat(
+            car_id=r["car_id"],
+            year=r["y"],
+            month=r["m"],
+            currency=r["currency"],
+            refuels_count=r["refuels_count"],
+            total_fuel_liters=r["liters"],
+            total_fuel_cost=r["cost"],
+        ))
+
+    scope = period_q(start, end)
+    if car_ids is not None:
+        scope &= Q(car_id__in=car_ids)
+
+    with transaction.atomic():
+        # Drop everything in scope first so buckets without activity do not linger;
+        # the upserts below rewrite the rest in place.
+        fresh_keys = set(stats)
+        stale_ids = [
+            pk for pk, car_id, year, month in
+            MonthlyCarStat.objects.filter(scope).order_by().values_list("id", "car_id", "year", "month")
+            if (car_id, year, month) not in fresh_keys
+        ]
+        for i in range(0, len(stale_ids), batch_size):
+            MonthlyCarStat.objects.filter(id__in=stale_ids[i:i + batch_size]).delete()
+        MonthlyCarFuelStat.objects.filter(scope).delete()
+
+        MonthlyCarStat.objects.bulk_create(
+            list(stats.values()),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["car", "year", "month"],
+            update_fields=[
+                "trips_count",
+                "total_distance_km",
+                "refuels_count",
+                "total_fuel_liters",
+                "updated_at",
+            ],
+        )
+        MonthlyCarFuelStat.objects.bulk_create(fuel_stats, batch_size=batch_size)
+
+    # Cached results read from these rollups (e.g. CarStatsAPIView ?source=rollup)
+    # are keyed on the owners' data versions.
+    owners = Car.objects.filter(id__in=car_ids) if car_ids is not None else Car.objects.all()
+    owner_ids = list(owners.order_by().values_list("owner_id", flat=True).distinct())
+    transaction.on_commit(lambda: bump_data_versions(owner_ids))
+
+    return len(stats)
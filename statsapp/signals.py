@@ -0,0 +1,87 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from logbook.signals import DATE_FIELDS, previous_placement
+from .models import MonthlyCarStat, MonthlyCarFuelStat
+from .services import period_q
+from .tasks import rebuild_monthly_stats_range, recalculate_monthly_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _bucket(car_id, day):
+    return (car_id, day.year, day.month)
+
+
+def schedule_rollup_refresh(buckets):
+    """
+    Drops the rollup rows of the given (car_id, year, month) buckets right away,
+    so readers fall back to live aggregation, and queues a recompute for each
+    bucket once the current transaction commits.
+    """
+    buckets = set(buckets)
+    if not buckets:
+        return
+
+    condition = Q()
+    for car_id, year, month in buckets:
+        condition |= Q(car_id=car_id, year=year, month=month)
+    MonthlyCarStat.objects.filter(condition).delete()
+    MonthlyCarFuelStat.objects.filter(condition).delete()
+
+    for car_id, year, month in buckets:
+        transaction.on_commit(
+            lambda c=car_id, y=year, m=month: recalculate_monthly_stats.delay(c, y, m),
+            robust=True,
+        )
+
+
+def schedule_rollup_rebuild(buckets):
+    """
+    Like schedule_rollup_refresh, for bulk writes: drops the rollups of the
+    affected cars over the month span of the buckets and queues a single range
+    rebuild for it once the transaction commits.
+    """
+    buckets = set(buckets)
+    if not buckets:
+        return
+
+    car_ids = sorted({car_id for car_id, _, _ in buckets})
+    start = min((year, month) for _, year, month in buckets)
+    end = max((year, month) for _, year, month in buckets)
+    scope = Q(car_id__in=car_ids) & period_q(start, end)
+    MonthlyCarStat.objects.filter(scope).delete()
+    MonthlyCarFuelStat.objects.filter(scope).delete()
+    transaction.on_commit(
+        lambda: rebuild_monthly_stats_range.delay(car_ids, list(start), list(end)),
+        robust=True,
+    )
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Refuel)
+def refresh_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    buckets = {_bucket(instance.car_id, getattr(instance, DATE_FIELDS[sender]))}
+    previous = previous_placement(instance)
+    if previous:
+        buckets.add(_bucket(*previous))
+    schedule_rollup_refresh(buckets)
+
+
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Refuel)
+def refresh_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    # Deleting a car cascades to its rollups as well, nothing left to refresh.
+    if isinstance(origin, Car):
+        return
+
+    schedule_rollup_refresh({_bucket(instance.car_id, getattr(instance, DATE_FIELDS[sender]))})
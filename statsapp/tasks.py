@@ -1,12 +1,11 @@
 from celery import shared_task
-from decimal import Decimal
-from django.db.models import Sum, F
-from django.db.models.functions import Coalesce
+from django.conf import settings
 from django.utils import timezone
 
+from core.utils import chunked
 from garage.models import Car
-from logbook.models import Trip, Refuel
 from .models import MonthlyCarStat
+from .services import rebuild_monthly_stats
 
 
 @shared_task
@@ -15,53 +14,47 @@ def recalculate_monthly_stats(car_id: int, year: int, month: int) -> int:
     Recalculates MonthlyCarStat for a given car + year/month.
     Returns the MonthlyCarStat id.
     """
-    car = Car.objects.filter(pk=car_id).first()
-    if not car:
+    if not Car.objects.filter(pk=car_id).exists():
         return 0
-    start = timezone.datetime(year=year, month=month, day=1).date()
-    if month == 12:
-        end = timezone.datetime(year=year + 1, month=1, day=1).date()
-    else:
-        end = timezone.datetime(year=year, month=month + 1, day=1).date()
 
-    trips_qs = Trip.objects.filter(car_id=car_id, start_date__gte=start, start_date__lt=end)
-    refuels_qs = Refuel.objects.filter(car_id=car_id, date__gte=start, date__lt=end)
+    rebuild_monthly_stats([car_id], (year, month), (year, month), fill_empty=True)
+    return (
+        MonthlyCarStat.objects.filter(car_id=car_id, year=year, month=month)
+        .values_list("id", flat=True)
+        .first()
+        or 0
+    )
 
-    trips_count = trips_qs.count()
-    total_distance_km = trips_qs.aggregate(
-        total=Coalesce(Sum(F("end_odometer") - F("start_odometer")), 0)
-    )["total"] or 0
 
-    refuels_count = refuels_qs.count()
-    refuels_agg = refuels_qs.aggregate(
-        liters=Coalesce(Sum("liters"), Decimal("0.00")),
-        cost=Coalesce(Sum("total_cost"), Decimal("0.00")),
+@shared_task
+def rebuild_monthly_stats_range(car_ids=None, start=None, end=None) -> int:
+    """
+    Bulk rebuild of the monthly rollups for the given cars (all when None)
+    and inclusive [year, month] range. Returns the number of rows written.
+    """
+    return rebuild_monthly_stats(
+        car_ids,
+        tuple(start) if start else None,
+        tuple(end) if end else None,
     )
-    total_liters = refuels_agg["liters"] or Decimal("0.00")
-    total_cost = refuels_agg["cost"] or Decimal("0.00")
 
-    obj, _ = MonthlyCarStat.objects.update_or_create(
-        car_id=car_id,
-        year=year,
-        month=month,
-        defaults={
-            "trips_count": trips_count,
-            "total_distance_km": int(total_distance_km),
-            "refuels_count": refuels_count,
-            "total_fuel_liters": total_liters,
-            "total_fuel_cost": total_cost,
-        },
-    )
-    return obj.id
+
+@shared_task(ignore_result=True)
+def recalculate_monthly_stats_batch(car_ids, year: int, month: int) -> int:
+    """Recalculates one month for a batch of cars in a single pass."""
+    return rebuild_monthly_stats(car_ids, (year, month), (year, month), fill_empty=True)
 
 
 @shared_task
 def recalculate_all_cars_current_month() -> int:
     today = timezone.localdate()
     year, month = today.year, today.month
-
-    car_ids = list(Car.objects.values_list("id", flat=True))
-    for car_id in car_ids:
-        recalculate_monthly_stats.delay(car_id, year, month)
-
-    return len(car_ids)
\ No newline at end of file
+    batch_size = settings.STATS_RECALC_BATCH_SIZE
+
+    car_ids = Car.objects.order_by("id").values_list("id", flat=True).iterator(chunk_size=batch_size)
+    queued = 0
+    # Each batch is published as soon as it is read, so only one batch of ids is held at a time.
+    for batch in chunked(car_ids, batch_size):
+        recalculate_monthly_stats_batch.delay(batch, year, month)
+        queued += len(batch)
+    return queued
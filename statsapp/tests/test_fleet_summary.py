@@ -0,0 +1,146 @@
+import datetime
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.currency import clear_rate_cache
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat, MonthlyCarFuelStat
+from statsapp.services import rebuild_monthly_stats
+
+DAY = datetime.date(2025, 3, 10)
+
+
+class FleetSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_rate_cache()
+        self.manager = create_user("manager", preferred_currency="EUR")
+        self.manager.groups.add(Group.objects.get_or_create(name="Managers")[0])
+        self.drivers = [create_user(f"driver{i}") for i in range(2)]
+        self.cars = []
+        for i, (driver, distance, liters) in enumerate(((0, 100, "8.00"), (1, 300, "15.00"), (1, 50, "6.00"))):
+            owner = self.drivers[driver]
+            car = Car.objects.create(
+                owner=owner, brand="VW", model=f"Golf {i}", year=2018, fuel="diesel", gearbox="auto"
+            )
+            Trip.objects.create(
+                car=car, created_by=owner, start_odometer=1000, end_odometer=1000 + distance,
+                start_date=DAY, end_date=DAY, from_city="Sofia", to_city="Plovdiv",
+            )
+            Refuel.objects.create(
+                car=car, created_by=owner, date=DAY, odometer=1000 + distance,
+                liters=liters, total_cost="20.00", currency="EUR",
+            )
+            self.cars.append(car)
+        self.url = reverse("api-fleet-summary")
+        self.client_api = APIClient()
+        self.client_api.force_authenticate(user=self.manager)
+
+    def test_cars_and_drivers_are_ranked_with_a_fixed_number_of_queries(self):
+        # Managers' group lookup, trip and refuel aggregates, cars.
+        with self.assertNumQueries(4):
+            resp = self.client_api.get(self.url, {"start": "2025-03-05", "end": "2025-03-20"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["source"], "live")
+        self.assertEqual([c["distance_km"] for c in resp.data["cars"]], [300, 100, 50])
+        self.assertEqual([d["username"] for d in resp.data["drivers"]], ["driver1", "driver0"])
+        self.assertEqual(resp.data["drivers"][0]["distance_km"], 350)
+        self.assertEqual(resp.data["totals"]["fuel_cost"], "60.00")
+
+        resp = self.client_api.get(self.url, {"start": "2025-03-05", "end": "2025-03-20", "order": "consumption"})
+        self.assertEqual([c["consumption_l_100km"] for c in resp.data["cars"]], ["12.00", "8.00", "5.00"])
+
+        for i in range(5):
+            Car.objects.create(
+                owner=self.drivers[0], brand="Opel", model=f"Astra {i}", year=2020, fuel="petrol", gearbox="manual"
+            )
+        # Same count as above, minus the group lookup already cached on this user instance.
+        with self.assertNumQueries(3):
+            resp = self.client_api.get(self.url, {"start": "2025-03-05", "end": "2025-03-20", "limit": 2})
+        self.assertEqual(resp.data["cars_count"], 8)
+        self.assertEqual(len(resp.data["cars"]), 2)
+
+    def test_whole_months_are_read_from_rollups(self):
+        MonthlyCarStat.objects.create(
+            car=self.cars[0], year=2025, month=3, trips_count=7, total_distance_km=700,
+            refuels_count=1, total_fuel_liters="35.00",
+        )
+        MonthlyCarFuelStat.objects.create(
+            car=self.cars[0], year=2025, month=3, currency="EUR",
+            refuels_count=1, total_fuel_liters="35.00", total_fuel_cost="70.00",
+        )
+        rebuild_monthly_stats([c.pk for c in self.cars[1:]])
+        resp = self.client_api.get(self.url, {"start": "2025-03-01", "end": "2025-03-31"})
+
+        self.assertEqual(resp.data["source"], "rollup")
+        self.assertEqual(resp.data["cars"][0]["distance_km"], 700)
+        self.assertEqual(resp.data["cars"][0]["fuel_cost"], "70.00")
+
+    def test_cars_without_a_fresh_rollup_are_aggregated_live(self):
+        rebuild_monthly_stats()
+        owner = self.drivers[0]
+        car = Car.objects.create(
+            owner=owner, brand="Opel", model="Astra", year=2020, fuel="petrol", gearbox="manual"
+        )
+        # The new trip's month has no rollup row until its recompute runs.
+        day = datetime.date(2025, 3, 5)
+        Trip.objects.create(
+            car=car, created_by=owner, start_odometer=0, end_odometer=100,
+            start_date=day, end_date=day, from_city="Sofia", to_city="Ruse",
+        )
+        # A rollup row written before the month's last refuel no longer adds up.
+        MonthlyCarStat.objects.filter(car=self.cars[2]).update(refuels_count=0)
+
+        resp = self.client_api.get(self.url, {"start": "2025-03-01", "end": "2025-03-31"})
+
+        self.assertEqual(resp.data["source"], "mixed")
+        distances = {c["car_id"]: c["distance_km"] for c in resp.data["cars"]}
+        self.assertEqual(distances, {self.cars[0].pk: 100, self.cars[1].pk: 300, self.cars[2].pk: 50, car.pk: 100})
+        self.assertEqual(resp.data["totals"]["fuel_cost"], "60.00")
+
+        # Every month of the period needs a row.
+        resp = self.client_api.get(self.url, {"start": "2025-02-01", "end": "2025-03-31"})
+        self.assertEqual(resp.data["source"], "live")
+        self.assertEqual(resp.data["totals"]["distance_km"], 550)
+
+    def test_only_managers_can_see_the_fleet(self):
+        self.client_api.force_authenticate(user=self.drivers[0])
+        self.assertEqual(self.client_api.get(self.url).status_code, 403)
+
+        self.client.force_login(self.drivers[0])
+        self.assertEqual(self.client.get(reverse("fleet-summary")).status_code, 403)
+
+        self.client.force_login(self.manager)
+        resp = self.client.get(reverse("fleet-summary"), {"start": "2025-03-01", "end": "2025-03-31"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Fleet summary")
+
+    def test_page_rejects_a_half_given_period_like_the_api(self):
+        self.client.force_login(self.manager)
+        resp = self.client.get(reverse("fleet-summary"), {"start": "2025-03-01"})
+
+        self.assertIsNone(resp.context["summary"])
+        self.assertContains(resp, "Give both start and end, or neither.")
+        self.assertEqual(self.client_api.get(self.url, {"start": "2025-03-01"}).status_code, 400)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_page_and_api_stay_within_their_budgets(self):
+        # The most expensive mix: rollups with costs to convert, and cars aggregated live.
+        rebuild_monthly_stats([c.pk for c in self.cars[1:]])
+        Refuel.objects.filter(car=self.cars[1]).update(currency="BGN")
+        MonthlyCarFuelStat.objects.filter(car=self.cars[1]).update(currency="BGN")
+        params = {"start": "2025-03-01", "end": "2025-03-31"}
+
+        self.client.force_login(self.manager)
+        resp = self.client.get(reverse("fleet-summary"), params)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["summary"]["source"], "mixed")
+
+        self.assertEqual(self.client.get(self.url, params).status_code, 200)
@@ -1,13 +1,16 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from core.tests.helpers import create_user
 from garage.models import Car
-from statsapp.models import MonthlyCarStat
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat, MonthlyCarFuelStat
 
 class MonthlyReportViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.owner = create_user("owner")
         self.other = create_user("other")
         self.car_owner = Car.objects.create(
@@ -22,7 +25,6 @@ class MonthlyReportViewTests(TestCase):
             total_distance_km=100,
             refuels_count=1,
             total_fuel_liters="20.00",
-            total_fuel_cost="60.00",
         )
 
     def test_monthly_report_requires_login(self):
@@ -33,4 +35,63 @@ class MonthlyReportViewTests(TestCase):
         self.client.login(username="owner", password="StrongPass123!")
         resp = self.client.get(reverse("monthly-report"))
         self.assertEqual(resp.status_code, 200)
-        self.assertTemplateUsed(resp, "statsapp/monthly_report.html")
\ No newline at end of file
+        self.assertTemplateUsed(resp, "statsapp/monthly_report.html")
+
+    def test_monthly_report_uses_fresh_rollup(self):
+        today = timezone.localdate()
+        MonthlyCarFuelStat.objects.create(
+            car=self.car_owner,
+            year=today.year,
+            month=today.month,
+            currency="EUR",
+            refuels_count=1,
+            total_fuel_liters="20.00",
+            total_fuel_cost="60.00",
+        )
+        self.client.login(username="owner", password="StrongPass123!")
+        resp = self.client.get(reverse("monthly-report"))
+        self.assertEqual(resp.context["stats_source"], "rollup")
+        self.assertEqual(resp.context["totals"]["total_distance_km"], 100)
+        self.assertEqual(resp.context["stats"][0]["currency"], "EUR")
+
+    def test_monthly_report_falls_back_to_live_without_rollup(self):
+        other_car = Car.objects.create(
+            owner=self.owner, brand="Opel", model="Astra", year=2015, fuel="diesel", gearbox="auto"
+        )
+        today = timezone.localdate()
+        Refuel.objects.create(
+            car=other_car,
+            created_by=self.owner,
+            date=today,
+            odometer=1000,
+            liters="30.00",
+            total_cost="90.00",
+            currency="BGN",
+        )
+        Trip.objects.create(
+            car=other_car,
+            created_by=self.owner,
+            start_odometer=900,
+            end_odometer=1000,
+            start_date=today,
+            end_date=today,
+            from_city="Sofia",
+            to_city="Plovdiv",
+        )
+        self.client.login(username="owner", password="StrongPass123!")
+        resp = self.client.get(reverse("monthly-report"), {"car": other_car.pk})
+        self.assertEqual(resp.context["stats_source"], "live")
+        self.assertEqual(len(resp.context["stats"]), 1)
+        self.assertEqual(resp.context["stats"][0]["refuels_count"], 1)
+        self.assertEqual(resp.context["stats"][0]["total_distance_km"], 100)
+
+    def test_monthly_report_is_cached_until_data_changes(self):
+        self.client.login(username="owner", password="StrongPass123!")
+        resp = self.client.get(reverse("monthly-report"))
+        self.assertFalse(resp.context["stats_cached"])
+        resp = self.client.get(reverse("monthly-report"))
+        self.assertTrue(resp.context["stats_cached"])
+
+        Car.objects.create(owner=self.owner, brand="Opel", model="Astra", year=2015, fuel="diesel", gearbox="auto")
+        resp = self.client.get(reverse("monthly-report"))
+        self.assertFalse(resp.context["stats_cached"])
@@ -0,0 +1,86 @@
+import datetime
+from io import StringIO
+from unittest import mock
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat, MonthlyCarFuelStat
+from statsapp.services import rebuild_monthly_stats
+from statsapp.tasks import recalculate_monthly_stats, recalculate_all_cars_current_month
+
+
+class RebuildMonthlyStatsTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="auto"
+        )
+        self.other_car = Car.objects.create(
+            owner=self.owner, brand="Opel", model="Astra", year=2015, fuel="diesel", gearbox="auto"
+        )
+        for car, day, start, end in (
+            (self.car, datetime.date(2025, 1, 5), 100, 150),
+            (self.car, datetime.date(2025, 1, 20), 150, 230),
+            (self.car, datetime.date(2025, 2, 1), 230, 300),
+            (self.other_car, datetime.date(2025, 2, 3), 10, 20),
+        ):
+            Trip.objects.create(
+                car=car, created_by=self.owner, start_odometer=start, end_odometer=end,
+                start_date=day, end_date=day, from_city="Sofia", to_city="Plovdiv",
+            )
+        for day, currency, cost in (
+            (datetime.date(2025, 1, 6), "BGN", "100.00"),
+            (datetime.date(2025, 1, 21), "EUR", "50.00"),
+            (datetime.date(2025, 1, 22), "EUR", "40.00"),
+        ):
+            Refuel.objects.create(
+                car=self.car, created_by=self.owner, date=day, odometer=200,
+                liters="30.00", total_cost=cost, currency=currency,
+            )
+
+    def test_rebuild_groups_by_car_month_and_currency(self):
+        # Two grouped reads, the writes (savepoint, scope, deletes, upserts) and the owners to bump.
+        with self.assertNumQueries(9):
+            written = rebuild_monthly_stats()
+
+        self.assertEqual(written, 3)
+        jan = MonthlyCarStat.objects.get(car=self.car, year=2025, month=1)
+        self.assertEqual(jan.trips_count, 2)
+        self.assertEqual(jan.total_distance_km, 130)
+        self.assertEqual(jan.refuels_count, 3)
+        eur = MonthlyCarFuelStat.objects.get(car=self.car, year=2025, month=1, currency="EUR")
+        self.assertEqual(eur.refuels_count, 2)
+        self.assertEqual(eur.total_fuel_cost, Decimal("90.00"))
+
+    def test_rebuild_removes_rollups_without_activity_in_scope(self):
+        MonthlyCarStat.objects.create(car=self.other_car, year=2025, month=1, trips_count=9)
+        MonthlyCarStat.objects.create(car=self.other_car, year=2024, month=12, trips_count=9)
+
+        rebuild_monthly_stats([self.other_car.pk], (2025, 1), (2025, 2))
+
+        self.assertFalse(MonthlyCarStat.objects.filter(car=self.other_car, year=2025, month=1).exists())
+        self.assertTrue(MonthlyCarStat.objects.filter(car=self.other_car, year=2024, month=12).exists())
+        self.assertEqual(MonthlyCarStat.objects.get(car=self.other_car, year=2025, month=2).trips_count, 1)
+
+    def test_recalculate_task_writes_empty_month(self):
+        stat_id = recalculate_monthly_stats(self.other_car.pk, 2025, 1)
+        stat = MonthlyCarStat.objects.get(pk=stat_id)
+        self.assertEqual(stat.trips_count, 0)
+
+    def test_command_rebuilds_range(self):
+        call_command("rebuild_monthly_stats", "--from", "2025-02", "--to", "2025-02", stdout=StringIO())
+        self.assertEqual(MonthlyCarStat.objects.filter(year=2025, month=2).count(), 2)
+        self.assertFalse(MonthlyCarStat.objects.filter(year=2025, month=1).exists())
+
+    @override_settings(STATS_RECALC_BATCH_SIZE=1)
+    @mock.patch("statsapp.tasks.recalculate_monthly_stats_batch.delay")
+    def test_nightly_fan_out_dispatches_batches(self, delay):
+        queued = recalculate_all_cars_current_month()
+
+        self.assertEqual(queued, 2)
+        self.assertEqual([c.args[0] for c in delay.call_args_list], [[self.car.pk], [self.other_car.pk]])
@@ -0,0 +1,70 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from core.tests.helpers import create_user
+from garage.models import Car
+from logbook.models import Trip, Refuel
+from statsapp.models import MonthlyCarStat
+
+
+class RollupSignalsTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.car = Car.objects.create(
+            owner=self.owner, brand="VW", model="Golf", year=2018, fuel="diesel", gearbox="auto"
+        )
+        self.other_car = Car.objects.create(
+            owner=self.owner, brand="Opel", model="Astra", year=2015, fuel="diesel", gearbox="auto"
+        )
+
+    def create_trip(self, day):
+        return Trip.objects.create(
+            car=self.car,
+            created_by=self.owner,
+            start_odometer=100,
+            end_odometer=200,
+            start_date=day,
+            end_date=day,
+            from_city="Sofia",
+            to_city="Plovdiv",
+        )
+
+    @mock.patch("statsapp.signals.recalculate_monthly_stats")
+    def test_trip_create_invalidates_and_queues_bucket(self, task):
+        MonthlyCarStat.objects.create(car=self.car, year=2025, month=3, trips_count=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_trip(datetime.date(2025, 3, 10))
+
+        self.assertFalse(MonthlyCarStat.objects.filter(car=self.car, year=2025, month=3).exists())
+        task.delay.assert_called_once_with(self.car.pk, 2025, 3)
+
+    @mock.patch("statsapp.signals.recalculate_monthly_stats")
+    def test_moving_trip_refreshes_old_and_new_bucket(self, task):
+        trip = self.create_trip(datetime.date(2025, 3, 10))
+        task.reset_mock()
+
+        trip.car = self.other_car
+        trip.start_date = trip.end_date = datetime.date(2025, 4, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+
+        queued = {c.args for c in task.delay.call_args_list}
+        self.assertEqual(queued, {(self.car.pk, 2025, 3), (self.other_car.pk, 2025, 4)})
+
+    @mock.patch("statsapp.signals.recalculate_monthly_stats")
+    def test_refuel_delete_queues_bucket(self, task):
+        refuel = Refuel.objects.create(
+            car=self.car,
+            created_by=self.owner,
+            date=datetime.date(2024, 12, 31),
+            odometer=1000,
+            liters="30.00",
+            total_cost="90.00",
+        )
+        task.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            refuel.delete()
+
+        task.delay.assert_called_once_with(self.car.pk, 2024, 12)
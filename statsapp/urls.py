@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import MonthlyReportView
+from .views import FleetSummaryView, MonthlyReportView
 
 urlpatterns = [
     path("reports/monthly/", MonthlyReportView.as_view(), name="monthly-report"),
+    path("reports/fleet/", FleetSummaryView.as_view(), name="fleet-summary"),
 ]
\ No newline at end of file